@@ -168,6 +168,11 @@ def _load_folder(gui, folder: str) -> None:
         gui.refresh_main_table()
     except Exception as exc:
         print(f"  [warn] refresh_main_table failed: {exc}")
+    # the folder is scanned on a worker thread; wait for its rows to land
+    deadline = time.time() + 30
+    while getattr(gui, "_scan_worker", None) is not None and time.time() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.05)
     for _ in range(10):
         QCoreApplication.processEvents()
     time.sleep(0.3)
@@ -270,18 +275,11 @@ def _capture_fix_cor_settings(gui):
 def _capture_batch_ai_phase(gui, phase_label: str, out_name: str):
     """Populate fake statuses in the batch table, then grab."""
     from PyQt5.QtCore import QCoreApplication
-    from PyQt5.QtWidgets import QTableWidgetItem
     table = getattr(gui, "batch_file_main_table", None)
-    if table is None or table.rowCount() == 0:
+    model = getattr(gui, "batch_file_main_model", None)
+    if table is None or model is None or model.rowCount() == 0:
         print(f"  [info] no rows in batch table — skipping {out_name}")
         return
-    # Column index for status — try header names, fall back to last col.
-    status_col = table.columnCount() - 1
-    for c in range(table.columnCount()):
-        h = table.horizontalHeaderItem(c)
-        if h and "status" in (h.text() or "").lower():
-            status_col = c
-            break
     phase_msgs = {
         "A": ["Running try…"] * 3 + ["Done"] * 2,
         "B": ["Inferring on GPU 0…", "Inferring on GPU 1…",
@@ -289,19 +287,19 @@ def _capture_batch_ai_phase(gui, phase_label: str, out_name: str):
         "C": ["Running full…"] * 2 + ["Done"] * 3,
     }
     msgs = phase_msgs.get(phase_label, ["Queued"] * 5)
-    rows = min(table.rowCount(), len(msgs))
+    rows = min(model.rowCount(), len(msgs))
     # Backup + overwrite
     backup = []
     for r in range(rows):
-        item = table.item(r, status_col)
-        backup.append(item.text() if item else "")
-        table.setItem(r, status_col, QTableWidgetItem(msgs[r]))
+        rec = model.records[r]
+        backup.append((rec['status'], rec.get('status_color')))
+        model.set_status(rec, msgs[r])
     for _ in range(3):
         QCoreApplication.processEvents()
     _save(table, out_name)
     # Restore
-    for r, txt in enumerate(backup):
-        table.setItem(r, status_col, QTableWidgetItem(txt))
+    for r, (txt, color) in enumerate(backup):
+        model.set_status(model.records[r], txt, text_color=color)
 
 
 def _capture_batch_ai_summary(gui):
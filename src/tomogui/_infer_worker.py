@@ -2,12 +2,22 @@
 
 Spawned as a subprocess by the GUI, pinned to one GPU via CUDA_VISIBLE_DEVICES.
 Processes a list of projection HDF5 files: for each, reads the try_center
-TIFFs produced by tomocupy's try reconstruction, runs DINOv2 inference, and
-writes center_of_rotation.txt inside the same try_dir. The GUI then reads
-those txt files and updates the table.
+TIFFs produced by tomocupy's try reconstruction and runs DINOv2 inference.
+
+Results go through ``tomogui.result_channel``: one JSON line per file on
+stdout (the pipe the GUI reads - COR, per-candidate scores and timing),
+and center_of_rotation.txt inside the try_dir for tools that read it::
+
+    {"event": "result", "path": ..., "cor": 1234.5, "best_cors": [...],
+     "candidates": 101, "scores": [[cor, score], ...], "timing": {...}}
+    {"event": "error", "path": ..., "reason": "no try TIFFs"}
+
+The human-readable ``[infer-worker] ...`` lines are printed as well.
 
 Usage:
-    python -m tomogui._infer_worker <data_folder> <model_path> <file1> [file2 ...]
+    python -m tomogui._infer_worker [--no-file] <data_folder> <model_path> <file1> [file2 ...]
+
+``--no-file`` skips center_of_rotation.txt (stdout only).
 """
 from __future__ import annotations
 
@@ -18,28 +28,28 @@ import sys
 import traceback
 
 import numpy as np
-from PIL import Image
+
+from tomogui.result_channel import FileChannel, StreamChannel, error
+from tomogui.tiff_reader import read_tiff
 
 
 _CENTER_RE = re.compile(r'center(\d+\.\d+)')
 
 
-def _process_one(proj_file, data_folder, model_cache):
+def _process_one(proj_file, data_folder, model_cache, stream, write_file=True):
     proj_name = os.path.splitext(os.path.basename(proj_file))[0]
     try_dir = os.path.join(f"{data_folder}_rec", "try_center", proj_name)
-    # Remove any stale center_of_rotation.txt from a previous run BEFORE
-    # starting inference. If the current run fails for any reason, the GUI
-    # must not read an old value and mistake it for a fresh result.
-    stale = os.path.join(try_dir, 'center_of_rotation.txt')
-    if os.path.exists(stale):
+    file_channel = FileChannel(try_dir) if write_file else None
+    if file_channel is not None:
         try:
-            os.remove(stale)
+            file_channel.reset(proj_file)
         except OSError as _e:
             print(f"[infer-worker] WARN {proj_name}: could not remove stale "
                   f"center_of_rotation.txt ({_e})", flush=True)
     tiffs = sorted(glob.glob(os.path.join(try_dir, "*.tiff")))
     if not tiffs:
         print(f"[infer-worker] SKIP {proj_name}: no try TIFFs in {try_dir}", flush=True)
+        stream.publish(error(proj_file, "no try TIFFs"))
         return False
     imgs, cors = [], []
     for t in tiffs:
@@ -47,14 +57,14 @@ def _process_one(proj_file, data_folder, model_cache):
         if not m:
             continue
         cors.append(float(m.group(1)))
-        imgs.append(np.array(Image.open(t)).astype(np.float32))
+        imgs.append(read_tiff(t, mmap=False).astype(np.float32, copy=False))
     if not imgs:
         print(f"[infer-worker] SKIP {proj_name}: no parsable center values", flush=True)
+        stream.publish(error(proj_file, "no parsable center values"))
         return False
-    # Use the existing inference_pipeline. It loads the model internally;
-    # `model_cache` is a placeholder so we can swap in a pre-loaded model later.
+    # The model is loaded for the first file and reused for the rest.
     from argparse import Namespace
-    from tomogui._tomocor_infer.inference import inference_pipeline
+    from tomogui._tomocor_infer.inference import inference_pipeline, load_model
     args = Namespace(
         infer_use_8bits=True,
         infer_downsample_factor=2,
@@ -70,34 +80,31 @@ def _process_one(proj_file, data_folder, model_cache):
         print(f"[infer-worker] GRID {proj_name}: {len(cors)} COR(s) "
               f"from {min(cors):.2f} to {max(cors):.2f}", flush=True)
     try:
-        inference_pipeline(args, np.array(imgs), np.array(cors), try_dir)
-    except Exception:
+        if "model" not in model_cache:
+            model_cache["model"] = load_model(model_cache["path"], args.infer_num_windows)
+        msg = inference_pipeline(args, np.array(imgs), np.array(cors), path=proj_file,
+                                 model=model_cache["model"])
+    except Exception as exc:
         print(f"[infer-worker] FAIL {proj_name}:", flush=True)
         traceback.print_exc()
+        stream.publish(error(proj_file, f"inference failed: {exc}"))
         return False
-    # inference_pipeline writes center_of_rotation.txt in try_dir
-    cor_txt = os.path.join(try_dir, 'center_of_rotation.txt')
-    if not os.path.exists(cor_txt):
-        print(f"[infer-worker] FAIL {proj_name}: inference_pipeline did not "
-              f"write center_of_rotation.txt", flush=True)
-        return False
-    # Print result so parent process can optionally stream it
-    try:
-        with open(cor_txt) as f:
-            lines = [line.strip() for line in f if line.strip()]
-        if lines:
-            print(f"[infer-worker] OK {proj_file} => {lines[-1]}", flush=True)
-            return True
-        print(f"[infer-worker] FAIL {proj_name}: center_of_rotation.txt is "
-              f"empty", flush=True)
-    except Exception:
-        traceback.print_exc()
-    return False
+    print(f"[infer-worker] OK {proj_file} => {msg['cor']:.1f}", flush=True)
+    stream.publish(msg)
+    if file_channel is not None:
+        try:
+            file_channel.publish(msg)
+        except OSError as exc:
+            print(f"[infer-worker] WARN {proj_name}: could not write "
+                  f"center_of_rotation.txt ({exc})", flush=True)
+    return True
 
 
 def main(argv):
+    write_file = "--no-file" not in argv
+    argv = [a for a in argv if a != "--no-file"]
     if len(argv) < 3:
-        print("Usage: python -m tomogui._infer_worker "
+        print("Usage: python -m tomogui._infer_worker [--no-file] "
               "<data_folder> <model_path> <file1> [file2 ...]", file=sys.stderr)
         return 2
     data_folder = argv[0]
@@ -106,9 +113,10 @@ def main(argv):
     gpu = os.environ.get("CUDA_VISIBLE_DEVICES", "?")
     print(f"[infer-worker] GPU={gpu}  files={len(files)}", flush=True)
     model_cache = {"path": model_path}
+    stream = StreamChannel(sys.stdout)
     n_ok = 0
     for f in files:
-        if _process_one(f, data_folder, model_cache):
+        if _process_one(f, data_folder, model_cache, stream, write_file):
             n_ok += 1
     print(f"[infer-worker] done GPU={gpu}  OK={n_ok}/{len(files)}", flush=True)
     return 0
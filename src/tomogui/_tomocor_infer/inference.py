@@ -1,33 +1,52 @@
 import time
 import torch
 import numpy as np
-from pathlib import Path
 from PIL import Image
 from tomogui._tomocor_infer._utils import sample_patch_corner
 from tomogui._tomocor_infer.model_archs import ClassificationModel, _make_dinov2_model
+from tomogui.result_channel import FileChannel, result as make_result
 
 
-def inference_pipeline(args, img_cache, center_of_rotation_cache, out_dir):
-    use_8bits = args.infer_use_8bits
-    downsample_factor = args.infer_downsample_factor
-    num_windows = args.infer_num_windows
-    seed_number = args.infer_seed_number
-    model_path = args.infer_model_path
-    multi_instances = num_windows > 1
-    sz = args.infer_window_size
-    np.random.seed(seed_number)
+def load_model(model_path, num_windows):
+    """Build the ViT classifier and load a checkpoint; returns (model, device)."""
     device = torch.device('cuda') if torch.cuda.is_available() else 'cpu'
     print(f'inference device: {device}  (cuda available: {torch.cuda.is_available()})')
 
     model_ = _make_dinov2_model()
-    model = ClassificationModel(model_, embed_dim=model_.embed_dim, num_windows=num_windows, multi_instances=multi_instances)
+    model = ClassificationModel(model_, embed_dim=model_.embed_dim, num_windows=num_windows, multi_instances=num_windows > 1)
     states = torch.load(model_path, map_location='cpu', weights_only=False)['state_dict']
     states = {(k.replace("module.", "") if "module." in k else k): v for k, v in states.items()}
     model.load_state_dict(states, strict=False)
     model.to(device)
+    return model, device
+
+
+def inference_pipeline(args, img_cache, center_of_rotation_cache, out_dir=None,
+                       channel=None, path=None, model=None):
+    """Score every candidate COR image and return the result dict
+    (see ``tomogui.result_channel``).
+
+    The result is also published to ``channel``; without one it is
+    written to ``out_dir``/center_of_rotation.txt as before.  ``path`` is
+    the projection file the result is reported for.  ``model`` is a
+    ``(model, device)`` pair from ``load_model`` to reuse; without it
+    the checkpoint ``args.infer_model_path`` is loaded for this call.
+    """
+    t_load = time.time()
+    use_8bits = args.infer_use_8bits
+    downsample_factor = args.infer_downsample_factor
+    num_windows = args.infer_num_windows
+    seed_number = args.infer_seed_number
+    multi_instances = num_windows > 1
+    sz = args.infer_window_size
+    np.random.seed(seed_number)
+    if model is None:
+        model = load_model(args.infer_model_path, num_windows)
+    model, device = model
 
     print('starting model inference...')
     t_start = time.time()
+    load_s = t_start - t_load
 
     if downsample_factor > 1:
         print(f"Resizing with downsample factor {downsample_factor}.")
@@ -82,15 +101,18 @@ def inference_pipeline(args, img_cache, center_of_rotation_cache, out_dir):
             feature = model(sample)
         features.append(feature)
 
-    print(f"done. Elapsed time: {time.time() - t_start:.1f} s.")
+    infer_s = time.time() - t_start
+    print(f"done. Elapsed time: {infer_s:.1f} s.")
 
     features_all = torch.cat(features, dim=0).detach().cpu().numpy()
     scores = np.exp(features_all[:, 1]) / (np.exp(features_all[:, 0]) + np.exp(features_all[:, 1]))
     best_cors = [center_of_rotation_cache[i] for i in np.where(scores == scores.max())[0]]
 
-    out_path = Path(out_dir) / 'center_of_rotation.txt'
-    # 'w' — each inference run starts a fresh file. Appending leaves stale
-    # values behind that then get mis-read if a later run fails silently.
-    with open(out_path, 'w') as f:
-        for cor in best_cors:
-            f.write(f"{cor:.1f}\n")
+    msg = make_result(path, best_cors, center_of_rotation_cache, scores,
+                      timing={"load": round(load_s, 3), "infer": round(infer_s, 3),
+                              "total": round(time.time() - t_load, 3)})
+    if channel is None and out_dir is not None:
+        channel = FileChannel(out_dir)
+    if channel is not None:
+        channel.publish(msg)
+    return msg
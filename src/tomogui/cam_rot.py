@@ -0,0 +1,53 @@
+"""
+Camera rotation fit for TomoGUI
+Camera tilt from the rotation centre found at several detector heights.
+
+A tilted camera makes the COR drift linearly with the detector row.
+CamRot finds the COR (Try + AI inference) at ``n`` heights and fits
+``cor = a + b * row`` by least squares; the tilt is ``atan(-b)``.  With
+two heights this is the plain top/bottom difference; more heights
+average out the error of a single inference and give an uncertainty.
+"""
+
+import math
+
+import numpy as np
+
+
+def pass_heights(n, top=0.1, bottom=0.9):
+    """``n`` evenly spaced ``--nsino`` fractions from top to bottom."""
+    if n < 2:
+        raise ValueError("CamRot needs at least two heights")
+    return [round(float(v), 4) for v in np.linspace(top, bottom, n)]
+
+
+def fit_tilt(rows, cors):
+    """Least-squares line through (detector row, COR).
+
+    Returns:
+        dict: ``angle_deg`` (positive = COR decreases towards the bottom
+        of the image), ``slope`` (px per row), ``intercept``, ``rms``
+        (residual, px) and ``angle_err_deg`` (1-sigma, None for two
+        heights).
+    """
+    rows = np.asarray(rows, dtype=float)
+    cors = np.asarray(cors, dtype=float)
+    n = len(rows)
+    if n < 2:
+        raise ValueError("CamRot needs at least two heights")
+    A = np.column_stack([np.ones(n), rows])
+    (intercept, slope), *_ = np.linalg.lstsq(A, cors, rcond=None)
+    resid = cors - (intercept + slope * rows)
+    rms = float(np.sqrt(np.mean(resid ** 2)))
+    angle_err = None
+    if n > 2:
+        sxx = float(np.sum((rows - rows.mean()) ** 2))
+        slope_err = math.sqrt(float(resid @ resid) / (n - 2) / sxx)
+        angle_err = math.degrees(slope_err / (1.0 + slope * slope))
+    return {
+        "angle_deg": math.degrees(math.atan(-slope)),
+        "slope": float(slope),
+        "intercept": float(intercept),
+        "rms": rms,
+        "angle_err_deg": angle_err,
+    }
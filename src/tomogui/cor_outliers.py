@@ -0,0 +1,372 @@
+"""
+COR outlier engine for TomoGUI
+Series-aware outlier detection and gap filling on NumPy arrays.
+
+Every series (see ``series_index``) is handled as two arrays, scan index
+and COR (NaN = missing), sorted by index.  A robust trend is fitted per
+series and CORs too far from it are flagged:
+
+``median``   constant trend = series median (the original Fix COR
+             Outliers rule); flagged values get the average of their two
+             nearest good neighbours.
+``rolling``  rolling median over ``window`` neighbouring scans, so slow
+             COR drift along a long series is not mistaken for outliers;
+             flagged values are interpolated over scan index.
+``huber``    linear drift ``a + b*index`` fitted by iteratively
+             reweighted least squares with Huber weights.
+``ransac``   linear drift fitted by RANSAC on random pairs, refit on the
+             consensus set.
+
+In every mode ``thr = min(max_thresh, max(abs_thresh, mad_k * MAD))``
+with MAD taken over the residuals to the trend.  Missing CORs are only
+filled when good values bracket them and agree within ``abs_thresh``;
+whatever is still missing afterwards gets the mean of the series over
+the whole table.  Results are plain ``CorChange`` / ``CorSkip`` records,
+so the engine runs headless on a ``DatasetStore``::
+
+    python -m tomogui.cor_outliers --folder <data> [--method rolling] [--write]
+    python -m tomogui.cor_outliers --bench [--n 10000]
+"""
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+METHODS = ("median", "rolling", "huber", "ransac")
+METHOD_LABELS = {
+    "median": "median/MAD",
+    "rolling": "rolling median",
+    "huber": "Huber drift",
+    "ransac": "RANSAC drift",
+}
+
+
+class CorRow(NamedTuple):
+    """One scan as seen by the engine."""
+    path: str
+    series: str
+    index: int
+    cor: Optional[float]      # None = missing
+    selected: bool = True     # only selected rows are changed
+
+
+class CorChange(NamedTuple):
+    path: str
+    series: str
+    old: Optional[float]
+    new: float
+    kind: str                 # "outlier" | "gap" | "series-mean"
+    reason: str
+
+
+class CorSkip(NamedTuple):
+    path: str
+    series: str
+    reason: str
+
+
+# ----- trend fits (x = scan index, y = COR, both without NaN) -----
+def _mad(r):
+    return float(np.median(np.abs(r - np.median(r)))) if r.size else 0.0
+
+
+def _rolling_median(y, window):
+    """Centered rolling median of y (NaN-aware), same length as y."""
+    half = max(1, int(window) // 2)
+    padded = np.pad(y.astype(float), half, mode="constant", constant_values=np.nan)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1)
+    return np.nanmedian(windows, axis=1)
+
+
+def _huber_line(x, y, c=1.345, n_iter=20):
+    """IRLS linear fit with Huber weights; returns (intercept, slope)."""
+    A = np.column_stack([np.ones_like(x), x])
+    w = np.ones_like(y)
+    coef = np.zeros(2)
+    for _ in range(n_iter):
+        sw = np.sqrt(w)
+        new, *_ = np.linalg.lstsq(A * sw[:, None], y * sw, rcond=None)
+        r = y - A @ new
+        scale = 1.4826 * _mad(r) or 1e-9
+        u = np.abs(r) / (c * scale)
+        w = np.where(u <= 1.0, 1.0, 1.0 / np.maximum(u, 1e-12))
+        if np.allclose(new, coef, atol=1e-6):
+            coef = new
+            break
+        coef = new
+    return coef
+
+
+def _ransac_line(x, y, thr, n_trials=200, seed=0):
+    """RANSAC linear fit (pairs of points), refit on the best consensus set."""
+    n = x.size
+    rng = np.random.default_rng(seed)
+    i = rng.integers(0, n, n_trials)
+    j = rng.integers(0, n, n_trials)
+    ok = x[i] != x[j]
+    i, j = i[ok], j[ok]
+    if i.size == 0:
+        return np.array([np.median(y), 0.0])
+    slope = (y[j] - y[i]) / (x[j] - x[i])
+    icpt = y[i] - slope * x[i]
+    # (trials, n) residual matrix in blocks keeps memory bounded for 10k scans
+    best, best_count = None, -1
+    for k in range(0, slope.size, 32):
+        res = np.abs(y[None, :] - (icpt[k:k + 32, None] + slope[k:k + 32, None] * x[None, :]))
+        counts = (res <= thr).sum(axis=1)
+        m = int(np.argmax(counts))
+        if counts[m] > best_count:
+            best_count, best = int(counts[m]), (res[m] <= thr)
+    A = np.column_stack([np.ones_like(x[best]), x[best]])
+    coef, *_ = np.linalg.lstsq(A, y[best], rcond=None)
+    return coef
+
+
+def _neighbours(good):
+    """Position of the nearest good entry to the left / right (-1 = none)."""
+    n = good.size
+    pos = np.arange(n)
+    left = np.where(good, pos, -1)
+    left = np.maximum.accumulate(left)
+    left = np.concatenate(([-1], left[:-1]))
+    right = np.where(good, pos, n)
+    right = np.minimum.accumulate(right[::-1])[::-1]
+    right = np.concatenate((right[1:], [n]))
+    right = np.where(right >= n, -1, right)
+    return left, right
+
+
+def fix_series(index, cor, method="median", abs_thresh=10.0, mad_k=5.0,
+               max_thresh=50.0, window=15):
+    """Outliers and gaps of one series.
+
+    Args:
+        index: scan indices, sorted ascending (array-like of numbers)
+        cor: CORs, NaN = missing (same length)
+
+    Returns:
+        tuple: (new, kind, reason) - ``new`` has the replacement values
+        (NaN where nothing is proposed), ``kind`` is an object array of
+        "outlier" / "gap" / "" and ``reason`` a list of strings; entries
+        that could not be filled have kind "skip" and the reason why.
+    """
+    x = np.asarray(index, dtype=float)
+    y = np.asarray(cor, dtype=float)
+    n = y.size
+    new = np.full(n, np.nan)
+    kind = np.full(n, "", dtype=object)
+    reason = [""] * n
+    missing = np.isnan(y)
+    valid = ~missing
+    if n < 2:
+        return new, kind, reason
+    if valid.sum() < 2:
+        kind[missing] = "skip"
+        for i in np.flatnonzero(missing):
+            reason[i] = "series has <2 numeric CORs"
+        return new, kind, reason
+
+    xv, yv = x[valid], y[valid]
+    if method == "median":
+        trend_v = np.full(yv.size, np.median(yv))
+    elif method == "rolling":
+        trend_v = _rolling_median(yv, window)
+    elif method == "huber":
+        a, b = _huber_line(xv, yv)
+        trend_v = a + b * xv
+    elif method == "ransac":
+        a, b = _ransac_line(xv, yv, thr=abs_thresh)
+        trend_v = a + b * xv
+    else:
+        raise ValueError(f"unknown method {method!r} (expected one of {METHODS})")
+    resid = yv - trend_v
+    mad = _mad(resid)
+    thr = min(max_thresh, max(abs_thresh, mad_k * mad))
+
+    outlier = np.zeros(n, dtype=bool)
+    outlier[valid] = np.abs(resid) > thr
+    flagged = outlier | missing
+    if not flagged.any():
+        return new, kind, reason
+    good = ~flagged
+    left, right = _neighbours(good)
+    has_l, has_r = left >= 0, right >= 0
+    yl = np.where(has_l, y[np.maximum(left, 0)], np.nan)
+    yr = np.where(has_r, y[np.maximum(right, 0)], np.nan)
+
+    if method == "median":
+        # average of the two nearest good neighbours, or the one that exists
+        est = np.where(has_l & has_r, 0.5 * (yl + yr), np.where(has_l, yl, yr))
+    elif method == "rolling":
+        est = np.interp(x, x[good], y[good]) if good.any() else np.full(n, np.nan)
+    else:
+        est = a + b * x
+
+    for i in np.flatnonzero(flagged):
+        l_txt = f"{yl[i]:.2f}" if has_l[i] else None
+        r_txt = f"{yr[i]:.2f}" if has_r[i] else None
+        if missing[i]:
+            if not (has_l[i] and has_r[i]):
+                kind[i] = "skip"
+                side = "left" if has_l[i] else "right" if has_r[i] else None
+                reason[i] = (f"only {side} neighbour known ({l_txt or r_txt})" if side
+                             else "no good neighbour")
+                continue
+            if abs(yl[i] - yr[i]) > abs_thresh:
+                kind[i] = "skip"
+                reason[i] = (f"neighbours {l_txt} / {r_txt} differ by "
+                             f"{abs(yl[i] - yr[i]):.2f}  (> {abs_thresh})")
+                continue
+        if np.isnan(est[i]):
+            continue
+        new[i] = est[i]
+        kind[i] = "gap" if missing[i] else "outlier"
+        if method == "median":
+            reason[i] = (f"avg({l_txt}, {r_txt})" if l_txt and r_txt
+                         else f"left only = {l_txt}" if l_txt else f"right only = {r_txt}")
+        else:
+            reason[i] = f"{METHOD_LABELS[method]} trend = {est[i]:.2f} (thr {thr:.1f})"
+    return new, kind, reason
+
+
+def fix_outliers(rows, method="median", abs_thresh=10.0, mad_k=5.0,
+                 max_thresh=50.0, window=15):
+    """Run the engine over every series of ``rows`` (iterable of CorRow).
+
+    Only selected rows are changed; unselected rows still count as
+    series-mean donors.
+
+    Returns:
+        tuple: (changes, skipped, n_series) - lists of CorChange /
+        CorSkip in series/index order, and the number of series that had
+        selected rows.
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault(row.series, []).append(row)
+    changes, skipped = [], []
+    n_series = 0
+    still_missing = []      # selected rows without a COR after the fit
+    final = {}              # path -> COR after the fit (donor values)
+    for series, members in groups.items():
+        members.sort(key=lambda r: (r.index, r.path))
+        for r in members:
+            if r.cor is not None:
+                final[r.path] = r.cor
+        sel = [r for r in members if r.selected]
+        if not sel:
+            continue
+        n_series += 1
+        idx = np.array([r.index for r in sel], dtype=float)
+        cor = np.array([np.nan if r.cor is None else r.cor for r in sel], dtype=float)
+        new, kind, reason = fix_series(idx, cor, method, abs_thresh, mad_k, max_thresh, window)
+        for i, r in enumerate(sel):
+            if kind[i] in ("outlier", "gap"):
+                changes.append(CorChange(r.path, series, r.cor, float(new[i]), kind[i], reason[i]))
+                final[r.path] = float(new[i])
+            elif r.cor is None:
+                # neighbour-fill reasons are superseded by the series-mean pass
+                still_missing.append(r)
+
+    # Missing-COR fill: mean of the series over the whole table (after the fit)
+    donors = {}
+    for series, members in groups.items():
+        vals = [final[r.path] for r in members if r.path in final]
+        if vals:
+            donors[series] = (float(np.mean(vals)), len(vals))
+    for r in still_missing:
+        mean, n_donors = donors.get(r.series, (None, 0))
+        if not n_donors:
+            skipped.append(CorSkip(r.path, r.series, "no COR donor in series (whole table)"))
+            continue
+        changes.append(CorChange(r.path, r.series, None, mean, "series-mean",
+                                 f"series-mean of {n_donors} donor(s)"))
+    return changes, skipped, n_series
+
+
+def rows_from_store(store, selected=None):
+    """CorRows of every scan in a DatasetStore (headless use).
+
+    ``selected``: set of paths to change (None = all).
+    """
+    rows = []
+    for path in store.find():
+        info = store.scan_info(path)
+        try:
+            cor = float(info["cor"])
+        except (TypeError, ValueError):
+            cor = None
+        rows.append(CorRow(path, info["series"] or "", info["series_idx"] or 0, cor,
+                           selected is None or path in selected))
+    return rows
+
+
+def _synthetic_series(n, rng):
+    """Drifting COR series with 2% outliers and 2% gaps."""
+    idx = np.arange(n)
+    cor = 1200.0 + 0.004 * idx + rng.normal(0, 0.6, n)
+    bad = rng.random(n) < 0.02
+    cor[bad] += rng.choice([-1, 1], bad.sum()) * rng.uniform(30, 200, bad.sum())
+    cor[rng.random(n) < 0.02] = np.nan
+    return idx, cor
+
+
+def benchmark(n=10000, repeat=3):
+    """Time every method on one n-scan series; returns {method: seconds}."""
+    import time
+    rng = np.random.default_rng(1)
+    idx, cor = _synthetic_series(n, rng)
+    out = {}
+    for method in METHODS:
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            new, kind, _ = fix_series(idx, cor, method)
+            best = min(best, time.perf_counter() - t0)
+        out[method] = (best, int((kind == "outlier").sum()), int((kind == "gap").sum()))
+    return out
+
+
+def main(argv=None):
+    import argparse
+    import os
+    parser = argparse.ArgumentParser(prog="python -m tomogui.cor_outliers",
+                                     description="Series-aware COR outlier detection.")
+    parser.add_argument("--folder", help="data folder with a .tomogui.db")
+    parser.add_argument("--method", choices=METHODS, default="median")
+    parser.add_argument("--max-delta", type=float, default=50.0)
+    parser.add_argument("--window", type=int, default=15)
+    parser.add_argument("--write", action="store_true", help="store the new CORs")
+    parser.add_argument("--bench", action="store_true", help="benchmark on a synthetic series")
+    parser.add_argument("--n", type=int, default=10000, help="scans in the benchmark series")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        for method, (sec, n_out, n_gap) in benchmark(args.n).items():
+            print(f"{method:<8} {args.n} scans: {sec * 1e3:8.1f} ms  "
+                  f"({n_out} outliers, {n_gap} gaps filled)")
+        return
+    if not args.folder:
+        parser.error("--folder or --bench is required")
+    from .dataset_store import DatasetStore, DB_NAME
+    if not os.path.exists(os.path.join(args.folder, DB_NAME)):
+        parser.error(f"no {DB_NAME} in {args.folder}")
+    store = DatasetStore(args.folder)
+    try:
+        changes, skipped, n_series = fix_outliers(
+            rows_from_store(store), args.method, max_thresh=args.max_delta, window=args.window)
+        for c in changes:
+            old = "(empty)" if c.old is None else f"{c.old:.2f}"
+            print(f"{os.path.basename(c.path)} [{c.series}] {old} -> {c.new:.2f}  [{c.reason}]")
+        for s in skipped:
+            print(f"{os.path.basename(s.path)} [{s.series}] skipped - {s.reason}")
+        print(f"{len(changes)} change(s), {len(skipped)} skipped, {n_series} series")
+        if args.write and changes:
+            store.set_cors({c.path: f"{c.new:.2f}" for c in changes})
+            store.export_legacy()
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+"""
+COR predictor for TomoGUI
+Predicts the rotation centre of a scan from cheap HDF5 metadata.
+
+Features are the scalar motor positions under the sample motor stack,
+the beam energy, the acquisition start time (hours) and the scan index
+within its series - a few small datasets per file, no image data.  They
+are read once per file and cached in the folder's DatasetStore.
+
+The model is a ridge regression on standardised features.  Its normal
+equations (``X^T X``, ``X^T y``) are kept as running sums, so adding or
+correcting one solved scan is a rank-1 update and a prediction costs one
+small linear solve.  The regression is followed by a local correction:
+the mean residual of the nearest solved scans of the same series, which
+absorbs per-series offsets and drift the metadata does not explain.
+
+Each new COR is predicted before it is learned; the recent prediction
+errors give the half-width the Try phase has to search around the seed
+(``search_width``), instead of the fixed ``--center-search-width``.
+
+    python -m tomogui.cor_predictor --folder <data> [--read]
+    python -m tomogui.cor_predictor --bench [--n 2000]
+"""
+
+import math
+import os
+from bisect import bisect_left, insort
+from collections import deque
+from datetime import datetime
+
+import h5py
+import numpy as np
+
+from .series_index import parse_series
+
+# groups whose scalar datasets are motor positions (DXfile layout)
+MOTOR_GROUPS = (
+    "/measurement/instrument/sample_motor_stack/setup",
+)
+# single datasets, feature name -> HDF5 path
+METADATA_DATASETS = {
+    "energy": "/measurement/instrument/monochromator/energy",
+}
+START_TIME = "/process/acquisition/start_date"
+
+
+def _scalar(dset):
+    """Float value of a one-element numeric dataset, or None."""
+    if dset.size != 1 or dset.dtype.kind not in "iuf":
+        return None
+    value = float(np.asarray(dset[()]).reshape(-1)[0])
+    return value if math.isfinite(value) else None
+
+
+def _start_hours(f, path):
+    """Acquisition start in hours since the epoch (file mtime if absent)."""
+    dset = f.get(START_TIME)
+    if dset is not None:
+        try:
+            raw = np.asarray(dset[()]).reshape(-1)[0]
+            if isinstance(raw, bytes):
+                raw = raw.decode(errors="replace")
+            return datetime.fromisoformat(str(raw).strip()).timestamp() / 3600.0
+        except (ValueError, IndexError, TypeError):
+            pass
+    return os.stat(path).st_mtime / 3600.0
+
+
+def read_scan_features(path):
+    """Scalar metadata of one scan.
+
+    Returns:
+        tuple: (file mtime, {feature name: float})
+    """
+    mtime = os.stat(path).st_mtime
+    feats = {"scan_index": float(parse_series(path)[1])}
+    with h5py.File(path, "r") as f:
+        for group_path in MOTOR_GROUPS:
+            group = f.get(group_path)
+            if not isinstance(group, h5py.Group):
+                continue
+            for name, obj in group.items():
+                if isinstance(obj, h5py.Dataset):
+                    value = _scalar(obj)
+                    if value is not None:
+                        feats[name] = value
+        for name, dset_path in METADATA_DATASETS.items():
+            obj = f.get(dset_path)
+            if isinstance(obj, h5py.Dataset):
+                value = _scalar(obj)
+                if value is not None:
+                    feats[name] = value
+        feats["time_h"] = _start_hours(f, path)
+    return mtime, feats
+
+
+def load_features(store, paths, read=read_scan_features):
+    """Features of ``paths`` from the store, reading the files it lacks.
+
+    Returns:
+        tuple: ({path: features}, {path: (mtime, features)} newly read -
+        hand these to ``DatasetStore.set_features``), unreadable paths
+        are left out of both.
+    """
+    paths = list(paths)
+    out = store.load_features(paths) if store is not None else {}
+    new = {}
+    for path in paths:
+        if path in out:
+            continue
+        try:
+            mtime, feats = read(path)
+        except (OSError, KeyError, ValueError):
+            continue
+        out[path] = feats
+        new[path] = (mtime, feats)
+    return out, new
+
+
+class CorPredictor:
+    """Incremental ridge regression of COR on scan metadata.
+
+    The feature set is the intersection of the features of all samples;
+    a sample lacking one of them shrinks the set and the running sums are
+    rebuilt from the stored samples (rare - scans of one beamline carry
+    the same metadata).
+    """
+
+    def __init__(self, alpha=1.0, neighbours=3, min_samples=4, history=50):
+        self.alpha = alpha
+        self.neighbours = neighbours
+        self.min_samples = min_samples
+        self._samples = {}      # path -> (features, cor, series, index)
+        self._series = {}       # series -> sorted [(index, path)]
+        self._names = None      # feature names in use
+        self._offset = None     # per-feature reference value (numerics)
+        self._xtx = None        # running X^T X over [1, features - offset]
+        self._xty = None
+        self._yty = 0.0
+        self._coef = None       # (intercept, beta, rmse), None = stale
+        self._errors = deque(maxlen=history)   # |prediction - COR| of new samples
+
+    def __len__(self):
+        return len(self._samples)
+
+    def knows(self, path, cor):
+        """True if ``path`` was learned with this COR already."""
+        sample = self._samples.get(path)
+        return sample is not None and sample[1] == cor
+
+    def features_of(self, path):
+        sample = self._samples.get(path)
+        return None if sample is None else sample[0]
+
+    # ----- running sums -----
+    def _vector(self, feats):
+        x = np.empty(len(self._names) + 1)
+        x[0] = 1.0
+        for i, name in enumerate(self._names):
+            x[i + 1] = feats[name] - self._offset[i]
+        return x
+
+    def _rebuild(self):
+        names = None
+        for feats, _, _, _ in self._samples.values():
+            names = set(feats) if names is None else names & set(feats)
+        self._names = tuple(sorted(names or ()))
+        self._coef = None
+        if not self._samples:
+            self._offset = None
+            self._xtx = self._xty = None
+            self._yty = 0.0
+            return
+        first = next(iter(self._samples.values()))[0]
+        self._offset = np.array([first[name] for name in self._names])
+        X = np.array([self._vector(s[0]) for s in self._samples.values()])
+        y = np.array([s[1] for s in self._samples.values()])
+        self._xtx = X.T @ X
+        self._xty = X.T @ y
+        self._yty = float(y @ y)
+
+    def _accumulate(self, feats, cor, sign):
+        x = self._vector(feats)
+        self._xtx += sign * np.outer(x, x)
+        self._xty += sign * cor * x
+        self._yty += sign * cor * cor
+        self._coef = None
+
+    def _solve(self):
+        """(intercept, beta, rmse) in raw feature units (cached)."""
+        if self._coef is not None:
+            return self._coef
+        n = self._xtx[0, 0]
+        mean = self._xtx[0, 1:] / n
+        y_mean = self._xty[0] / n
+        cov = self._xtx[1:, 1:] / n - np.outer(mean, mean)
+        cxy = self._xty[1:] / n - mean * y_mean
+        scale = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+        scale[scale < 1e-12] = 1.0
+        A = cov / np.outer(scale, scale) + (self.alpha / n) * np.eye(len(scale))
+        beta = np.linalg.solve(A, cxy / scale) / scale if len(scale) else np.zeros(0)
+        intercept = y_mean - beta @ mean
+        var_y = self._yty / n - y_mean * y_mean
+        mse = var_y - 2.0 * beta @ cxy + beta @ cov @ beta
+        self._coef = (intercept, beta, math.sqrt(max(mse, 0.0)))
+        return self._coef
+
+    def _base(self, feats):
+        intercept, beta, _ = self._solve()
+        return intercept + beta @ self._vector(feats)[1:]
+
+    # ----- learning -----
+    def add(self, path, feats, cor, score=True):
+        """Learn (or correct) the COR of one scan.
+
+        With ``score`` the scan is predicted first and the error kept for
+        ``search_width``.
+        """
+        cor = float(cor)
+        series, index = parse_series(path)
+        if score and path not in self._samples:
+            pred = self.predict(path, feats)
+            if pred is not None:
+                self._errors.append(abs(pred[0] - cor))
+        old = self._samples.get(path)
+        if old is not None:
+            self.remove(path)
+        self._samples[path] = (feats, cor, series, index)
+        insort(self._series.setdefault(series, []), (index, path))
+        if self._xtx is None or not all(name in feats for name in self._names):
+            self._rebuild()
+        else:
+            self._accumulate(feats, cor, +1)
+
+    def remove(self, path):
+        sample = self._samples.pop(path, None)
+        if sample is None:
+            return
+        feats, cor, series, index = sample
+        keys = self._series[series]
+        del keys[bisect_left(keys, (index, path))]
+        if not keys:
+            del self._series[series]
+        if self._samples:
+            self._accumulate(feats, cor, -1)
+        else:
+            self._rebuild()
+
+    def fit(self, samples):
+        """Learn [(path, feats, cor)] given in acquisition order.
+
+        Only the last ``history`` samples are scored, so the error
+        estimate reflects the full model rather than its first few fits.
+        """
+        samples = list(samples)
+        n_plain = max(0, len(samples) - (self._errors.maxlen or 0))
+        for i, (path, feats, cor) in enumerate(samples):
+            self.add(path, feats, cor, score=i >= n_plain)
+
+    # ----- prediction -----
+    def predict(self, path, feats):
+        """(COR, expected error) of a scan, or None with too few samples."""
+        if len(self._samples) < self.min_samples or self._names is None:
+            return None
+        if not all(name in feats for name in self._names):
+            return None
+        base = self._base(feats)
+        series, index = parse_series(path)
+        keys = self._series.get(series, [])
+        pos = bisect_left(keys, (index, path))
+        lo, hi = pos - 1, pos
+        near = []
+        while len(near) < self.neighbours and (lo >= 0 or hi < len(keys)):
+            d_lo = index - keys[lo][0] if lo >= 0 else math.inf
+            d_hi = keys[hi][0] - index if hi < len(keys) else math.inf
+            if d_lo <= d_hi:
+                key, lo = keys[lo], lo - 1
+            else:
+                key, hi = keys[hi], hi + 1
+            if key[1] != path:
+                near.append(key)
+        if near:
+            weights = np.array([1.0 / (1.0 + abs(i - index)) for i, _ in near])
+            resid = np.array([self._samples[p][1] - self._base(self._samples[p][0])
+                              for _, p in near])
+            base += float(weights @ resid / weights.sum())
+        return float(base), self.error()
+
+    def error(self):
+        """Typical prediction error: 90th percentile of the recent errors,
+        else the training RMSE while fewer than 10 are known."""
+        if len(self._errors) >= 10:
+            return float(np.percentile(self._errors, 90))
+        if self._xtx is None or len(self._samples) < self.min_samples:
+            return None
+        return self._solve()[2]
+
+    def search_width(self, default, min_width=5.0, margin=2.0):
+        """Try-phase search half-width around a predicted seed.
+
+        ``margin`` times the recent 90th percentile error, never below
+        ``min_width`` or above ``default``; ``default`` until ten scored
+        predictions are available.
+        """
+        if len(self._errors) < 10:
+            return default
+        width = math.ceil(margin * float(np.percentile(self._errors, 90)))
+        return float(min(default, max(min_width, width)))
+
+
+def _synthetic_scans(n, rng):
+    """n scans of one series: COR follows sample_x, energy and slow drift."""
+    out = []
+    t0 = 480000.0
+    for i in range(n):
+        feats = {
+            "scan_index": float(i),
+            "sample_x": float(rng.choice([-2.0, 0.0, 1.5])),
+            "sample_y": float(rng.uniform(0, 10)),
+            "energy": float(rng.choice([20.0, 25.0])),
+            "time_h": t0 + 0.05 * i,
+        }
+        cor = (1200.0 + 95.0 * feats["sample_x"] + 2.0 * (feats["energy"] - 20.0)
+               + 0.003 * i + rng.normal(0, 0.4))
+        out.append((f"synthetic_{i:05d}.h5", feats, cor))
+    return out
+
+
+def benchmark(n=2000):
+    """Learn n synthetic scans one at a time; returns timing and errors."""
+    import time
+    rng = np.random.default_rng(2)
+    scans = _synthetic_scans(n, rng)
+    pred = CorPredictor(history=n)
+    t0 = time.perf_counter()
+    for path, feats, cor in scans:
+        pred.add(path, feats, cor)
+    elapsed = time.perf_counter() - t0
+    errors = np.array(pred._errors)
+    cors = np.array([c for _, _, c in scans])
+    return {
+        "per_update_ms": elapsed / n * 1e3,
+        "median_err": float(np.median(errors)),
+        "p90_err": float(np.percentile(errors, 90)),
+        "mean_seed_err": float(np.mean(np.abs(cors - cors.mean()))),
+        "search_width": pred.search_width(50.0),
+    }
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m tomogui.cor_predictor",
+                                     description="COR prediction from scan metadata.")
+    parser.add_argument("--folder", help="data folder with a .tomogui.db")
+    parser.add_argument("--read", action="store_true",
+                        help="read metadata of scans the store has no features for")
+    parser.add_argument("--bench", action="store_true", help="run on a synthetic series")
+    parser.add_argument("--n", type=int, default=2000, help="scans in the benchmark series")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        r = benchmark(args.n)
+        print(f"{args.n} scans: {r['per_update_ms']:.3f} ms per predict+update, "
+              f"|error| median {r['median_err']:.2f} px, p90 {r['p90_err']:.2f} px "
+              f"(series mean would be ~{r['mean_seed_err']:.0f} px off), "
+              f"search width 50 -> {r['search_width']:g}")
+        return
+    if not args.folder:
+        parser.error("--folder or --bench is required")
+    from .dataset_store import DatasetStore, DB_NAME
+    if not os.path.exists(os.path.join(args.folder, DB_NAME)):
+        parser.error(f"no {DB_NAME} in {args.folder}")
+    store = DatasetStore(args.folder)
+    try:
+        solved = store.find(has_cor=True)
+        if args.read:
+            feats, new = load_features(store, solved)
+            store.set_features(new)
+        else:
+            feats = store.load_features(solved)
+        samples = []
+        for path in solved:
+            if path in feats:
+                info = store.scan_info(path)
+                try:
+                    samples.append((feats[path]["time_h"], path, float(info["cor"])))
+                except (KeyError, TypeError, ValueError):
+                    continue
+        samples.sort()
+        pred = CorPredictor(history=len(samples))
+        pred.fit((p, feats[p], c) for _, p, c in samples)
+        errors = np.array(pred._errors)
+        print(f"{len(samples)} solved scan(s) with metadata, "
+              f"{len(pred._names or ())} feature(s): {', '.join(pred._names or ())}")
+        if len(errors):
+            print(f"one-step-ahead |error|: median {np.median(errors):.2f} px, "
+                  f"p90 {np.percentile(errors, 90):.2f} px; "
+                  f"search width 50 -> {pred.search_width(50.0):g}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+COR contact sheet for TomoGUI
+All Try candidates of a scan side by side, with the AI scores.
+
+Judging a Try by stepping the slider decodes and draws one full slice per
+candidate.  The contact sheet shows every candidate at once as a small
+tile instead:
+
+- ``ThumbnailLoader`` reads the Try TIFFs on a thread pool and reduces
+  each to at most ``THUMB_SIZE`` px by 2 x 2 block means.  Thumbnails are
+  cached by path, mtime and size, so reopening the sheet (or a sheet for
+  the same scan after a colormap change) reads nothing.  Candidates
+  closest to the AI pick are read first.
+- ``CorSheetDialog`` lays the tiles out in a scrollable grid, all with
+  the same colormap and Min / Max so they compare fairly.  The AI-picked
+  COR has a green frame; when the inference scores are known they are
+  plotted above the grid, the tile's score is in its caption, and the
+  selected candidate is marked on the curve.  Clicking a tile emits
+  ``tile_clicked`` with the candidate's index; TomoGUI then shows that
+  slice at full resolution in the main viewer.
+
+    python -m tomogui.cor_sheet --bench [--size 2048] [--count 64]
+
+compares decoding every candidate (what the slider does) with building
+the thumbnails in parallel and with a cached sheet.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from PyQt5.QtCore import QObject, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QIcon, QImage, QPixmap
+from PyQt5.QtWidgets import (
+    QDialog, QGridLayout, QHBoxLayout, QLabel, QScrollArea, QSpinBox,
+    QToolButton, QVBoxLayout, QWidget,
+)
+
+from .image_pyramid import downsample2
+from .image_stats import sample_percentiles
+from .lut_render import colormap_lut
+from .tiff_reader import read_tiff
+
+THUMB_SIZE = 256
+_CENTER_RE = re.compile(r'center(\d+\.\d+)')
+
+
+def cor_of(path):
+    """COR in a Try file name ``...center<cor>.tiff``, or None."""
+    m = _CENTER_RE.search(os.path.basename(path))
+    return float(m.group(1)) if m else None
+
+
+def thumbnail(path, size=THUMB_SIZE):
+    """Slice ``path`` reduced by 2 x 2 block means until its longer edge is
+    below ``2 * size`` (float32)."""
+    img = read_tiff(path, mmap=False)
+    if img.ndim == 3:
+        img = img[..., 0]
+    while max(img.shape) >= 2 * size:
+        img = downsample2(img)
+    return np.asarray(img, dtype=np.float32)
+
+
+def to_qimage(img, lut, lo, hi):
+    """RGB QImage of ``img`` mapped through ``lut`` over [lo, hi]."""
+    scale = 255.0 / (hi - lo) if hi > lo else 0.0
+    idx = np.nan_to_num((img - lo) * scale, nan=0.0, posinf=255.0, neginf=0.0)
+    rgb = np.ascontiguousarray(lut[np.clip(idx, 0, 255).astype(np.uint8)])
+    h, w = rgb.shape[:2]
+    return QImage(rgb.data, w, h, 3 * w, QImage.Format_RGB888).copy()
+
+
+def _key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+class ThumbnailLoader(QObject):
+    """Cached thumbnails of slice files, built on a thread pool; only the
+    newest ``request`` is answered."""
+    ready = pyqtSignal(int, int, object)     # request id, file index, thumbnail (None if unreadable)
+
+    def __init__(self, size=THUMB_SIZE, workers=4, max_entries=1024):
+        super().__init__()
+        self.size = size
+        self.max_entries = max_entries
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cor-thumb")
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()     # path -> (key, thumbnail)
+        self._latest = 0
+
+    def request(self, files, order=None):
+        """Thumbnails of ``files`` (in ``order`` of indices, if given);
+        returns the request id.  Earlier requests are dropped."""
+        with self._lock:
+            self._latest += 1
+            rid = self._latest
+        for i in (range(len(files)) if order is None else order):
+            self._pool.submit(self._load, rid, i, files[i])
+        return rid
+
+    def cancel(self):
+        with self._lock:
+            self._latest += 1
+
+    def shutdown(self):
+        self.cancel()
+        self._pool.shutdown(wait=False)
+
+    def _cached(self, key):
+        with self._lock:
+            entry = self._cache.get(key[0])
+            if entry is None or entry[0] != key:
+                return None
+            self._cache.move_to_end(key[0])
+            return entry[1]
+
+    def _store(self, key, thumb):
+        with self._lock:
+            self._cache[key[0]] = (key, thumb)
+            self._cache.move_to_end(key[0])
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _load(self, rid, index, path):
+        with self._lock:
+            if rid != self._latest:
+                return
+        key = _key(path)
+        thumb = self._cached(key) if key else None
+        if thumb is None and key is not None:
+            try:
+                thumb = thumbnail(path, self.size)
+                self._store(key, thumb)
+            except Exception:
+                thumb = None
+        with self._lock:
+            if rid != self._latest:
+                return
+        self.ready.emit(rid, index, thumb)
+
+
+class CorSheetDialog(QDialog):
+    """Grid of the Try candidates of one scan."""
+    tile_clicked = pyqtSignal(int)      # index into ``files``
+
+    def __init__(self, files, loader, result=None, cmap="gray", levels=None,
+                 title="", parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"COR candidates — {title}" if title else "COR candidates")
+        self.resize(1200, 900)
+        self.files = list(files)
+        self.cors = [cor_of(f) for f in self.files]
+        self.loader = loader
+        self.lut = colormap_lut(cmap, 3)
+        self.levels = levels
+        self.thumbs = {}
+        self.selected = None
+
+        # AI pick and scores (result dict of tomogui.result_channel)
+        self.ai_index = None
+        self.scores = {}
+        if result is not None and result.get("event") == "result":
+            for cor, score in result.get("scores", []):
+                self.scores[round(cor, 2)] = score
+            known = [(abs(c - result["cor"]), i) for i, c in enumerate(self.cors) if c is not None]
+            if known:
+                self.ai_index = min(known)[1]
+
+        layout = QVBoxLayout(self)
+        self.plot = None
+        self.sel_line = None
+        if self.scores:
+            self._build_plot(result["cor"])
+            layout.addWidget(self.plot)
+        controls = QHBoxLayout()
+        self.status = QLabel(f"0 / {len(self.files)} loaded")
+        controls.addWidget(self.status)
+        controls.addStretch(1)
+        controls.addWidget(QLabel("Tile size"))
+        self.tile_box = QSpinBox()
+        self.tile_box.setRange(96, 2 * THUMB_SIZE)
+        self.tile_box.setSingleStep(32)
+        self.tile_box.setValue(160)
+        self.tile_box.valueChanged.connect(self._relayout)
+        controls.addWidget(self.tile_box)
+        layout.addLayout(controls)
+
+        self.grid = QGridLayout()
+        self.grid.setSpacing(4)
+        holder = QWidget()
+        holder.setLayout(self.grid)
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(holder)
+        layout.addWidget(scroll, 1)
+
+        self.tiles = []
+        for i, path in enumerate(self.files):
+            btn = QToolButton()
+            btn.setToolButtonStyle(Qt.ToolButtonTextUnderIcon)
+            btn.setText(self._caption(i))
+            btn.setToolTip(os.path.basename(path))
+            btn.clicked.connect(lambda checked=False, i=i: self._on_click(i))
+            self.tiles.append(btn)
+        self._relayout()
+
+        self.loader.ready.connect(self._on_thumb)
+        self._rid = self.loader.request(self.files, self._load_order())
+
+    def _caption(self, i):
+        cor = self.cors[i]
+        txt = os.path.basename(self.files[i]) if cor is None else f"{cor:.2f}"
+        score = self.scores.get(round(cor, 2)) if cor is not None else None
+        if score is not None:
+            txt += f"  ({score:.3f})"
+        if i == self.ai_index:
+            txt = "AI  " + txt
+        return txt
+
+    def _load_order(self):
+        if self.ai_index is None:
+            return list(range(len(self.files)))
+        return sorted(range(len(self.files)), key=lambda i: abs(i - self.ai_index))
+
+    def _build_plot(self, ai_cor):
+        import pyqtgraph as pg
+        pts = sorted(self.scores.items())
+        self.plot = pg.PlotWidget()
+        self.plot.setMaximumHeight(180)
+        self.plot.setLabel("bottom", "COR")
+        self.plot.setLabel("left", "score")
+        self.plot.plot([c for c, _ in pts], [s for _, s in pts], pen=pg.mkPen("#1a8cff", width=2),
+                       symbol="o", symbolSize=4, symbolBrush="#1a8cff")
+        self.plot.addItem(pg.InfiniteLine(ai_cor, angle=90, pen=pg.mkPen("#2e7d32", width=2),
+                                          label="AI", labelOpts={"position": 0.9}))
+        self.sel_line = pg.InfiniteLine(ai_cor, angle=90, pen=pg.mkPen("#ff9800", style=Qt.DashLine))
+        self.sel_line.setVisible(False)
+        self.plot.addItem(self.sel_line)
+
+    def _relayout(self):
+        size = self.tile_box.value()
+        cols = max(1, (self.width() - 40) // (size + 12))
+        for btn in self.tiles:
+            self.grid.removeWidget(btn)
+        for i, btn in enumerate(self.tiles):
+            btn.setIconSize(QSize(size, size))
+            self.grid.addWidget(btn, i // cols, i % cols)
+        self._cols = cols
+        self._restyle()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if getattr(self, "tiles", None):
+            cols = max(1, (self.width() - 40) // (self.tile_box.value() + 12))
+            if cols != self._cols:
+                self._relayout()
+
+    def _restyle(self):
+        for i, btn in enumerate(self.tiles):
+            if i == self.selected:
+                btn.setStyleSheet("QToolButton { border: 3px solid #ff9800; }")
+            elif i == self.ai_index:
+                btn.setStyleSheet("QToolButton { border: 3px solid #2e7d32; font-weight: bold; }")
+            else:
+                btn.setStyleSheet("QToolButton { border: 1px solid #555; }")
+
+    def _on_thumb(self, rid, index, thumb):
+        if rid != self._rid:
+            return
+        self.thumbs[index] = thumb
+        if thumb is None:
+            self.tiles[index].setText(self._caption(index) + "\nunreadable")
+        else:
+            if self.levels is None:
+                lo, hi = sample_percentiles(thumb, [1, 99])
+                self.levels = (lo, hi) if hi > lo else (float(np.nanmin(thumb)), float(np.nanmax(thumb)) + 1e-6)
+            lo, hi = self.levels
+            self.tiles[index].setIcon(QIcon(QPixmap.fromImage(to_qimage(thumb, self.lut, lo, hi))))
+        self.status.setText(f"{len(self.thumbs)} / {len(self.files)} loaded")
+
+    def _on_click(self, i):
+        self.selected = i
+        self._restyle()
+        if self.sel_line is not None and self.cors[i] is not None:
+            self.sel_line.setValue(self.cors[i])
+            self.sel_line.setVisible(True)
+        self.tile_clicked.emit(i)
+
+    def done(self, r):
+        # close(), Esc and the window's X all end here
+        try:
+            self.loader.ready.disconnect(self._on_thumb)
+        except TypeError:
+            pass
+        self.loader.cancel()
+        super().done(r)
+
+
+def benchmark(size=2048, count=64, workers=4):
+    """Seconds to decode every candidate once (stepping the slider), to
+    build all thumbnails in parallel, and to fetch them again cached."""
+    import shutil
+    import tempfile
+    import time
+    from .tiff_reader import _write_tiff
+    rng = np.random.default_rng(0)
+    tmp = tempfile.mkdtemp(prefix="tomogui-sheet-bench-")
+    try:
+        files = []
+        for i in range(count):
+            p = os.path.join(tmp, f"recon_center{1000 + i * 0.5:.2f}.tiff")
+            _write_tiff(p, rng.random((size, size), dtype=np.float32))
+            files.append(p)
+        t0 = time.perf_counter()
+        for f in files:
+            read_tiff(f, mmap=False)
+        step_s = time.perf_counter() - t0
+        cache = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            t0 = time.perf_counter()
+            for f, th in zip(files, pool.map(thumbnail, files)):
+                cache[_key(f)] = th
+            build_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for f in files:
+            cache[_key(f)]
+        cached_s = time.perf_counter() - t0
+        shape = next(iter(cache.values())).shape
+        return {"step_s": step_s, "build_s": build_s, "cached_s": cached_s, "thumb": shape}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m tomogui.cor_sheet",
+                                     description="COR contact sheet benchmark.")
+    parser.add_argument("--bench", action="store_true", help="benchmark on synthetic Try slices")
+    parser.add_argument("--size", type=int, default=2048, help="slice edge length")
+    parser.add_argument("--count", type=int, default=64, help="number of candidates")
+    parser.add_argument("--workers", type=int, default=4, help="thumbnail threads")
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.error("--bench is required")
+    res = benchmark(args.size, args.count, args.workers)
+    h, w = res["thumb"]
+    print(f"decode {args.count} slices one by one: {res['step_s'] * 1e3:8.1f} ms")
+    print(f"thumbnails ({w}x{h}), {args.workers} threads: {res['build_s'] * 1e3:8.1f} ms")
+    print(f"thumbnails cached:              {res['cached_s'] * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
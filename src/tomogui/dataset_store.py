@@ -0,0 +1,586 @@
+"""
+Dataset store for TomoGUI
+Per-data-folder SQLite database with everything TomoGUI knows per scan.
+
+The database lives next to the data (``<data>/.tomogui.db``) so every
+TomoGUI instance working on the folder shares it.  SQLite's own file
+locking serialises writers across processes; a COR edit is a single
+UPSERT instead of a rewrite of the whole folder's ``rot_cen.json``.
+
+One ``files`` row per scan holds its COR, size/mtime, series key and
+index, reconstruction status (try count, full slice range) and a
+reference to its reconstruction parameters.  The scalar HDF5 metadata
+read by the COR predictor (motor positions, energy, start time) is kept
+per scan too, so each file is opened for it only once.  Parameter snapshots live
+once in ``param_sets``, keyed by a hash of their content, so a batch of
+500 files stores one snapshot and 500 references.
+
+The legacy files stay supported:
+
+* on first open (or when a legacy file is newer than the last sync) the
+  values of ``batch_cor_values.csv`` (takes priority) or ``rot_cen.json``
+  and the snapshots of ``recon_params.json`` are imported;
+* ``export_legacy()`` rewrites them atomically via a temp file +
+  ``os.replace``, for tools that still read them.  The GUI exports when
+  it leaves a folder and on exit.
+
+``python -m tomogui.dataset_store <data folder> [--series S] [--no-full]``
+lists what the store knows about a folder.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .series_index import parse_series
+
+DB_NAME = ".tomogui.db"
+COR_JSON = "rot_cen.json"
+COR_CSV = "batch_cor_values.csv"
+PARAMS_JSON = "recon_params.json"
+PARAMS_JSON_VERSION = 2
+
+SCHEMA_VERSION = 3
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS files (
+           path TEXT PRIMARY KEY,
+           filename TEXT NOT NULL,
+           cor TEXT,
+           cor_updated REAL
+       )""",
+    """CREATE TABLE IF NOT EXISTS meta (
+           key TEXT PRIMARY KEY,
+           value TEXT
+       )""",
+    """CREATE TABLE IF NOT EXISTS param_sets (
+           hash TEXT PRIMARY KEY,
+           params TEXT NOT NULL,
+           created REAL
+       )""",
+]
+# columns added to ``files`` in schema 2 (ALTER TABLE on older databases)
+_FILES_V2 = [
+    ("size", "INTEGER"),
+    ("mtime", "REAL"),
+    ("series", "TEXT"),
+    ("series_idx", "INTEGER"),
+    ("try_count", "INTEGER"),
+    ("full_count", "INTEGER"),
+    ("full_first", "INTEGER"),
+    ("full_last", "INTEGER"),
+    ("status_updated", "REAL"),
+    ("param_hash", "TEXT REFERENCES param_sets(hash)"),
+]
+# schema 3: scan metadata features (JSON) and the file mtime they were read at
+_FILES_V3 = [
+    ("features", "TEXT"),
+    ("features_mtime", "REAL"),
+]
+
+
+def params_hash(params):
+    """Content hash of a parameter snapshot (key order does not matter)."""
+    blob = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def decode_recon_params(data):
+    """{path: params} from either recon_params.json layout.
+
+    Version 1 maps every file path to a full snapshot.  Version 2 stores
+    each distinct snapshot once::
+
+        {"version": 2,
+         "param_sets": {"<hash>": {...params...}},
+         "files": {"<path>": "<hash>"}}
+
+    Path entries found next to a v2 layout (written by an older TomoGUI
+    after this one) are kept and win over the referenced set.
+    """
+    if not isinstance(data, dict):
+        return {}
+    per_file = {}
+    if data.get("version") == PARAMS_JSON_VERSION:
+        sets = data.get("param_sets") or {}
+        for path, digest in (data.get("files") or {}).items():
+            if isinstance(sets.get(digest), dict):
+                per_file[path] = sets[digest]
+    for key, value in data.items():
+        if key not in ("version", "param_sets", "files") and isinstance(value, dict):
+            per_file[key] = value
+    return per_file
+
+
+def encode_recon_params(sets, files):
+    """recon_params.json v2 document from {hash: params} and {path: hash}."""
+    return {"version": PARAMS_JSON_VERSION, "param_sets": sets, "files": files}
+
+
+def read_legacy_cors(data_folder, h5_files=()):
+    """Read ``batch_cor_values.csv`` (priority) or ``rot_cen.json``.
+
+    Returns:
+        tuple: (cor_data, source, error) - cor_data maps full path -> COR
+        text; source is the file name read (None if neither exists);
+        error is an exception message or None.
+    """
+    csv_path = os.path.join(data_folder, COR_CSV)
+    json_path = os.path.join(data_folder, COR_JSON)
+    error = None
+    if os.path.exists(csv_path):
+        try:
+            cor_data = {}
+            # CSV rows carry only the basename; map back to full paths
+            filename_to_path = {os.path.basename(f): f for f in h5_files}
+            with open(csv_path, 'r') as csvfile:
+                for row in csv.DictReader(csvfile):
+                    filename = (row.get('Filename') or '').strip()
+                    cor_value = (row.get('COR') or '').strip()
+                    if filename and cor_value:
+                        full_path = filename_to_path.get(
+                            filename, os.path.join(data_folder, filename))
+                        cor_data[full_path] = cor_value
+            return cor_data, COR_CSV, None
+        except Exception as e:
+            error = f"{COR_CSV}: {e}"
+    if os.path.exists(json_path):
+        try:
+            with open(json_path, 'r') as f:
+                raw = json.load(f)
+            # Normalise: values may be lists [cor] or bare numbers/strings
+            cor_data = {
+                k: str(v[0]) if isinstance(v, list) and v else str(v)
+                for k, v in raw.items()
+            }
+            return cor_data, COR_JSON, error
+        except Exception as e:
+            return {}, None, f"{COR_JSON}: {e}"
+    return {}, None, error
+
+
+def atomic_write(path, write):
+    """Write a file via ``write(fh)`` into a temp file, then os.replace it."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", newline="") as fh:
+            write(fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+class DatasetStore:
+    """SQLite-backed COR store of one data folder.
+
+    One connection is shared by the GUI thread and the folder-scan thread
+    and guarded by a lock.  If the database cannot be created (read-only
+    folder, broken filesystem) the store runs in memory and falls back to
+    exporting the legacy files on every change, like older versions did.
+    """
+
+    def __init__(self, data_folder):
+        self.data_folder = data_folder
+        self.path = os.path.join(data_folder, DB_NAME)
+        self._lock = threading.RLock()
+        self._dirty = False     # CORs changed since the last export
+        self._params_dirty = False
+        self._param_cache = {}  # hash -> decoded params
+        self.persistent = True
+        try:
+            self._conn = self._connect(self.path)
+        except sqlite3.Error:
+            self.persistent = False
+            self._conn = self._connect(":memory:")
+
+    @staticmethod
+    def _connect(path):
+        # rollback journal (not WAL): WAL needs shared memory, which
+        # network filesystems do not provide
+        conn = sqlite3.connect(path, timeout=10.0, check_same_thread=False,
+                               isolation_level=None)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for stmt in _SCHEMA:
+                conn.execute(stmt)
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                have = {row[1] for row in conn.execute("PRAGMA table_info(files)")}
+                for name, decl in _FILES_V2 + _FILES_V3:
+                    if name not in have:
+                        conn.execute(f"ALTER TABLE files ADD COLUMN {name} {decl}")
+                conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            conn.execute("CREATE INDEX IF NOT EXISTS files_series ON files(series, series_idx)")
+            conn.execute("CREATE INDEX IF NOT EXISTS files_param_hash ON files(param_hash)")
+        return conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ----- meta -----
+    def _meta(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def _set_meta(self, key, value):
+        self._conn.execute(
+            "INSERT INTO meta(key, value) VALUES(?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value=excluded.value", (key, str(value)))
+
+    def _legacy_mtime(self, names=(COR_CSV, COR_JSON)):
+        """Newest mtime of the legacy files (0 if none exist)."""
+        newest = 0.0
+        for name in names:
+            try:
+                newest = max(newest, os.stat(os.path.join(self.data_folder, name)).st_mtime)
+            except OSError:
+                pass
+        return newest
+
+    # ----- COR -----
+    def load_cors(self, h5_files=()):
+        """All stored CORs, importing the legacy files first if needed.
+
+        Legacy files (COR and recon_params.json) are imported when the
+        database is new, or when one of them was modified after the last
+        import/export (e.g. edited by an older TomoGUI), in which case
+        their values win.
+
+        Returns:
+            tuple: (cor_data, imported_from, error) - imported_from is the
+            legacy file name if an import happened, else None.
+        """
+        with self._lock:
+            imported_from, error = None, None
+            legacy_mtime = self._legacy_mtime()
+            if legacy_mtime > float(self._meta("legacy_mtime", 0)):
+                legacy, imported_from, error = read_legacy_cors(self.data_folder, h5_files)
+                with self._conn:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    self._upsert_cors(legacy.items())
+                    self._set_meta("legacy_mtime", legacy_mtime)
+            self._import_legacy_params()
+            rows = self._conn.execute(
+                "SELECT path, cor FROM files WHERE cor IS NOT NULL AND cor != ''").fetchall()
+        return dict(rows), imported_from, error
+
+    def _upsert_cors(self, items):
+        now = time.time()
+        self._conn.executemany(
+            "INSERT INTO files(path, filename, series, series_idx, cor, cor_updated) "
+            "VALUES(?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET cor=excluded.cor, cor_updated=excluded.cor_updated",
+            [(p, os.path.basename(p), *parse_series(p), "" if c is None else str(c), now)
+             for p, c in items])
+
+    def set_cors(self, cor_data):
+        """Store several CORs in one transaction (path -> COR text)."""
+        if not cor_data:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._upsert_cors(cor_data.items())
+            self._dirty = True
+        if not self.persistent:
+            self.export_legacy()
+
+    def set_cor(self, path, cor):
+        self.set_cors({path: cor})
+
+    # ----- scan metadata -----
+    def record_scans(self, scans):
+        """Store size, mtime, series and recon status of listed scans.
+
+        Args:
+            scans: iterable of (path, size, mtime, ReconStatus)
+        """
+        now = time.time()
+        rows = []
+        for path, size, mtime, status in scans:
+            filename = os.path.basename(path)
+            series, idx = parse_series(filename)
+            rows.append((path, filename, size, mtime, series, idx, status.try_count,
+                         status.full_count, status.first_slice, status.last_slice, now))
+        if not rows:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany(
+                    "INSERT INTO files(path, filename, size, mtime, series, series_idx, "
+                    "try_count, full_count, full_first, full_last, status_updated) "
+                    "VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(path) DO UPDATE SET size=excluded.size, mtime=excluded.mtime, "
+                    "series=excluded.series, series_idx=excluded.series_idx, "
+                    "try_count=excluded.try_count, full_count=excluded.full_count, "
+                    "full_first=excluded.full_first, full_last=excluded.full_last, "
+                    "status_updated=excluded.status_updated", rows)
+
+    def find(self, series=None, has_full=None, has_try=None, has_cor=None):
+        """Paths matching all given conditions, in series/index order.
+
+        e.g. ``find(series="sample_A", has_full=False)`` = every file of
+        series sample_A without a full reconstruction.  Conditions left
+        at None are not applied; scans never listed by a folder scan have
+        no status and count as "no try / no full".
+        """
+        where, args = [], []
+        if series is not None:
+            where.append("series = ?")
+            args.append(series)
+        for flag, column in ((has_full, "full_count"), (has_try, "try_count")):
+            if flag is not None:
+                where.append(f"IFNULL({column}, 0) {'>' if flag else '='} 0")
+        if has_cor is not None:
+            where.append("IFNULL(cor, '') " + ("!= ''" if has_cor else "= ''"))
+        sql = "SELECT path FROM files"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY series, series_idx, path"
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, args)]
+
+    def scan_info(self, path):
+        """Everything stored for one scan as a dict (None if unknown)."""
+        with self._lock:
+            cur = self._conn.execute("SELECT * FROM files WHERE path = ?", (path,))
+            row = cur.fetchone()
+            if row is None:
+                return None
+            return dict(zip([d[0] for d in cur.description], row))
+
+    def load_features(self, paths):
+        """Stored metadata features of the given scans.
+
+        Entries read from an older version of the file (its mtime, as
+        last recorded by a folder scan, differs) are left out.
+
+        Returns:
+            dict path -> features dict
+        """
+        out = {}
+        with self._lock:
+            for path in paths:
+                row = self._conn.execute(
+                    "SELECT features, features_mtime, mtime FROM files WHERE path = ?",
+                    (path,)).fetchone()
+                if row is None or row[0] is None:
+                    continue
+                if row[2] is not None and row[1] != row[2]:
+                    continue
+                try:
+                    out[path] = json.loads(row[0])
+                except ValueError:
+                    continue
+        return out
+
+    def set_features(self, items):
+        """Store metadata features, {path: (file mtime, features dict)}."""
+        if not items:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany(
+                    "INSERT INTO files(path, filename, series, series_idx, features, "
+                    "features_mtime) VALUES(?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(path) DO UPDATE SET features=excluded.features, "
+                    "features_mtime=excluded.features_mtime",
+                    [(p, os.path.basename(p), *parse_series(p),
+                      json.dumps(feats, sort_keys=True), mtime)
+                     for p, (mtime, feats) in items.items()])
+
+    # ----- reconstruction parameters -----
+    def _upsert_params(self, paths, params):
+        digest = params_hash(params)
+        self._conn.execute(
+            "INSERT OR IGNORE INTO param_sets(hash, params, created) VALUES(?, ?, ?)",
+            (digest, json.dumps(params, sort_keys=True), time.time()))
+        self._conn.executemany(
+            "INSERT INTO files(path, filename, series, series_idx, param_hash) "
+            "VALUES(?, ?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET param_hash=excluded.param_hash",
+            [(p, os.path.basename(p), *parse_series(p), digest) for p in paths])
+        self._param_cache[digest] = params
+        return digest
+
+    def set_params(self, paths, params):
+        """Reference one parameter snapshot from several scans (one transaction).
+
+        Returns:
+            str: the snapshot's content hash.
+        """
+        paths = [p for p in paths if p]
+        if not paths:
+            return None
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                digest = self._upsert_params(paths, params)
+            self._params_dirty = True
+        return digest
+
+    def set_params_many(self, per_file):
+        """Store {path: params} in one transaction, one param set per distinct snapshot."""
+        groups = {}
+        for path, params in per_file.items():
+            if path:
+                groups.setdefault(params_hash(params), (params, []))[1].append(path)
+        if not groups:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                for params, paths in groups.values():
+                    self._upsert_params(paths, params)
+            self._params_dirty = True
+
+    def params_for(self, path):
+        """Parameter snapshot stored for a scan, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT param_hash FROM files WHERE path = ?", (path,)).fetchone()
+            if row is None or row[0] is None:
+                return None
+            return self._param_set(row[0])
+
+    def _param_set(self, digest):
+        params = self._param_cache.get(digest)
+        if params is None:
+            row = self._conn.execute(
+                "SELECT params FROM param_sets WHERE hash = ?", (digest,)).fetchone()
+            if row is None:
+                return None
+            params = self._param_cache[digest] = json.loads(row[0])
+        return params
+
+    def all_params(self):
+        """{path: params} of every scan with a parameter snapshot."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, param_hash FROM files WHERE param_hash IS NOT NULL "
+                "ORDER BY path").fetchall()
+            return {path: self._param_set(digest) for path, digest in rows}
+
+    def _import_legacy_params(self):
+        """Import recon_params.json if it changed since the last sync."""
+        legacy_mtime = self._legacy_mtime((PARAMS_JSON,))
+        if legacy_mtime <= float(self._meta("params_mtime", 0)):
+            return
+        try:
+            with open(os.path.join(self.data_folder, PARAMS_JSON), "r") as f:
+                per_file = decode_recon_params(json.load(f))
+        except (OSError, ValueError):
+            return
+        # group identical snapshots so each is hashed and stored once
+        groups = {}
+        for path, params in per_file.items():
+            groups.setdefault(params_hash(params), (params, []))[1].append(path)
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for params, paths in groups.values():
+                self._upsert_params(paths, params)
+            self._set_meta("params_mtime", legacy_mtime)
+
+    def export_legacy(self, force=False):
+        """Rewrite the legacy files atomically.
+
+        rot_cen.json (and batch_cor_values.csv if present) and
+        recon_params.json; each is skipped if nothing it holds changed
+        since the last export unless ``force``.
+        """
+        with self._lock:
+            if self._params_dirty or force:
+                self._export_params()
+            if not (self._dirty or force):
+                return
+            self._dirty = False
+            cor_data = dict(self._conn.execute(
+                "SELECT path, cor FROM files WHERE cor IS NOT NULL AND cor != '' "
+                "ORDER BY path").fetchall())
+            if not cor_data and not self._legacy_mtime():
+                return   # nothing to write, don't create empty legacy files
+            csv_path = os.path.join(self.data_folder, COR_CSV)
+            if os.path.exists(csv_path):
+                def _write_csv(fh):
+                    writer = csv.writer(fh)
+                    writer.writerow(['Filename', 'COR'])
+                    for full_path, cor_value in cor_data.items():
+                        writer.writerow([os.path.basename(full_path), cor_value])
+                atomic_write(csv_path, _write_csv)
+            atomic_write(os.path.join(self.data_folder, COR_JSON),
+                         lambda fh: json.dump(cor_data, fh, indent=2))
+            # our own export must not trigger a re-import on the next load
+            if self.persistent:
+                with self._conn:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    self._set_meta("legacy_mtime", self._legacy_mtime())
+
+    def export_params(self, force=False):
+        """Rewrite recon_params.json (v2, deduplicated) if params changed."""
+        with self._lock:
+            if self._params_dirty or force:
+                self._export_params()
+
+    def _export_params(self):
+        self._params_dirty = False
+        files = dict(self._conn.execute(
+            "SELECT path, param_hash FROM files WHERE param_hash IS NOT NULL "
+            "ORDER BY path").fetchall())
+        if not files:
+            return
+        sets = {digest: self._param_set(digest) for digest in sorted(set(files.values()))}
+        doc = encode_recon_params(sets, files)
+        atomic_write(os.path.join(self.data_folder, PARAMS_JSON),
+                     lambda fh: json.dump(doc, fh, indent=1, sort_keys=True))
+        if self.persistent:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._set_meta("params_mtime", self._legacy_mtime((PARAMS_JSON,)))
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="python -m tomogui.dataset_store",
+        description="List the scans TomoGUI has stored for a data folder.")
+    parser.add_argument("folder", help="data folder containing .tomogui.db")
+    parser.add_argument("--series", help="only this series (filename minus scan index)")
+    parser.add_argument("--no-full", action="store_true", help="only scans without a full recon")
+    parser.add_argument("--no-cor", action="store_true", help="only scans without a COR")
+    args = parser.parse_args(argv)
+    if not os.path.exists(os.path.join(args.folder, DB_NAME)):
+        parser.error(f"no {DB_NAME} in {args.folder}")
+    store = DatasetStore(args.folder)
+    try:
+        paths = store.find(series=args.series,
+                           has_full=False if args.no_full else None,
+                           has_cor=False if args.no_cor else None)
+        for path in paths:
+            info = store.scan_info(path)
+            full = (f"{info['full_first']}-{info['full_last']}"
+                    if info['full_count'] else "-")
+            print(f"{info['filename']:<50} cor={info['cor'] or '-':<10} "
+                  f"try={info['try_count'] or 0:<4} full={full:<12} "
+                  f"params={(info['param_hash'] or '-')[:8]}")
+        print(f"{len(paths)} scan(s)")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import os, glob, json
+import os, sys, glob, json, math
 import numpy as np
 
 # Disable vsync for better remote performance
@@ -10,14 +10,12 @@ from PyQt5.QtWidgets import (
     QFileDialog, QTextEdit, QLineEdit, QLabel, QProgressBar,
     QComboBox, QSlider, QGroupBox, QSizePolicy, QMessageBox,
     QTabWidget, QFormLayout, QCheckBox, QSpinBox, QDoubleSpinBox,
-    QScrollArea, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,QFrame,
-    QDialog
+    QScrollArea, QHeaderView, QAbstractItemView,QFrame,
+    QDialog, QTableView
 )
-from PyQt5.QtCore import Qt, QEvent, QProcess, QEventLoop, QSize, QProcessEnvironment, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QEvent, QProcess, QEventLoop, QRectF, QSize, QProcessEnvironment, QThread, QTimer, pyqtSignal
 from PyQt5.QtGui import QColor
-from pathlib import Path
 
-from PIL import Image
 import h5py, json
 from datetime import datetime
 
@@ -51,7 +49,6 @@ if VISPY_AVAILABLE:
 # PyQtGraph: pure-software renderer that works over SSH X11 forwarding
 try:
     import pyqtgraph as pg
-    import matplotlib.cm as _mpl_cm
     pg.setConfigOptions(useOpenGL=False, imageAxisOrder='row-major')
     PG_AVAILABLE = True
 except ImportError:
@@ -60,6 +57,26 @@ except ImportError:
 from .theme_manager import ThemeManager
 from .hdf5_viewer import HDF5ImageDividerDialog
 from .batch_progress_window import ProgressWindow
+from .recon_status import ReconStatusIndex, NO_RECON, scan_h5_files, is_recon_status_text
+from .dataset_store import DatasetStore
+from .persistence import PersistenceService
+from .cor_predictor import CorPredictor, load_features as load_scan_features
+from .result_channel import FileChannel, parse_line as parse_result_line
+from .cam_rot import pass_heights, fit_tilt
+from .inference_session import InferenceSession
+from .slice_cache import SliceCache
+from .slice_loader import SliceLoader
+from .tiff_reader import read_tiff
+from .image_stats import StatsCache
+from .image_pyramid import LOD_MIN_SIZE, PyramidBuilder, covers, crop_box, pick_level
+from .ortho_volume import OrthoVolume, VolumeBuilder, cache_dir as ortho_cache_dir
+from .cor_sheet import CorSheetDialog, ThumbnailLoader
+from .lut_render import PG_UINT8_RENDER, LutRenderer, colormap_lut
+from .cor_outliers import CorRow, fix_outliers, METHODS as COR_FIT_METHODS, METHOD_LABELS as COR_FIT_LABELS
+from .main_table_model import (
+    MainTableModel, CheckBorderDelegate, CorDelegate, ButtonDelegate,
+    make_record, format_file_size, COL_SELECT, COL_COR, COL_VIEW
+)
 
 
 class SyncWatcher(QThread):
@@ -69,15 +86,23 @@ class SyncWatcher(QThread):
     /exchange/data has the same number of frames as /exchange/theta.
     This is robust against pauses during acquisition that would fool a
     simple file-size stability check.
+
+    Optional early start: when ``partial_fraction`` is set (0 < f < 1),
+    ``partial_file_ready`` is emitted once per file as soon as at least
+    that fraction of the projections has been written, so the try + AI
+    COR stage can run while acquisition is still going.
     """
     new_file_ready = pyqtSignal(str)   # emits absolute path of the complete file
     file_progress  = pyqtSignal(str, int, int)  # path, n_done, n_total
+    partial_file_ready = pyqtSignal(str, int, int)  # path, n_done, n_total
 
-    def __init__(self, folder, known_files, check_interval=10):
+    def __init__(self, folder, known_files, check_interval=10, partial_fraction=None):
         super().__init__()
         self.folder = folder
         self.known_files = set(known_files)
         self.check_interval = check_interval   # seconds between polls
+        self.partial_fraction = partial_fraction
+        self._partial_sent = set()   # files already announced as partial
         self._stop = False
 
     def stop(self):
@@ -85,16 +110,23 @@ class SyncWatcher(QThread):
 
     @staticmethod
     def _check_complete(filepath):
-        """Return (n_projections_written, n_angles_expected) or (0, 0) on error."""
-        try:
-            with h5py.File(filepath, 'r') as f:
-                data  = f.get('/exchange/data')
-                theta = f.get('/exchange/theta')
-                if data is None or theta is None:
-                    return 0, 0
-                return int(data.shape[0]), int(theta.shape[0])
-        except Exception:
-            return 0, 0
+        """Return (n_projections_written, n_angles_expected) or (0, 0) on error.
+
+        The file is opened SWMR-style first so that a writer holding the
+        file open (acquisition still running) does not block the read;
+        files that were not written in SWMR mode fall back to a plain open.
+        """
+        for kwargs in ({'swmr': True}, {}):
+            try:
+                with h5py.File(filepath, 'r', **kwargs) as f:
+                    data  = f.get('/exchange/data')
+                    theta = f.get('/exchange/theta')
+                    if data is None or theta is None:
+                        return 0, 0
+                    return int(data.shape[0]), int(theta.shape[0])
+            except Exception:
+                continue
+        return 0, 0
 
     def _sleep_interruptible(self, seconds):
         """Sleep in 100 ms chunks so stop() is responsive."""
@@ -116,16 +148,121 @@ class SyncWatcher(QThread):
                     n_done, n_total = self._check_complete(f)
                     if n_total > 0 and n_done >= n_total:
                         self.known_files.add(f)
+                        self._partial_sent.discard(f)
                         self.new_file_ready.emit(f)
                     else:
                         pending.add(f)
                         if n_total > 0:
                             self.file_progress.emit(f, n_done, n_total)
+                            if (self.partial_fraction
+                                    and f not in self._partial_sent
+                                    and n_done >= int(math.ceil(self.partial_fraction * n_total))):
+                                self._partial_sent.add(f)
+                                self.partial_file_ready.emit(f, n_done, n_total)
             except Exception:
                 pass
             self._sleep_interruptible(self.check_interval)
 
 
+class FolderScanWorker(QThread):
+    """Background thread that lists a data folder for the main table.
+
+    Row records are streamed to the GUI in chunks, newest files first: the
+    first chunk is built with per-file status lookups so it can be shown
+    before the full ``<data>_rec`` scan, the rest follow in larger chunks.
+    ``cancel()`` is checked between chunks; every signal carries the
+    generation number of the refresh that started the scan so the GUI can
+    drop results from a scan it has superseded. A completed scan also
+    records size, series and recon status of every file in the folder's
+    DatasetStore, and then loads the metadata features of the COR
+    predictor for the files not in ``known_features`` (from the store,
+    or read from the HDF5 file), in chunks.
+    """
+    cor_loaded  = pyqtSignal(int, dict, str)   # generation, cor_data, log html
+    chunk_ready = pyqtSignal(int, list)        # generation, row records
+    scan_done   = pyqtSignal(int, int)         # generation, number of files
+    features_ready = pyqtSignal(int, dict, dict, bool)   # generation, features, newly read, last chunk
+
+    FIRST_CHUNK = 100
+    CHUNK = 500
+    FEATURE_CHUNK = 50
+
+    def __init__(self, folder, generation, status_index, store, read_cor_data,
+                 known_features=()):
+        super().__init__()
+        self.folder = folder
+        self.generation = generation
+        self.status_index = status_index
+        self.store = store
+        self.read_cor_data = read_cor_data
+        self.known_features = set(known_features)
+        self._scans = []   # (path, size, mtime, ReconStatus) for the store
+        self._cancel = False
+
+    def cancel(self):
+        self._cancel = True
+
+    def _records(self, entries, cor_data, status_of):
+        records = []
+        for path, size, mtime in entries:
+            filename = os.path.basename(path)
+            #check recon status: green = full, orange = try only, red = none
+            status = status_of(os.path.splitext(filename)[0])
+            self._scans.append((path, size, mtime, status))
+            color, text = status.row_status()
+            records.append(make_record(path, filename, cor=cor_data.get(path, ""),
+                                       status=text, recon_status=color, size=size))
+        return records
+
+    def run(self):
+        # one scandir pass for the data folder (size + mtime from DirEntry)
+        entries = scan_h5_files(self.folder)
+        if self._cancel:
+            return
+        # Load COR data from JSON or CSV (CSV takes priority if both exist)
+        cor_data, cor_log = self.read_cor_data(self.store, [e[0] for e in entries])
+        self.cor_loaded.emit(self.generation, cor_data, cor_log)
+        head, rest = entries[:self.FIRST_CHUNK], entries[self.FIRST_CHUNK:]
+        if head and not self._cancel:
+            self.chunk_ready.emit(self.generation, self._records(
+                head, cor_data, lambda proj: self.status_index.lookup(self.folder, proj)))
+        if rest:
+            # one pass over <data>_rec (cached per directory mtime)
+            recon_status = self.status_index.scan(self.folder)
+            for i in range(0, len(rest), self.CHUNK):
+                if self._cancel:
+                    return
+                self.chunk_ready.emit(self.generation, self._records(
+                    rest[i:i + self.CHUNK], cor_data,
+                    lambda proj: recon_status.get(proj, NO_RECON)))
+        if self._cancel:
+            return
+        try:
+            self.store.record_scans(self._scans)
+        except Exception as exc:
+            # not fatal for the table; the store is refreshed on the next scan
+            print(f"[tomogui] could not record scans in {self.store.path}: {exc}",
+                  file=sys.stderr)
+        self.scan_done.emit(self.generation, len(entries))
+        self._load_features([e[0] for e in entries if e[0] not in self.known_features])
+
+    def _load_features(self, paths):
+        for i in range(0, len(paths), self.FEATURE_CHUNK):
+            if self._cancel:
+                return
+            try:
+                feats, new = load_scan_features(self.store, paths[i:i + self.FEATURE_CHUNK])
+            except Exception as exc:
+                # e.g. the folder changed and the store was closed under us
+                if not self._cancel:
+                    print(f"[tomogui] could not load scan features from {self.store.path}: {exc}",
+                          file=sys.stderr)
+                    self.features_ready.emit(self.generation, {}, {}, True)
+                return
+            self.features_ready.emit(self.generation, feats, new,
+                                     i + self.FEATURE_CHUNK >= len(paths))
+
+
 class MachineSettingsDialog(QDialog):
     """Dialog for configuring remote machine settings"""
 
@@ -248,24 +385,75 @@ class TomoGUI(QWidget):
         self.vmax = None
         self.preview_files = []
         self.full_files = []
+        # Decoded slices of the series on the slider (1 GB), read ahead
+        # in the scrub direction by background threads
+        self._slice_cache = SliceCache(max_bytes=1 << 30)
+        # Slider ticks that miss the cache are read by a worker pool;
+        # only the newest request is shown
+        self._slice_loader = SliceLoader(self._slice_cache)
+        self._slice_loader.loaded.connect(self._on_slice_loaded)
+        self._slice_request = None      # (request id, path) awaited
+        # Per-file slice histograms for contrast (percentiles, min/max)
+        self._img_stats = StatsCache()
+        # XZ/YZ reslices of the full reconstruction, from a local volume cache
+        self._ortho_volume = None
+        self._ortho_builder = None
+        # Try candidate thumbnails for the COR contact sheet
+        self._thumb_loader = ThumbnailLoader()
+        self._cor_sheet = None
         self.process = []
         self._current_img = None
         self._current_img_path = None
         self.cor_data = {}
         self.batch_running = False
+        self._infer_results = {}        # path -> JSON result line of the inference worker
+        self._infer_stdout = {}         # filename -> incomplete stdout line of its worker
         self.batch_file_list = []
         self.highlight_scan = None
         self.highlight_row = None
         self._current_source_file = None
         self._running_full_file = None  # track which file is under local full recon
         self.cor_path = None
-        self._recon_params_data = None  # per-dataset params cache; None = needs reload
         self._batch_active = False      # while True, per-scan param load/save is suppressed
         self._sync_watcher = None       # SyncWatcher thread
         self._sync_queue = []
         self._sync_processing = False
         self._sync_current_file = None
-        self.batch_file_main_list = []
+        self._sync_partial_done = set()  # files whose COR came from a partial scan
+        self._recon_status_index = ReconStatusIndex()  # cached <data>_rec scan
+        self._scan_worker = None        # FolderScanWorker filling the main table
+        self._scan_workers = set()      # incl. cancelled ones still winding down
+        self._scan_generation = 0       # bumped per refresh; stale chunks are dropped
+        self._scan_folder = None        # folder the table currently shows
+        self._dataset_store = None      # DatasetStore (.tomogui.db) of that folder
+        self._cor_predictor = None      # CorPredictor trained on that folder's CORs
+        self._cor_features = {}         # path -> scan metadata features (predictor input)
+        self._cor_features_read = 0     # read from HDF5 files by the running scan
+        # One background writer for COR edits, param snapshots and legacy
+        # exports; it writes after 500 ms without new changes
+        self._persistence = PersistenceService(debounce=0.5)
+        self._persistence.error.connect(
+            lambda msg: self.log_output.append(f'<span style="color:red;">❌ {msg}</span>'))
+        self._persistence.saved.connect(
+            lambda path, n: self.log_output.append(
+                f'<span style="color:green;">✔ {n} COR value(s) saved</span>'))
+        self._persistence.start()
+        # In-process AI inference for single-file actions; the model stays
+        # loaded per checkpoint until unloaded
+        self._infer_session = InferenceSession()
+        self._infer_session.model_loaded.connect(
+            lambda path, secs: self.log_output.append(
+                f'🤖 AI model loaded: {os.path.basename(path)} ({secs:.1f} s)'))
+        self._infer_session.model_unloaded.connect(
+            lambda path: self.log_output.append(
+                f'🤖 AI model unloaded: {os.path.basename(path)}'))
+        self._scan_diff = None          # diff state while an incremental scan runs
+        self._scan_complete = False     # a full scan of _scan_folder has finished
+        # While a batch runs, re-scan the folder periodically and apply only
+        # the differences (new files, finished reconstructions, ...)
+        self._auto_refresh_timer = QTimer(self)
+        self._auto_refresh_timer.setInterval(30000)
+        self._auto_refresh_timer.timeout.connect(self._auto_refresh_tick)
 
         # Batch selection state for shift-click
         self.batch_last_clicked_row = None
@@ -355,6 +543,11 @@ class TomoGUI(QWidget):
         view_try_btn.setStyleSheet("QPushButton { font-size: 10.5pt; }")
         view_try_btn.clicked.connect(self.view_try_reconstruction) 
         single_ops.addWidget(view_try_btn)
+        sheet_btn = QPushButton(" Sheet ")
+        sheet_btn.setStyleSheet("QPushButton { font-size: 10.5pt; }")
+        sheet_btn.setToolTip("All try CORs side by side, with the AI pick and scores")
+        sheet_btn.clicked.connect(self.view_try_sheet)
+        single_ops.addWidget(sheet_btn)
         single_ops.setStretch(0,0)
         separator = QLabel(" | ")
         separator.setStyleSheet("QLabel { font-size: 11pt; }")
@@ -389,6 +582,16 @@ class TomoGUI(QWidget):
         ai_browse_btn.setFixedWidth(65)
         ai_browse_btn.clicked.connect(_browse_ai_model)
         ai_ops.addWidget(ai_browse_btn)
+        ai_unload_btn = QPushButton("Unload")
+        ai_unload_btn.setStyleSheet("QPushButton { font-size: 10pt; }")
+        ai_unload_btn.setFixedWidth(65)
+        ai_unload_btn.setToolTip(
+            "Free the AI model(s) the GUI keeps loaded between AI Reco runs "
+            "(GPU memory). The next run loads the model again.")
+        ai_unload_btn.clicked.connect(lambda: self._infer_session.unload())
+        ai_ops.addWidget(ai_unload_btn)
+        # a model for a checkpoint no longer selected is only holding memory
+        self.ai_model_path.editingFinished.connect(self._unload_other_ai_models)
         try_ai_btn = QPushButton("  AI Reco  ")
         try_ai_btn.setStyleSheet("QPushButton { font-size: 11pt; font-weight:bold; color: #1a8cff; }")
         try_ai_btn.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
@@ -472,12 +675,22 @@ class TomoGUI(QWidget):
         camrot_btn.setToolTip(
             "Estimate the camera rotation angle of the currently highlighted "
             "file.\n"
-            "Runs Try+AI-infer at nsino=0.1 (top) and nsino=0.9 (bottom), "
-            "then computes the angle from the COR difference and image "
-            "height."
+            "Runs Try+AI-infer at nsino=0.1 (top) to nsino=0.9 (bottom), "
+            "then fits the angle to the COR drift over the image height."
         )
         camrot_btn.clicked.connect(self._cam_rot_estimate)
         others_ops.addWidget(camrot_btn)
+        self.camrot_rows = QSpinBox()
+        self.camrot_rows.setRange(2, 9)
+        self.camrot_rows.setValue(2)
+        self.camrot_rows.setPrefix("rows ")
+        self.camrot_rows.setStyleSheet("QSpinBox { font-size: 10.5pt; }")
+        self.camrot_rows.setToolTip(
+            "Heights CamRot measures the COR at. 2 = top and bottom; more "
+            "heights are fitted by least squares and give an error estimate.\n"
+            "Try passes run in parallel, one per GPU (Batch 'GPUs' setting)."
+        )
+        others_ops.addWidget(self.camrot_rows)
         save_param_btn = QPushButton("Save params")
         save_param_btn.setStyleSheet("QPushButton { font-size: 10.5pt; }")
         save_param_btn.setEnabled(True) #enable
@@ -498,11 +711,37 @@ class TomoGUI(QWidget):
         others_ops.addWidget(help_tomo_btn)
         main_tab.addLayout(others_ops)
 
-        # Row 4 - batch process table
-        self.batch_file_main_table = QTableWidget()
-        self.batch_file_main_table.cellClicked.connect(self.on_table_row_clicked)
+        # Row 4 - batch process table (model/view: rows are plain records,
+        # checkbox / COR / View button are painted by delegates)
+        self.batch_file_main_model = MainTableModel(self)
+        self.batch_file_main_model.check_toggled.connect(self._batch_checkbox_clicked)
+        self.batch_file_main_model.cor_edited.connect(self._on_main_cor_edited)
+        self.batch_file_main_model.rowsInserted.connect(self._on_main_table_reordered)
+        self.batch_file_main_model.rowsRemoved.connect(self._on_main_table_reordered)
+        self.batch_file_main_model.layoutChanged.connect(self._on_main_table_reordered)
+        self.batch_file_main_table = QTableView()
+        self.batch_file_main_table.setModel(self.batch_file_main_model)
+        # ticking the checkbox or pressing View also emits clicked; neither
+        # should move the highlighted scan (and swap its params)
+        self.batch_file_main_table.clicked.connect(
+            lambda idx: None if idx.column() in (COL_SELECT, COL_VIEW)
+            else self.on_table_row_clicked(idx.row(), idx.column()))
+        self.batch_file_main_table.setItemDelegateForColumn(
+            COL_SELECT, CheckBorderDelegate(self.batch_file_main_table))
+        self.batch_file_main_table.setItemDelegateForColumn(
+            COL_COR, CorDelegate(self.batch_file_main_table))
+        view_delegate = ButtonDelegate(self.batch_file_main_table)
+        view_delegate.clicked.connect(
+            lambda r: self._batch_view_data(self.batch_file_main_list[r]['path']))
+        self.batch_file_main_table.setItemDelegateForColumn(COL_VIEW, view_delegate)
+        self.batch_file_main_table.setEditTriggers(
+            QAbstractItemView.CurrentChanged | QAbstractItemView.SelectedClicked
+            | QAbstractItemView.DoubleClicked | QAbstractItemView.EditKeyPressed)
+        # fixed row height keeps scrolling O(visible rows) for large folders
+        self.batch_file_main_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.batch_file_main_table.verticalHeader().setDefaultSectionSize(28)
         self.batch_file_main_table.setStyleSheet("""
-                                            QTableWidget {
+                                            QTableView {
                                              font-size: 10.5pt; /* Set font size for the table cells */
                                             }
                                             QHeaderView::section {
@@ -510,9 +749,6 @@ class TomoGUI(QWidget):
                                                 font-weight: bold; /* Make header text bold */
                                                 }
                                                 """)
-        self.batch_file_main_table.setColumnCount(7)
-        self.batch_file_main_table.setHorizontalHeaderLabels(["Select","File Name", "COR",
-                                                         "Status", "Size", "Pixel", "View Data"])
         self.batch_file_main_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         header = self.batch_file_main_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Interactive)  # Allow user to resize columns
@@ -523,6 +759,10 @@ class TomoGUI(QWidget):
         header.setSectionResizeMode(4, QHeaderView.Stretch)  # Size
         header.setSectionResizeMode(5, QHeaderView.Stretch)  # Actions
         header.setSectionResizeMode(6, QHeaderView.ResizeToContents)  # View Data
+        # Click a header to sort; row lookups go through the model's path
+        # index so they stay valid in any order.
+        header.setSortIndicator(-1, Qt.AscendingOrder)
+        self.batch_file_main_table.setSortingEnabled(True)
         self.batch_file_main_table.setColumnWidth(0,50)
         self.batch_file_main_table.setColumnWidth(1, 350) # Set initial width for filename column to be wider (can be resized by user)    
         main_tab.addWidget(self.batch_file_main_table)
@@ -655,7 +895,7 @@ class TomoGUI(QWidget):
         clear_cor_btn = QPushButton("Clear CORs")
         clear_cor_btn.setStyleSheet("QPushButton { font-size: 10.5pt; color: #b26a00; }")
         clear_cor_btn.setToolTip("Clear the COR value for every checked file "
-                                 "(table and rot_cen.json). Useful before "
+                                 "(table and .tomogui.db). Useful before "
                                  "re-running AI Reco from scratch.")
         clear_cor_btn.clicked.connect(self._clear_selected_cors)
         batch_ops.addWidget(clear_cor_btn)
@@ -672,6 +912,16 @@ class TomoGUI(QWidget):
                                         "Tight-cluster series may use a smaller effective threshold "
                                         "(max(abs, 5·MAD), capped at this value).")
         batch_ops.addWidget(self.cor_outlier_max)
+        batch_ops.addWidget(QLabel("fit:"))
+        self.cor_outlier_method = QComboBox()
+        for key in COR_FIT_METHODS:
+            self.cor_outlier_method.addItem(COR_FIT_LABELS[key], key)
+        self.cor_outlier_method.setToolTip(
+            "Trend each series is compared against in Fix COR Outliers: "
+            "the series median (original rule), a rolling median, or a robust "
+            "linear drift over the scan index (Huber / RANSAC). Use a drift fit "
+            "for long series whose COR moves slowly.")
+        batch_ops.addWidget(self.cor_outlier_method)
         # Per-series minimum size (% of series median). Files smaller than this
         # are auto-unchecked and marked "Skipped (small)" — typically aborted
         # scans with tiny file size compared to their series peers.
@@ -717,6 +967,26 @@ class TomoGUI(QWidget):
         self.sync_btn.setCheckable(True)
         self.sync_btn.clicked.connect(self._toggle_sync)
         sync_row.addWidget(self.sync_btn)
+        # Early start: run try + AI COR on a partially written scan; the
+        # full reconstruction still waits for the scan to be complete.
+        self.sync_early_start = QCheckBox("Early start at")
+        self.sync_early_start.setChecked(False)
+        self.sync_early_start.setToolTip(
+            "Start Try + AI COR once this fraction of the projections has "
+            "been written (file read SWMR-style). Full reconstruction is "
+            "still scheduled only when the scan is complete."
+        )
+        sync_row.addWidget(self.sync_early_start)
+        self.sync_early_pct = QDoubleSpinBox()
+        self.sync_early_pct.setRange(5.0, 99.0)
+        self.sync_early_pct.setDecimals(0)
+        self.sync_early_pct.setSingleStep(5.0)
+        self.sync_early_pct.setValue(50.0)
+        self.sync_early_pct.setFixedWidth(60)
+        self.sync_early_pct.setSuffix(" %")
+        self.sync_early_pct.setToolTip("Fraction of projections written before the early Try + AI COR stage starts")
+        sync_row.addWidget(self.sync_early_pct)
+        sync_row.addStretch()
         main_tab.addLayout(sync_row)
 
         # Tab 2: Params (all CLI flags + extra args)
@@ -805,6 +1075,28 @@ class TomoGUI(QWidget):
             self._pg_view_box.addItem(self._pg_image_item)
             self._pg_roi_item = None
             self.canvas_widget = self._pg_layout
+            # Level of detail: large slices are shown as a pyramid level
+            # or the visible crop (see image_pyramid); re-picked 40 ms
+            # after the last pan/zoom
+            self._lod_token = 0         # bumped per displayed slice
+            self._lod_levels = []       # pyramid of the current slice, once built
+            self._lod_shown = None      # (token, level, box) on screen
+            self._pyramid_builder = PyramidBuilder()
+            self._pyramid_builder.levels_ready.connect(self._on_pyramid_ready)
+            self._lod_timer = QTimer(self)
+            self._lod_timer.setSingleShot(True)
+            self._lod_timer.setInterval(40)
+            self._lod_timer.timeout.connect(self._pg_update_lod)
+            self._pg_view_box.sigRangeChanged.connect(lambda *_: self._lod_timer.start())
+            # Colormap and Min/Max applied to uint8 RGBA on a worker thread
+            # (see lut_render); None: pyqtgraph maps the float data itself
+            self._lut_renderer = None
+            self._lut_key = 0               # bumped per render request
+            self._lut_hist_pending = False  # histogram of the shown piece still to come
+            self._lod_data = None           # (data, box) of the piece on screen
+            if PG_UINT8_RENDER:
+                self._lut_renderer = LutRenderer()
+                self._lut_renderer.rendered.connect(self._on_lut_rendered)
             # Mouse coordinate tracking via SignalProxy (rate-limited)
             self._pg_proxy = pg.SignalProxy(
                 self._pg_image_item.scene().sigMouseMoved,
@@ -894,7 +1186,9 @@ class TomoGUI(QWidget):
         if not VISPY_AVAILABLE:
             # Histogram LUT widget for manual level adjustment (pyqtgraph only)
             self._pg_hist = pg.HistogramLUTWidget(orientation='vertical')
-            self._pg_hist.setImageItem(self._pg_image_item)
+            if self._lut_renderer is None:
+                self._pg_hist.setImageItem(self._pg_image_item)
+            # else the histogram comes from the LUT renderer
             self._pg_hist.setMinimumWidth(100)
             self._pg_hist.setMaximumWidth(130)
             self._pg_hist.item.sigLevelsChanged.connect(self._pg_hist_levels_changed)
@@ -912,6 +1206,12 @@ class TomoGUI(QWidget):
                                          margin: -5px 0; border-radius: 10px; }
         """)
         slider_layout.addWidget(QLabel("Image Index:"))
+        self.ortho_box = QComboBox()
+        self.ortho_box.addItems(["XY", "XZ", "YZ"])
+        self.ortho_box.setToolTip("Slice orientation of the full reconstruction (XZ/YZ: built in the background)")
+        self.ortho_box.setEnabled(False)
+        self.ortho_box.currentTextChanged.connect(self._set_ortho_mode)
+        slider_layout.addWidget(self.ortho_box)
         slider_layout.addWidget(self.slice_slider)
         self.filename_label = QLabel("")
         self.filename_label.setStyleSheet("font-size: 10pt; color: #aaa; padding-left: 6px;")
@@ -2299,9 +2599,11 @@ class TomoGUI(QWidget):
             self.image_visual.cmap = self.current_cmap
             self.canvas.update()
         elif not VISPY_AVAILABLE and self._current_img is not None:
+            if self._lut_renderer is not None:
+                self._pg_render()
+                return
             try:
-                lut = (_mpl_cm.colormaps[self.current_cmap](np.linspace(0, 1, 256)) * 255).astype(np.uint8)
-                self._pg_image_item.setLookupTable(lut[:, :3])
+                self._pg_image_item.setLookupTable(colormap_lut(self.current_cmap, 3))
                 self._pg_image_item.update()
                 self.canvas_widget.update()
             except Exception as e:
@@ -2327,7 +2629,9 @@ class TomoGUI(QWidget):
             self._pg_apply_levels(self.vmin, self.vmax)
 
     def refresh_current_image(self):
-        if self.full_files and 0 <= self.slice_slider.value() < len(self.full_files):
+        if self.ortho_box.currentText() != "XY":
+            self.update_ortho_slice()
+        elif self.full_files and 0 <= self.slice_slider.value() < len(self.full_files):
             self.show_image(self.full_files[self.slice_slider.value()], flag=None)
         elif self.preview_files and 0 <= self.slice_slider.value() < len(self.preview_files):
             self.show_image(self.preview_files[self.slice_slider.value()], flag=None)
@@ -2364,252 +2668,334 @@ class TomoGUI(QWidget):
             # Auto-refresh batch file list when folder is selected
             #self._refresh_batch_file_list() #TODO:Need decide if remove the batch process tab
 
-    def _load_cor_data(self, data_folder, h5_files):
+    @staticmethod
+    def _read_cor_data(store, h5_files):
         """
-        Load COR data from CSV or JSON file.
+        Load COR data from the folder's DatasetStore (.tomogui.db).
+        The legacy files are imported first when the store is new or they
+        were changed outside the store:
         CSV format (batch_cor_values.csv): Filename,COR
         JSON format (rot_cen.json): {full_path: cor_value}
-
-        CSV takes priority if both exist.
+        CSV takes priority if both exist. Touches no widgets, so it can
+        run on the folder-scan thread.
 
         Returns:
-            tuple: (cor_data_dict, list_of_keys)
-                   cor_data_dict uses full file paths as keys
+            tuple: (cor_data_dict, log_html)
+                   cor_data_dict uses full file paths as keys, values are str
         """
-        import csv
-
-        csv_path = os.path.join(data_folder, "batch_cor_values.csv")
-        json_path = os.path.join(data_folder, "rot_cen.json")
-
-        cor_data = {}
-
-        # Try CSV first (legacy format, takes priority)
-        if os.path.exists(csv_path):
-            try:
-                with open(csv_path, 'r') as csvfile:
-                    reader = csv.DictReader(csvfile)
-                    # Build a mapping from filename to full path
-                    filename_to_path = {os.path.basename(f): f for f in h5_files}
-
-                    for row in reader:
-                        filename = row.get('Filename', '').strip()
-                        cor_value = row.get('COR', '').strip()
-
-                        if filename and cor_value:
-                            # Convert filename to full path for consistency
-                            full_path = filename_to_path.get(filename)
-                            if full_path:
-                                cor_data[full_path] = cor_value
-
-                self.log_output.append(f'<span style="color:green;">✅ Loaded {len(cor_data)} COR values from batch_cor_values.csv</span>')
-                return cor_data, list(cor_data.keys())
-
-            except Exception as e:
-                self.log_output.append(f'<span style="color:red;">❌ Error loading CSV: {e}</span>')
-
-        # Try JSON if CSV doesn't exist or failed
-        if os.path.exists(json_path):
-            try:
-                with open(json_path, 'r') as f:
-                    raw = json.load(f)
-                    # Normalise: values may be lists [cor] or bare numbers/strings
-                    cor_data = {
-                        k: str(v[0]) if isinstance(v, list) and v else str(v)
-                        for k, v in raw.items()
-                    }
-                    self.log_output.append(f'<span style="color:green;">✅ Loaded {len(cor_data)} COR values from rot_cen.json</span>')
-                    return cor_data, list(cor_data.keys())
-            except json.JSONDecodeError as e:
-                self.log_output.append(f'<span style="color:red;">❌ Error loading rot_cen.json: {e}</span>')
-                return {}, []
-
-        # No COR file found
-        self.log_output.append('<span style="color:orange;">⚠️  No COR file found (checked batch_cor_values.csv and rot_cen.json)</span>')
-        return {}, []
+        try:
+            cor_data, imported_from, error = store.load_cors(h5_files)
+        except Exception as e:
+            return {}, f'<span style="color:red;">❌ Error loading COR store: {e}</span>'
+        if error:
+            return cor_data, f'<span style="color:red;">❌ Error loading {error}</span>'
+        if imported_from:
+            return cor_data, f'<span style="color:green;">✅ Imported COR values from {imported_from} ({len(cor_data)} stored)</span>'
+        if cor_data:
+            return cor_data, f'<span style="color:green;">✅ Loaded {len(cor_data)} COR values</span>'
+        return {}, '<span style="color:orange;">⚠️  No COR values found (checked .tomogui.db, batch_cor_values.csv and rot_cen.json)</span>'
+
+    def _dataset_store_for(self, data_folder):
+        """DatasetStore of a data folder; leaving a folder exports its legacy files."""
+        store = self._dataset_store
+        if store is not None and store.data_folder == data_folder:
+            return store
+        self._close_dataset_store()
+        self._dataset_store = DatasetStore(data_folder)
+        if not self._dataset_store.persistent:
+            self.log_output.append(
+                f'<span style="color:orange;">⚠️ Cannot create {self._dataset_store.path}; '
+                f'COR edits rewrite rot_cen.json directly</span>')
+        return self._dataset_store
+
+    def _close_dataset_store(self):
+        """Hand the current store to the writer: it exports rot_cen.json /
+        recon_params.json for other tools, then closes the database."""
+        store, self._dataset_store = self._dataset_store, None
+        self._cor_predictor = None
+        self._cor_features = {}
+        if store is not None:
+            self._persistence.submit_close(store)
+
+    @property
+    def batch_file_main_list(self):
+        """Row records of the main table, in display order (owned by the model)."""
+        return self.batch_file_main_model.records
 
     def refresh_main_table(self):
         table_folder = self.data_path.text()
         if not table_folder or not os.path.isdir(table_folder):
             QMessageBox.warning(self, "Warning", "Please select a valid data folder first.")
             return
-        if self.batch_running:
+        # Same folder: update the rows in place (keeps checks, COR edits and
+        # the status of running jobs). Only a folder change rebuilds the table.
+        # (only after a full scan finished: a cancelled one leaves older
+        # files unlisted, and a diff would insert them above newer rows)
+        incremental = (table_folder == self._scan_folder and self._scan_complete
+                       and bool(self.batch_file_main_list))
+        if self.batch_running and not incremental:
             reply = QMessageBox.question(
                 self, 'Queue Running',
                 f'A batch queue is currently running ({len(self.batch_running_jobs)} jobs active, {len(self.batch_job_queue)} queued).\n\n'
-                f'Refreshing will delete the table widgets but jobs will continue running in the background.\n\n'
+                f'Loading a different folder will rebuild the table but jobs will continue running in the background.\n\n'
                 f'Continue with refresh?',
                 QMessageBox.Yes | QMessageBox.No, QMessageBox.No
             )
             if reply == QMessageBox.No:
                 return
             self.log_output.append(f'<span style="color:orange;">⚠️  Refreshed file list while queue was running - status updates may be lost</span>')
-        h5_files = sorted(glob.glob(os.path.join(table_folder, "*.h5")), key=os.path.getmtime, reverse=True)
-        self.batch_file_main_table.setSortingEnabled(False)
-        self.batch_file_main_table.setRowCount(0)
-        self.batch_file_main_list = []
-        self.batch_last_clicked_row = None
-        self._recon_params_data = None  # force reload for new folder
+        self._start_folder_scan(table_folder, incremental=incremental)
 
-        # Load COR data from JSON or CSV (CSV takes priority if both exist)
-        self.cor_data, fns = self._load_cor_data(table_folder, h5_files)
-        #populate table
-        for f in h5_files:
-            filename = os.path.basename(f)
-            row = self.batch_file_main_table.rowCount()
-            self.batch_file_main_table.insertRow(row)
-            #check recon status
-            proj_name = os.path.splitext(filename)[0]
-            try_dir = os.path.join(f"{table_folder}_rec", "try_center", proj_name)
-            full_dir = os.path.join(f"{table_folder}_rec", f"{proj_name}_rec")
-            has_try = os.path.isdir(try_dir) and len(glob.glob(os.path.join(try_dir, "*.tiff"))) > 0
-            has_full = os.path.isdir(full_dir) and len(glob.glob(os.path.join(full_dir, "*.tiff"))) > 0
-            # Determine row color based on reconstruction status
-            if has_full:
-                row_color = "green"  # Full reconstruction exists
-                fp = glob.glob(os.path.join(full_dir, "*.tiff"))
-                num_1 = int(Path(fp[0]).stem.split("_")[-1])
-                num_2 = int(Path(fp[-1]).stem.split("_")[-1])
-                status_item = QTableWidgetItem(f"Full {num_1}-{num_2}")
-            elif has_try:
-                row_color = "orange"  # Only try reconstruction exists
-                status_item = QTableWidgetItem("Done try")
-            else:
-                row_color = "red"  # No reconstruction
-                status_item = QTableWidgetItem("Ready")
-            # Store file info
-            file_info = {
-                'path': f,
-                'filename': filename,
-                'status': status_item,
-                'row': row,
-                'recon_status': row_color
-            }
-            self.batch_file_main_list.append(file_info)   
-            # Checkbox for selection with shift-click support
-            checkbox = QCheckBox()
-            checkbox.clicked.connect(lambda checked, r=row: self._batch_checkbox_clicked(r, checked))
-            checkbox_widget = QWidget()
-            checkbox_layout = QHBoxLayout(checkbox_widget)
-            checkbox_layout.addWidget(checkbox)
-            checkbox_layout.setAlignment(Qt.AlignCenter)
-            checkbox_layout.setContentsMargins(0, 0, 0, 0)
-            self.batch_file_main_table.setCellWidget(row, 0, checkbox_widget)
-            file_info['checkbox'] = checkbox
-
-            # Filename - show full name and set tooltip with full path
-            filename_item = QTableWidgetItem(filename)
-            filename_item.setToolTip(f"{filename}\n\nFull path:\n{f}")
-            self.batch_file_main_table.setItem(row, 1, filename_item)       
-
-            # COR value (editable)
-            if f in fns:
-                cor_val = self.cor_data[f]
-                if isinstance(cor_val, list):
-                    cor_val = str(cor_val[0]) if cor_val else ""
-                else:
-                    cor_val = str(cor_val)
-                cor_input = QLineEdit(cor_val)
-            else:
-                cor_input = QLineEdit()
-            cor_input.setPlaceholderText("COR value")
-            cor_input.setAlignment(Qt.AlignCenter)
-            cor_input.setFixedWidth(80)
-
-            self.batch_file_main_table.setCellWidget(row, 2, cor_input)
-            file_info['cor_input'] = cor_input
-            #allow modify table directly but also update rot_cen.json
-            try:
-                cor_input.editingFinished.connect(
-                    lambda fp=f, r=row: self._on_main_cor_edited(fp,r)
-                )
-            except Exception:
-                pass
+    def _auto_refresh_tick(self):
+        """Timer slot: diff-refresh the table while a batch is running."""
+        if not self.batch_running:
+            self._auto_refresh_timer.stop()
+            return
+        table_folder = self.data_path.text()
+        if (self._scan_worker is None and table_folder == self._scan_folder
+                and self._scan_complete and os.path.isdir(table_folder)):
+            self._start_folder_scan(table_folder, incremental=True, quiet=True)
+
+    def _start_folder_scan(self, table_folder, incremental=False, quiet=False):
+        """(Re)fill the main table from a FolderScanWorker.
+
+        A full scan clears the table and appends rows as they arrive. An
+        incremental scan diffs against the current rows instead: new files
+        are inserted, vanished ones removed, size and recon status updated.
+        A scan that is still running is cancelled; any chunk it already
+        queued carries the old generation number and is dropped.
+        """
+        if self._scan_worker is not None:
+            self._scan_worker.cancel()
+        self._scan_generation += 1
+        self._scan_folder = table_folder
+        if incremental:
+            self._scan_diff = {'seen': set(), 'added': [], 'resized': [],
+                               'updated': 0, 'quiet': quiet}
+        else:
+            self._scan_diff = None
+            self._scan_complete = False
+            self.batch_last_clicked_row = None
+            self.batch_file_main_model.set_records([])
+        store = self._dataset_store_for(table_folder)
+        worker = FolderScanWorker(table_folder, self._scan_generation, self._recon_status_index,
+                                  store, self._read_cor_data, known_features=self._cor_features)
+        worker.cor_loaded.connect(self._on_scan_cor_loaded)
+        worker.chunk_ready.connect(self._on_scan_chunk)
+        worker.scan_done.connect(self._on_scan_done)
+        worker.features_ready.connect(self._on_scan_features)
+        worker.finished.connect(lambda w=worker: self._on_scan_finished(w))
+        self._scan_workers.add(worker)  # keep a reference until the thread exits
+        self._scan_worker = worker
+        worker.start()
+        if not quiet:
+            self.log_output.append(f'🔍 Scanning {table_folder} ...')
+
+    def _on_scan_cor_loaded(self, generation, cor_data, log_html):
+        if generation != self._scan_generation:
+            return
+        if self._scan_diff is not None:
+            # in-memory values win; only pick up CORs written by someone else
+            for path, cor in cor_data.items():
+                self.cor_data.setdefault(path, cor)
+            return
+        # set before any row exists, so a COR edit never saves the previous folder's values
+        self.cor_data = cor_data
+        self.log_output.append(log_html)
 
-            # Status
-            self.batch_file_main_table.setItem(row, 3, status_item)
-            file_info['status'] = status_item
+    def _on_scan_chunk(self, generation, records):
+        if generation != self._scan_generation:
+            return
+        if self._scan_diff is not None:
+            self._merge_scan_chunk(records)
+            return
+        first_chunk = not self.batch_file_main_list
+        self.batch_file_main_model.append_records(records)
+        # Highlight the first row as soon as it exists
+        if first_chunk and records:
+            self.highlight_scan = records[0]['path'] #always the latest coming in scan
+            self.highlight_row = self._find_row_by_filepath(self.highlight_scan)
+            self.batch_file_main_table.selectRow(self.highlight_row)
+            self.log_output.append(f'Clicked on {self.highlight_scan}')
+            self._load_scan_params(self.highlight_scan)
 
-            # File size
-            try:
-                file_size = os.path.getsize(f)
-                size_str = self._format_file_size(file_size)
-                size_item = QTableWidgetItem(size_str)
-                size_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                # Store numeric value for proper sorting
-                size_item.setData(Qt.UserRole, file_size)
-                self.batch_file_main_table.setItem(row, 4, size_item)
-            except Exception as e:
-                self.batch_file_main_table.setItem(row, 4, QTableWidgetItem("N/A"))
-            # Actions button (placeholder for future actions)
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout(actions_widget)
-            actions_layout.setContentsMargins(2, 2, 2, 2)
-            actions_layout.setSpacing(2)
-            self.batch_file_main_table.setCellWidget(row, 5, actions_widget)
-
-            # View Data button
-            view_data_btn = QPushButton("View Data")
-            view_data_btn.setFixedWidth(80)
-            view_data_btn.clicked.connect(lambda checked, fp=f: self._batch_view_data(fp))
-            self.batch_file_main_table.setCellWidget(row, 6, view_data_btn)
-
-            # Apply colored left border indicator based on reconstruction status
-            # Create a colored indicator in the checkbox column
-            checkbox_widget.setStyleSheet(f"QWidget {{ border-left: 6px solid {row_color}; }}")
+    def _merge_scan_chunk(self, records):
+        """Apply one chunk of an incremental scan to the existing rows."""
+        model = self.batch_file_main_model
+        diff = self._scan_diff
+        for rec in records:
+            diff['seen'].add(rec['path'])
+            cur = model.record_for(rec['path'])
+            if cur is None:
+                # newest files on top (chunks arrive newest first)
+                model.insert_record(len(diff['added']), rec)
+                diff['added'].append(rec)
+                continue
+            fields = {}
+            if cur['size'] != rec['size']:
+                fields['size'] = rec['size']
+                diff['resized'].append(cur)
+                if cur['skipped_small']:
+                    # re-evaluated by the size check below
+                    fields['skipped_small'] = False
+                    fields['status'] = rec['status']
+                    fields['status_color'] = None
+                    fields['recon_status'] = rec['recon_status']
+            if is_recon_status_text(cur['status']) and cur['status'] != rec['status']:
+                fields['status'] = rec['status']
+                fields['status_color'] = None
+                fields['recon_status'] = rec['recon_status']
+            if not cur['cor'] and rec['cor']:
+                fields['cor'] = rec['cor']
+            if model.update_record(cur, **fields):
+                diff['updated'] += 1
+
+    def _finish_incremental_scan(self):
+        model = self.batch_file_main_model
+        diff = self._scan_diff
+        self._scan_diff = None
+        removed = [rec for rec in model.records if rec['path'] not in diff['seen']]
+        for rec in removed:
+            model.remove_record(rec)
+        added = diff['added']
+        if added:
+            sort_col = self.batch_file_main_table.horizontalHeader().sortIndicatorSection()
+            if 0 <= sort_col < model.columnCount():
+                model.sort(sort_col, self.batch_file_main_table.horizontalHeader().sortIndicatorOrder())
+        if added or removed:
+            self._apply_series_tint()
+        if added or diff['resized']:
+            # only new or resized files can be newly auto-skipped
+            self._auto_skip_small_size_in_series(added + diff['resized'])
+        if added or removed or diff['updated'] or not diff['quiet']:
+            self.log_output.append(
+                f'<span style="color:green;">🔄 Table refresh: {len(added)} new, '
+                f'{len(removed)} removed, {diff["updated"]} updated</span>')
+
+    def _on_scan_done(self, generation, n_files):
+        if generation != self._scan_generation:
+            return
+        if self._scan_diff is not None:
+            self._finish_incremental_scan()
+            return
+        self._scan_complete = True
+        # Keep the user's header sort across refreshes
+        sort_col = self.batch_file_main_table.horizontalHeader().sortIndicatorSection()
+        if 0 <= sort_col < self.batch_file_main_model.columnCount():
+            self.batch_file_main_model.sort(
+                sort_col, self.batch_file_main_table.horizontalHeader().sortIndicatorOrder())
         # Visual grouping by dataset series (adjacent rows with same filename
         # prefix get the same subtle background tint on the filename cell).
         self._apply_series_tint()
         # Auto-uncheck any file whose size is a small fraction of its series
         # median — aborted scans with no useful data.
         self._auto_skip_small_size_in_series()
-        # Re-enable sorting after populating the table
-        #self.batch_file_main_table.setSortingEnabled(True)
-        # Highlight the first row
-        if self.batch_file_main_table.rowCount() > 0:
-            self.batch_file_main_table.setCurrentCell(0, 0)  # Select the first cell in the first row
-            self.highlight_scan = h5_files[0] #always the latest coming in scan
-            self.highlight_row = 0
-            self.log_output.append(f'Clicked on {self.highlight_scan}')
-            self._load_scan_params(self.highlight_scan)
+        self.log_output.append(f'<span style="color:green;">📂 Listed {n_files} files</span>')
 
-    def _save_cor_data(self, data_folder, cor_data_dict):
+    def _on_scan_finished(self, worker):
+        self._scan_workers.discard(worker)
+        if self._scan_worker is worker:
+            self._scan_worker = None
+        worker.deleteLater()
+
+    def _save_cor_data(self, data_folder, changes):
         """
-        Save COR data to both CSV and JSON formats.
-        Saves to the format that already exists, or JSON if neither exists.
+        Store changed COR values in the folder's DatasetStore.
+        Queued on the persistence thread, which writes the given entries
+        in one transaction after a short quiet period; rot_cen.json (and
+        batch_cor_values.csv if it exists) are re-exported when the folder
+        is left or the GUI closes.
 
         Args:
             data_folder: Path to data folder
-            cor_data_dict: Dictionary with full file paths as keys and COR values
+            changes: Dictionary {full file path: COR text}; "" clears a COR
         """
-        import csv
+        if not changes:
+            return
+        # queued; the persistence thread writes it and logs the commit (or the error)
+        self._persistence.submit_cors(self._dataset_store_for(data_folder), changes)
+        pred = self._cor_predictor
+        if pred is not None:
+            # keep the predictor current; scans whose metadata was never
+            # read are picked up by the next _train_cor_predictor
+            for path, txt in changes.items():
+                feats = self._cor_features.get(path)
+                if feats is None:
+                    continue
+                try:
+                    pred.add(path, feats, float(txt))
+                except (TypeError, ValueError):
+                    pred.remove(path)
 
-        csv_path = os.path.join(data_folder, "batch_cor_values.csv")
-        json_path = os.path.join(data_folder, "rot_cen.json")
+    # ===== COR PREDICTION FROM SCAN METADATA =====
 
-        csv_exists = os.path.exists(csv_path)
-        json_exists = os.path.exists(json_path)
+    def _on_scan_features(self, generation, feats, new, last):
+        """Metadata features loaded by the folder scan worker; newly read
+        ones are queued for the store."""
+        if generation != self._scan_generation:
+            return
+        self._cor_features.update(feats)
+        if new:
+            self._persistence.submit_features(
+                self._dataset_store_for(self.data_path.text().strip()), new)
+            self._cor_features_read += len(new)
+        if last and self._cor_features_read:
+            self.log_output.append(
+                f'<span style="color:#888;">📈 read metadata of {self._cor_features_read} '
+                f'scan(s) for COR prediction</span>')
+            self._cor_features_read = 0
+
+    def _load_cor_features(self, paths):
+        """Metadata features of scans loaded so far by the folder scan
+        worker (never read here: the GUI thread does not open HDF5 files)."""
+        return {p: self._cor_features[p] for p in paths if p in self._cor_features}
+
+    def _train_cor_predictor(self, series_keys, max_per_series=200):
+        """COR predictor of the current folder, updated with the solved rows
+        of the given series (only new or changed CORs are learned; at most
+        the ``max_per_series`` highest-index solved scans per series)."""
+        if self._cor_predictor is None:
+            self._cor_predictor = CorPredictor()
+        pred = self._cor_predictor
+        series_index = self.batch_file_main_model.series
+        todo = []
+        for sk in series_keys:
+            solved = []
+            for rec in series_index.members(sk):
+                try:
+                    solved.append((rec['path'], float(rec['cor'])))
+                except (TypeError, ValueError):
+                    continue
+            todo += [(p, c) for p, c in solved[-max_per_series:] if not pred.knows(p, c)]
+        if todo:
+            feats = self._load_cor_features([p for p, _ in todo])
+            samples = sorted((feats[p].get('time_h', 0.0), p, c) for p, c in todo if p in feats)
+            pred.fit((p, feats[p], c) for _, p, c in samples)
+        return pred
 
-        # Save to CSV if it exists or if both don't exist (backward compatibility)
-        if csv_exists:
-            try:
-                with open(csv_path, 'w', newline='') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(['Filename', 'COR'])
-                    for full_path, cor_value in sorted(cor_data_dict.items()):
-                        filename = os.path.basename(full_path)
-                        writer.writerow([filename, cor_value])
-                self.log_output.append(f'<span style="color:green;">✔ COR values saved to CSV</span>')
-            except Exception as e:
-                self.log_output.append(f'<span style="color:red;">❌ Failed to write CSV: {e}</span>')
+    def _predict_cors(self, file_infos):
+        """Metadata-based COR seeds for rows without a COR.
 
-        # Always save to JSON (current format)
-        try:
-            with open(json_path, "w") as f:
-                json.dump(cor_data_dict, f, indent=2)
-            if not csv_exists:
-                self.log_output.append(f'<span style="color:green;">✔ COR values saved to JSON</span>')
-        except Exception as e:
-            self.log_output.append(f'<span style="color:red;">❌ Failed to write JSON: {e}</span>')
+        Returns:
+            tuple: ({path: (predicted COR, expected error)}, Try search
+            half-width for those seeds)
+        """
+        default_width = self.param_widgets["--center-search-width"][1].value()
+        series_index = self.batch_file_main_model.series
+        pred = self._train_cor_predictor({series_index.key_of(fi) for fi in file_infos})
+        feats = self._load_cor_features([fi['path'] for fi in file_infos])
+        if len(feats) < len(file_infos):
+            # still being read by the folder scan: seeded without a prediction
+            self.log_output.append(
+                f'<span style="color:#888;">📈 metadata of {len(file_infos) - len(feats)} '
+                f'scan(s) not read yet; no metadata COR prediction for them</span>')
+        out = {}
+        for fi in file_infos:
+            if fi['path'] in feats:
+                guess = pred.predict(fi['path'], feats[fi['path']])
+                if guess is not None:
+                    out[fi['path']] = guess
+        return out, pred.search_width(default_width)
 
     # ===== PER-DATASET RECONSTRUCTION PARAMS =====
 
@@ -2704,81 +3090,43 @@ class TomoGUI(QWidget):
         except Exception as e:
             self.log_output.append(f'<span style="color:orange;">⚠️ Error applying params: {e}</span>')
 
-    def _load_recon_params_file(self, data_folder):
-        """Load recon_params.json from data folder. Returns dict keyed by full file path."""
-        path = os.path.join(data_folder, "recon_params.json")
-        if os.path.exists(path):
-            try:
-                with open(path, "r") as f:
-                    return json.load(f)
-            except Exception as e:
-                self.log_output.append(f'<span style="color:orange;">⚠️ Could not load recon_params.json: {e}</span>')
-        return {}
-
-    def _save_recon_params_file(self, data_folder, params_dict):
-        """Save recon_params.json to data folder."""
-        path = os.path.join(data_folder, "recon_params.json")
-        try:
-            with open(path, "w") as f:
-                json.dump(params_dict, f, indent=2)
-        except Exception as e:
-            self.log_output.append(f'<span style="color:red;">❌ Could not save recon_params.json: {e}</span>')
-
     def _save_current_scan_params(self):
-        """Save current GUI params for the highlighted scan to recon_params.json."""
+        """Save current GUI params for the highlighted scan to the dataset store."""
         if not self.highlight_scan:
             return
         self._persist_params_for_files([self.highlight_scan])
 
     def _persist_params_for_files(self, files):
-        """Snapshot the current GUI parameters and persist them under each
-        of the given file paths in recon_params.json. The write happens on
-        a background thread so the GUI doesn't block on slow filesystems
-        (NFS, networked home, etc.)."""
-        if not files:
+        """Snapshot the current GUI parameters for each of the given file
+        paths. The persistence thread writes them to the folder's
+        DatasetStore (and recon_params.json, deduplicated) once no new
+        change came in for 500 ms; each distinct snapshot is stored once
+        however many files use it."""
+        targets = [p for p in files or () if p]
+        if not targets:
             return
         data_folder = self.data_path.text().strip()
         if not data_folder or not os.path.isdir(data_folder):
             return
-        if self._recon_params_data is None:
-            self._recon_params_data = self._load_recon_params_file(data_folder)
         snapshot = self._gather_all_gui_params()
-        # Update the in-memory cache immediately so any subsequent load
-        # in this session reads the new values.
-        targets = [p for p in files if p]
-        for path in targets:
-            self._recon_params_data[path] = snapshot
-        # Take a copy of what to write so the worker thread doesn't race
-        # with future updates of self._recon_params_data.
-        to_write = dict(self._recon_params_data)
-        target_path = os.path.join(data_folder, "recon_params.json")
-
-        def _writer():
-            try:
-                tmp = target_path + ".tmp"
-                with open(tmp, "w") as fh:
-                    json.dump(to_write, fh, indent=2)
-                os.replace(tmp, target_path)
-            except Exception as exc:
-                # Background thread — can't touch GUI directly. Print to
-                # stderr so it shows up in the launching shell / log file.
-                print(f"[tomogui] background param save failed: {exc}",
-                      file=sys.stderr)
-
-        import threading
-        t = threading.Thread(target=_writer, daemon=True,
-                             name="recon-params-saver")
-        t.start()
+        self._persistence.submit_params(self._dataset_store_for(data_folder),
+                                        {path: snapshot for path in targets})
 
     def _load_scan_params(self, proj_file):
         """Load and apply saved GUI params for proj_file, if they exist."""
         data_folder = self.data_path.text().strip()
         if not data_folder or not os.path.isdir(data_folder):
             return
-        if self._recon_params_data is None:
-            self._recon_params_data = self._load_recon_params_file(data_folder)
-        if proj_file in self._recon_params_data:
-            self._apply_params_to_gui(self._recon_params_data[proj_file])
+        try:
+            store = self._dataset_store_for(data_folder)
+            params = self._persistence.pending_params(store, proj_file)
+            if params is None:
+                params = store.params_for(proj_file)
+        except Exception as e:
+            self.log_output.append(f'<span style="color:orange;">⚠️ Could not load recon params: {e}</span>')
+            return
+        if params is not None:
+            self._apply_params_to_gui(params)
             self.log_output.append(f'✅ Loaded params for {os.path.basename(proj_file)}')
 
     def _apply_series_tint(self):
@@ -2787,14 +3135,7 @@ class TomoGUI(QWidget):
         series share a tint and the boundary between series is visually obvious.
         Series is derived from the filename: everything before the final numeric index.
         """
-        import re
-        idx_re = re.compile(r'^(.*?)[._-]*(\d+)$')
-
-        def series_key(name):
-            base = os.path.splitext(name)[0]
-            m = idx_re.match(base)
-            return m.group(1) if m else base
-
+        series_index = self.batch_file_main_model.series
         # Visible tints that read clearly on both dark and light themes.
         palette = [
             QColor(42,  72, 108),   # blue
@@ -2805,32 +3146,20 @@ class TomoGUI(QWidget):
             QColor( 30,  90, 108),  # teal
         ]
 
-        table = self.batch_file_main_table
         prev_series = None
         colour_idx = -1
         n_series = 0
         n_rows = 0
-        for row in range(table.rowCount()):
-            item = table.item(row, 1)
-            if item is None:
-                continue
-            s = series_key(item.text())
+        for fi in self.batch_file_main_list:
+            s = series_index.key_of(fi)
             if s != prev_series:
                 colour_idx = (colour_idx + 1) % len(palette)
                 prev_series = s
                 n_series += 1
-            # Tint the filename cell
-            item.setBackground(palette[colour_idx])
-            # Tint the COR cell too (via its QLineEdit stylesheet — the COR
-            # column uses a cell widget, so setBackground on an item doesn't apply).
-            cor_w = table.cellWidget(row, 2)
-            if cor_w is not None:
-                c = palette[colour_idx]
-                cor_w.setStyleSheet(
-                    f"QLineEdit {{ background: rgb({c.red()},{c.green()},{c.blue()}); "
-                    f"color: #ffffff; }}"
-                )
+            # Tint the filename and COR cells (read by the model's BackgroundRole)
+            fi['tint'] = palette[colour_idx]
             n_rows += 1
+        self.batch_file_main_model.refresh_rows()
         # One summary log line so it's visible if something went wrong
         try:
             self.log_output.append(
@@ -2842,7 +3171,8 @@ class TomoGUI(QWidget):
 
     def _auto_contrast_for_file(self, proj_file, lo_pct=5, hi_pct=95):
         """Compute (vmin, vmax) as formatted strings from the 5–95 % percentile
-        of a representative slice of the reconstructed volume. Returns
+        of the middle slice (its cached histogram, built once per file), so
+        the result does not depend on which slices were viewed. Returns
         (None, None) if no TIFFs are available.
 
         Prefers the full reconstruction (`{data}_rec/{proj}_rec/*.tiff`) —
@@ -2863,29 +3193,22 @@ class TomoGUI(QWidget):
         # Take the middle slice as representative
         mid_path = tiffs[len(tiffs) // 2]
         try:
-            arr = np.array(Image.open(mid_path)).astype(np.float32)
-            lo = float(np.percentile(arr, lo_pct))
-            hi = float(np.percentile(arr, hi_pct))
+            lo, hi = self._img_stats.histogram(mid_path).percentiles([lo_pct, hi_pct])
             if hi <= lo:
                 return (None, None)
             return (f"{lo:.6g}", f"{hi:.6g}")
         except Exception:
             return (None, None)
 
-    def _auto_skip_small_size_in_series(self):
+    def _auto_skip_small_size_in_series(self, candidates=None):
         """For each series group in the table, compute the median file size and
         auto-uncheck + mark 'Skipped (small)' any file whose size is below
         `self.size_min_pct`% of that median. Aborted/partial scans typically
         produce files a tiny fraction of the size of their series peers.
-        Set the spinner to 0 to disable."""
-        import re
-        idx_re = re.compile(r'^(.*?)[._-]*(\d+)$')
-
-        def series_key(name):
-            base = os.path.splitext(name)[0]
-            m = idx_re.match(base)
-            return m.group(1) if m else base
-
+        Set the spinner to 0 to disable.
+        If `candidates` is given, only those records may be skipped (the
+        medians still use the whole table), so an incremental refresh does
+        not undo the user's re-checks."""
         try:
             pct = float(self.size_min_pct.value())
         except (AttributeError, ValueError, TypeError):
@@ -2893,46 +3216,28 @@ class TomoGUI(QWidget):
         if pct <= 0.0:
             return   # feature disabled
 
-        # Group files by series and gather (file_info, size_bytes)
-        groups = {}
-        for fi in self.batch_file_main_list:
-            try:
-                sz = os.path.getsize(fi['path'])
-            except OSError:
-                sz = 0
-            fi['_size_bytes'] = sz
-            groups.setdefault(series_key(fi['filename']), []).append(fi)
-
+        # Series groups and their size medians come from the model's index
+        # (sizes were read by the folder scan, no extra stat per file)
+        series_index = self.batch_file_main_model.series
+        if candidates is not None:
+            candidates = {id(fi) for fi in candidates}
         n_skipped = 0
-        for sk, entries in groups.items():
-            sizes = sorted(e['_size_bytes'] for e in entries if e['_size_bytes'] > 0)
-            if len(sizes) < 2:
+        for sk, entries in series_index.groups():
+            median = series_index.size_median(sk)
+            if median is None:
                 continue        # lonely file, no basis for comparison
-            median = sizes[len(sizes) // 2] if len(sizes) % 2 else 0.5 * (
-                sizes[len(sizes) // 2 - 1] + sizes[len(sizes) // 2])
             cutoff = median * (pct / 100.0)
             for fi in entries:
-                too_small = fi['_size_bytes'] < cutoff
+                if candidates is not None and id(fi) not in candidates:
+                    continue
+                too_small = (fi.get('size') or 0) < cutoff
                 fi['skipped_small'] = too_small
                 if too_small:
                     n_skipped += 1
-                    row = fi.get('row')
-                    # Uncheck
-                    try:
-                        fi['checkbox'].setChecked(False)
-                    except Exception:
-                        pass
-                    # Mark status
-                    if row is not None:
-                        item = QTableWidgetItem("Skipped (small)")
-                        item.setForeground(QColor("#999"))
-                        self.batch_file_main_table.setItem(row, 3, item)
-                        fi['status'] = item
-                        fi['recon_status'] = 'gray'
-                        # Dim the left-border indicator
-                        cb_w = self.batch_file_main_table.cellWidget(row, 0)
-                        if cb_w is not None:
-                            cb_w.setStyleSheet("QWidget { border-left: 6px solid #666; }")
+                    # Uncheck, mark status and dim the left-border indicator
+                    self.batch_file_main_model.set_checked(fi, False)
+                    self.batch_file_main_model.set_status(
+                        fi, "Skipped (small)", recon_status='#666', text_color="#999")
 
         if n_skipped:
             self.log_output.append(
@@ -2942,18 +3247,18 @@ class TomoGUI(QWidget):
 
     def _on_main_cor_edited(self, file_path:str, row:int):
         """
-        Called when the COR QLineEdit in the MAIN table is edited.
+        Called when the COR cell in the MAIN table is edited.
         Writes/updates COR data to both CSV and JSON if they exist.
         """
         data_folder = self.data_path.text().strip()
         if not data_folder:
             return
 
-        # Get the widget (QLineEdit) from the table
-        w = self.batch_file_main_table.cellWidget(row, 2)
-        if w is None:
+        # The model already holds the edited text
+        fi = self.batch_file_main_model.record(row)
+        if fi is None or fi['path'] != file_path:
             return
-        txt = w.text().strip()
+        txt = fi['cor'].strip()
         if txt == "":
             return  # user cleared it
 
@@ -2967,14 +3272,8 @@ class TomoGUI(QWidget):
         # Update in-memory data
         self.cor_data[file_path] = txt
 
-        # Save to file(s)
-        self._save_cor_data(data_folder, self.cor_data)
-
-        # Keep your list consistent: store the widget, not a string
-        try:
-            self.batch_file_main_list[row]["cor_input"] = w
-        except Exception:
-            pass    
+        # Save to the dataset store (this entry only)
+        self._save_cor_data(data_folder, {file_path: txt})
 
     def on_table_row_clicked(self, row, column):
         # Save current GUI params for the previously selected dataset before switching.
@@ -2982,14 +3281,11 @@ class TomoGUI(QWidget):
         # and apply it to every file, so skip the per-scan save/load in that case.
         if not self._batch_active and self.highlight_scan:
             self._save_current_scan_params()
-        # Get the filename from the clicked row
-        filename_item = self.batch_file_main_table.item(row, 1)  # Column 1 contains the filename
-        filename = filename_item.text()
         # Update self.highlight_scan with the full path of the selected file
-        for file_info in self.batch_file_main_list:
-            if file_info['filename'] == filename:
-                self.highlight_scan = file_info['path']
-                self.highlight_row = row #gives index of the self.batch_file_table_list
+        file_info = self.batch_file_main_model.record(row)
+        if file_info is not None:
+            self.highlight_scan = file_info['path']
+            self.highlight_row = row #gives index of the self.batch_file_main_list
         self._update_full_btn_state()  # grey out only if this file is running locally
         self.log_output.append(f'Click on {self.highlight_scan} now for other operations')
         # Load saved params for newly selected dataset only when NOT batch-processing
@@ -3179,13 +3475,14 @@ class TomoGUI(QWidget):
         self.process.clear()
         self.batch_running = False
 
-    def run_command_live(self, cmd, proj_file=None, job_label=None, *, wait=False, cuda_devices=None):
+    def run_command_live(self, cmd, proj_file=None, job_label=None, *, wait=False, cuda_devices=None, extra_env=None):
         """
         cmd: list of command and args
         proj_file: projections path
         job_label: label for the job
         wait: whether to wait for the process to finish, if False, return QProcess object immediately, if True, return exit code when finished
         cuda_devices: str, e.g. "0", "1" for GPU tomocupy use
+        extra_env: dict of additional environment variables for the process
         """
         scan_id = None
         if proj_file:
@@ -3210,6 +3507,8 @@ class TomoGUI(QWidget):
         env = QProcessEnvironment.systemEnvironment()
         if cuda_devices is not None:
             env.insert("CUDA_VISIBLE_DEVICES", str(cuda_devices))
+        for key, val in (extra_env or {}).items():
+            env.insert(str(key), str(val))
         p.setProcessEnvironment(env)
         
         loop = QEventLoop() if wait else None
@@ -3262,59 +3561,35 @@ class TomoGUI(QWidget):
 
     # ===== RECONSTRUCTION METHODS =====
     def _update_row(self,row,color,status):
-        row = self.highlight_row
-        if row is None:
+        # Resolve by path, not by row: sync inserts and sorting move rows.
+        file_info = self._highlight_record()
+        if file_info is None:
             self.log_output.append(f'<span style="color:red;">\u274c No row highlighted</span>')
             return
-        self.batch_file_main_list[row]['recon_status'] = color
-        checkbox_widget = self.batch_file_main_table.cellWidget(row, 0)
-        if checkbox_widget:
-            checkbox_widget.setStyleSheet(f"QWidget {{ border-left: 6px solid {color}; }}")
-        status_item = QTableWidgetItem(status)
-        status_item.setTextAlignment(Qt.AlignCenter)
-        self.batch_file_main_table.setItem(row, 3, status_item)
-        self.batch_file_main_list[row]['status'] = status
+        self.batch_file_main_model.set_status(file_info, status, recon_status=color)
+
+    def _highlight_record(self):
+        """Row record of the highlighted scan, or None."""
+        return self.batch_file_main_model.record_for(self.highlight_scan)
+
+    def _on_main_table_reordered(self, *args):
+        """Rows were inserted, removed or sorted: keep row-based state valid."""
+        self.batch_last_clicked_row = None
+        self.highlight_row = self._find_row_by_filepath(self.highlight_scan)
         
     def _find_row_by_filepath(self, filepath):
-        """Row lookup by full path. Scans `batch_file_main_list` (authoritative)
-        and falls back to table text/tooltip matching if needed."""
-        # 1) Authoritative: the Python-side list
-        for fi in self.batch_file_main_list:
-            if fi.get('path') == filepath:
-                return fi.get('row')
-        # 2) Fallback via table contents (filename is in column 1, not 0)
-        base = os.path.basename(filepath)
-        for row in range(self.batch_file_main_table.rowCount()):
-            item = self.batch_file_main_table.item(row, 1)
-            if item is None:
-                continue
-            if item.text() == base:
-                return row
-            if filepath and filepath in (item.toolTip() or ""):
-                return row
-        return None
+        """Row lookup by full path (falls back to the basename). O(1)."""
+        return self.batch_file_main_model.find_row(filepath)
 
     def _find_row_by_filename(self, filename, filename_col=None):
-        """Row lookup by full path or by bare basename."""
-        base = os.path.basename(filename)
-        # 1) Authoritative Python list first
-        for fi in self.batch_file_main_list:
-            if fi.get('path') == filename:
-                return fi.get('row')
-            if fi.get('filename') == base:
-                return fi.get('row')
-        # 2) Fallback via the filename column (1, not 0 — 0 is the checkbox)
-        for row in range(self.batch_file_main_table.rowCount()):
-            item = self.batch_file_main_table.item(row, 1)
-            if item is None:
-                continue
-            if item.text() == base:
-                return row
-            if filename and filename in (item.toolTip() or ""):
-                return row
-        return None
+        """Row lookup by full path or by bare basename. O(1)."""
+        return self.batch_file_main_model.find_row(filename)
+
+    def try_reconstruction(self, end_proj=None):
+        """Run a try reconstruction for the highlighted file.
 
-    def try_reconstruction(self):
+        end_proj: if given, only the first ``end_proj`` projections are used
+        (early-start on a scan that is still being written)."""
         proj_file = self.highlight_scan
         if not proj_file:
             self.log_output.append(f"\u274c No file")
@@ -3376,8 +3651,17 @@ class TomoGUI(QWidget):
             cmd += self._gather_Geometry_args()
             cmd += self._gather_Data_args()                        
             cmd += self._gather_Performance_args()
+
+        extra_env = None
+        if end_proj is not None:
+            # later flags win in argparse, so this overrides the GUI value
+            cmd += ["--start-proj", "0", "--end-proj", str(int(end_proj))]
+            # the acquisition still holds the file open for writing
+            extra_env = {"HDF5_USE_FILE_LOCKING": "FALSE"}
+            self.log_output.append(f'⏩ Early try on first {int(end_proj)} projections')
                                 
-        code = self.run_command_live(cmd, proj_file=proj_file, job_label="Try recon", wait=True, cuda_devices=gpu)
+        code = self.run_command_live(cmd, proj_file=proj_file, job_label="Try recon", wait=True,
+                                     cuda_devices=gpu, extra_env=extra_env)
         try:
             if code == 0:
                 self._update_row(row=self.highlight_row,color='orange',status='Done try') #change table content and self.batch_file_list
@@ -3395,18 +3679,18 @@ class TomoGUI(QWidget):
                 except Exception as e:
                     self.log_output.append(f'<span style="color:red;">\u26a0\ufe0f Could not remove {temp_try}: {e}</span>')
 
-    def try_ai_reconstruction(self):
-        if self.highlight_scan:
-            self._persist_params_for_files([self.highlight_scan])
+    def try_ai_reconstruction(self, run_full=True, end_proj=None):
         """Run Try reconstruction then AI inference to find best COR.
 
         Starting-COR policy: prefer the currently-highlighted row's COR if it
         is a valid number; otherwise fall back to the top-bar Try COR input.
-        This applies to both single-file and batch invocations."""
-        import re
-        from argparse import Namespace
-        from PIL import Image as _PIL_Image
+        This applies to both single-file and batch invocations.
 
+        run_full: start the full reconstruction with the AI COR; when False
+        return True once the COR has been saved.
+        end_proj: forwarded to try_reconstruction (partial scan)."""
+        if self.highlight_scan:
+            self._persist_params_for_files([self.highlight_scan])
         model_path = self.ai_model_path.text().strip()
         if not model_path or not os.path.exists(model_path):
             self.log_output.append('<span style="color:red;">❌ Invalid AI model path</span>')
@@ -3414,10 +3698,9 @@ class TomoGUI(QWidget):
 
         # Resolve the starting COR: row first, then top-bar.
         row_cor = ""
-        if self.highlight_row is not None:
-            w = self.batch_file_main_table.cellWidget(self.highlight_row, 2)
-            if w is not None:
-                row_cor = w.text().strip()
+        highlight_fi = self._highlight_record()
+        if highlight_fi is not None:
+            row_cor = highlight_fi['cor'].strip()
         bar_cor = self.cor_input.text().strip()
         chosen_cor = row_cor or bar_cor
         if chosen_cor and self.cor_method_box.currentText() != "auto":
@@ -3433,7 +3716,7 @@ class TomoGUI(QWidget):
             self._cor_input_prev = None
 
         # Step 1: run regular try reconstruction (blocks until done)
-        ok = self.try_reconstruction()
+        ok = self.try_reconstruction(end_proj=end_proj)
 
         # Step 2: locate the output TIFFs
         proj_file = self.highlight_scan
@@ -3447,69 +3730,35 @@ class TomoGUI(QWidget):
             self.log_output.append(f'<span style="color:red;">❌ No TIFFs in {try_dir}</span>')
             return
 
-        # Step 3: load images and extract COR values from filenames
-        img_list = []
-        cor_list = []
-        for tiff in tiff_files:
-            m = re.search(r'center(\d+\.\d+)', os.path.basename(tiff))
-            if not m:
-                continue
-            cor_val = float(m.group(1))
-            arr = np.array(_PIL_Image.open(tiff)).astype(np.float32)
-            img_list.append(arr)
-            cor_list.append(cor_val)
-
-        if not img_list:
-            self.log_output.append('<span style="color:red;">❌ Could not parse COR values from TIFF filenames</span>')
-            return
-
-        img_cache = np.array(img_list)
-        center_of_rotation_cache = np.array(cor_list)
-
-        # Step 4: run inference
-        try:
-            from tomogui._tomocor_infer.inference import inference_pipeline
-        except ImportError as e:
-            self.log_output.append(f'<span style="color:red;">❌ Inference module error: {e}</span>')
-            return
-
-        ai_args = Namespace(
-            infer_use_8bits=True,
-            infer_downsample_factor=2,
-            infer_num_windows=3,
-            infer_seed_number=10,
-            infer_model_path=model_path,
-            infer_window_size=518,
-        )
-
-        self.log_output.append(f'🤖 Running AI inference on {len(img_list)} slices...')
+        # Step 3: run inference on the session thread (the model stays
+        # loaded between clicks)
+        self.log_output.append(f'🤖 Running AI inference on {len(tiff_files)} slices...')
         QApplication.processEvents()
 
         try:
-            inference_pipeline(ai_args, img_cache, center_of_rotation_cache, try_dir)
-            cor_txt = os.path.join(try_dir, 'center_of_rotation.txt')
-            if os.path.exists(cor_txt):
-                with open(cor_txt) as f:
-                    lines = [line.strip() for line in f if line.strip()]
-                if lines:
-                    ai_cor = lines[-1]
-                    float(ai_cor)  # validate
-                    self.cor_data[proj_file] = ai_cor
-                    self._save_cor_data(data_folder, self.cor_data)
-                    if self.highlight_row is not None:
-                        cor_widget = self.batch_file_main_table.cellWidget(self.highlight_row, 2)
-                        if cor_widget:
-                            cor_widget.setText(str(ai_cor))
-                    self.log_output.append(f'<span style="color:green;">✅ AI COR: {ai_cor} — saved for {os.path.basename(proj_file)}</span>')
-                    # Run full reconstruction with the AI-predicted COR
-                    self.log_output.append('🚀 Starting full reconstruction with AI COR...')
-                    QApplication.processEvents()
-                    return self.full_reconstruction()
-						
-                else:
-                    self.log_output.append('<span style="color:orange;">⚠️ center_of_rotation.txt is empty</span>')
+            # the result comes back directly; center_of_rotation.txt is
+            # still written for other tools
+            result = self._infer_session.infer(proj_file, tiff_files, model_path, try_dir)
+            self._infer_results[proj_file] = result
+            if result.get('event') == 'result':
+                ai_cor = f"{result['cor']:.1f}"
+                self.cor_data[proj_file] = ai_cor
+                self._save_cor_data(data_folder, {proj_file: ai_cor})
+                file_info = self.batch_file_main_model.record_for(proj_file)
+                if file_info is not None:
+                    self.batch_file_main_model.set_cor(file_info, ai_cor)
+                timing = result.get('timing', {})
+                self.log_output.append(
+                    f'<span style="color:green;">✅ AI COR: {ai_cor} — saved for {os.path.basename(proj_file)}'
+                    f' (load {timing.get("load", 0):.1f} s, infer {timing.get("infer", 0):.1f} s)</span>')
+                if not run_full:
+                    return True
+                # Run full reconstruction with the AI-predicted COR
+                self.log_output.append('🚀 Starting full reconstruction with AI COR...')
+                QApplication.processEvents()
+                return self.full_reconstruction()
             else:
-                self.log_output.append(f'<span style="color:orange;">⚠️ Output not found: {cor_txt}</span>')
+                self.log_output.append(f'<span style="color:orange;">⚠️ No AI result: {result.get("reason")}</span>')
         except Exception as e:
             self.log_output.append(f'<span style="color:red;">❌ AI Reco error: {e}</span>')
         finally:
@@ -3521,13 +3770,10 @@ class TomoGUI(QWidget):
 
     def _run_ai_inference_for_file(self, proj_file, model_path=None):
         """Run DINOv2 inference on the existing try-reconstruction TIFFs of
-        one file and write the predicted COR into the row + rot_cen.json.
+        one file and write the predicted COR into the row + .tomogui.db.
         Returns the predicted COR as a string on success, or None on failure.
         Does NOT run try or full reconstruction — caller is responsible for
         those (and must have run 'try' first so the TIFFs exist)."""
-        import re as _re
-        from argparse import Namespace as _NS
-        from PIL import Image as _PIL_Image
         if model_path is None:
             model_path = self.ai_model_path.text().strip()
         if not model_path or not os.path.exists(model_path):
@@ -3543,53 +3789,22 @@ class TomoGUI(QWidget):
                 f'in {try_dir} — try reconstruction did not run</span>'
             )
             return None
-        img_list, cor_list = [], []
-        for tiff in tiff_files:
-            m = _re.search(r'center(\d+\.\d+)', os.path.basename(tiff))
-            if not m:
-                continue
-            cor_list.append(float(m.group(1)))
-            img_list.append(np.array(_PIL_Image.open(tiff)).astype(np.float32))
-        if not img_list:
-            self.log_output.append('<span style="color:red;">❌ Could not parse COR values</span>')
-            return None
-        try:
-            from tomogui._tomocor_infer.inference import inference_pipeline
-        except ImportError as e:
-            self.log_output.append(f'<span style="color:red;">❌ Inference module error: {e}</span>')
-            return None
-        ai_args = _NS(infer_use_8bits=True, infer_downsample_factor=2,
-                      infer_num_windows=3, infer_seed_number=10,
-                      infer_model_path=model_path, infer_window_size=518)
-        try:
-            inference_pipeline(ai_args, np.array(img_list), np.array(cor_list), try_dir)
-        except Exception as e:
+        result = self._infer_session.infer(proj_file, tiff_files, model_path, try_dir)
+        self._infer_results[proj_file] = result
+        if result.get('event') != 'result':
             self.log_output.append(
                 f'<span style="color:red;">❌ AI inference failed for '
-                f'{os.path.basename(proj_file)}: {e}</span>'
+                f'{os.path.basename(proj_file)}: {result.get("reason")}</span>'
             )
             return None
-        cor_txt = os.path.join(try_dir, 'center_of_rotation.txt')
-        if not os.path.exists(cor_txt):
-            return None
-        with open(cor_txt) as f:
-            lines = [line.strip() for line in f if line.strip()]
-        if not lines:
-            return None
-        ai_cor = lines[-1]
-        try:
-            float(ai_cor)
-        except ValueError:
-            return None
+        ai_cor = f"{result['cor']:.1f}"
         # Persist + reflect in the table
         self.cor_data[proj_file] = ai_cor
         if data_folder:
-            self._save_cor_data(data_folder, self.cor_data)
-        row = self._find_row_by_filepath(proj_file)
-        if row is not None:
-            w = self.batch_file_main_table.cellWidget(row, 2)
-            if w is not None:
-                w.setText(str(ai_cor))
+            self._save_cor_data(data_folder, {proj_file: ai_cor})
+        file_info = self.batch_file_main_model.record_for(proj_file)
+        if file_info is not None:
+            self.batch_file_main_model.set_cor(file_info, ai_cor)
         return ai_cor
 
     # ------------------------------------------------------------------ #
@@ -3612,9 +3827,14 @@ class TomoGUI(QWidget):
         self._sync_queue = []
         self._sync_processing = False
         self._sync_current_file = None
-        
-        self._sync_watcher = SyncWatcher(data_folder, known)
+        self._sync_partial_done = set()
+
+        partial_fraction = None
+        if self.sync_early_start.isChecked():
+            partial_fraction = self.sync_early_pct.value() / 100.0
+        self._sync_watcher = SyncWatcher(data_folder, known, partial_fraction=partial_fraction)
         self._sync_watcher.new_file_ready.connect(self._on_new_sync_file)
+        self._sync_watcher.partial_file_ready.connect(self._on_partial_sync_file)
         self._sync_watcher.file_progress.connect(
             lambda f, n, t: self.log_output.append(
                 f'⏳ {os.path.basename(f)}: {n}/{t} projections written'
@@ -3624,10 +3844,41 @@ class TomoGUI(QWidget):
         
         self.sync_btn.setText("⏹  Stop Sync")
         self.batch_file_main_table.setEnabled(False)
+        self.sync_early_start.setEnabled(False)
+        self.sync_early_pct.setEnabled(False)
         self.log_output.append(f'<span style="color:green;">🔄 Sync Acquisition started — watching {data_folder}</span>')
+        if partial_fraction:
+            self.log_output.append(f'⏩ Early start enabled: Try + AI COR at {partial_fraction:.0%} of projections')
+
+    def _unload_other_ai_models(self):
+        current = self.ai_model_path.text().strip()
+        for path in self._infer_session.loaded():
+            if path != current:
+                self._infer_session.unload(path)
 
     def closeEvent(self, event):
         """Ensure background threads stop cleanly before the window closes."""
+        for worker in list(self._scan_workers):
+            worker.cancel()
+            worker.wait(2000)
+        self._infer_session.stop()
+        self._infer_session.wait(10000)
+        self._stop_ortho_builder()
+        self._thumb_loader.shutdown()
+        self._slice_loader.shutdown()
+        self._slice_cache.stop()
+        self._img_stats.stop()
+        for worker in (getattr(self, "_pyramid_builder", None),    # pyqtgraph viewer only
+                       getattr(self, "_lut_renderer", None)):
+            if worker is not None:
+                worker.stop()
+                worker.wait(2000)
+        # write queued changes and the legacy files before the window goes
+        self._close_dataset_store()
+        self._persistence.stop()
+        if not self._persistence.wait(15000):
+            print(f"[tomogui] persistence thread did not finish: {self._persistence.stats()}",
+                  file=sys.stderr)
         try:
             if self._sync_watcher:
                 self._sync_watcher.stop()
@@ -3652,10 +3903,13 @@ class TomoGUI(QWidget):
         self._sync_queue = []
         self._sync_processing = False
         self._sync_current_file = None
+        self._sync_partial_done = set()
         
         self.sync_btn.setText("▶  Sync Acquisition")
         self.sync_btn.setChecked(False)
         self.batch_file_main_table.setEnabled(True)
+        self.sync_early_start.setEnabled(True)
+        self.sync_early_pct.setEnabled(True)
         self.log_output.append('🔄 Sync Acquisition stopped.')
 
     def _on_new_sync_file(self, filepath):
@@ -3663,11 +3917,14 @@ class TomoGUI(QWidget):
         self.log_output.append(f'🆕 New file detected: <b>{os.path.basename(filepath)}</b>')
         QApplication.processEvents()
 
-        # queue, not process data
-        if filepath != self._sync_current_file and filepath not in self._sync_queue:
-            self._sync_queue.append(filepath)
-            self.log_output.append(f'📥 Added to sync queue: {os.path.basename(filepath)} '
-            f'(queue={len(self._sync_queue)})')
+        # queue, not process data. Queue entries are (path, n_done) where
+        # n_done is None for a complete scan and the projection count for
+        # an early-start (partial) stage.
+        # A complete scan supersedes a partial stage that has not started yet.
+        self._sync_queue = [e for e in self._sync_queue if e[0] != filepath]
+        self._sync_queue.append((filepath, None))
+        self.log_output.append(f'📥 Added to sync queue: {os.path.basename(filepath)} '
+        f'(queue={len(self._sync_queue)})')
         if not self._sync_processing:
             self._process_next_sync_file()
 
@@ -3688,123 +3945,41 @@ class TomoGUI(QWidget):
         #self._run_tomolog_for_file(filepath)
         #return 
 
+    def _on_partial_sync_file(self, filepath, n_done, n_total):
+        """Called when enough projections of a scan in progress are written
+        for the early try + AI COR stage."""
+        self.log_output.append(
+            f'⏩ Partial scan ready: <b>{os.path.basename(filepath)}</b> '
+            f'({n_done}/{n_total} projections)'
+        )
+        if filepath == self._sync_current_file or any(e[0] == filepath for e in self._sync_queue):
+            return
+        self._sync_queue.append((filepath, n_done))
+        self.log_output.append(f'📥 Added to sync queue (early try): {os.path.basename(filepath)} '
+        f'(queue={len(self._sync_queue)})')
+        if not self._sync_processing:
+            self._process_next_sync_file()
+
     def _add_file_to_table(self, filepath):
         """Insert a single file row into the table if it is not already there."""
         # Check if already present
-        for row in range(self.batch_file_main_table.rowCount()):
-            item = self.batch_file_main_table.item(row, 1)
-            if item.text() == os.path.basename(filepath):
-                self.log_output.append('file exists in table, leave')
-                return
+        if self.batch_file_main_model.record_for(filepath) is not None:
+            self.log_output.append('file exists in table, leave')
+            return
         data_folder = self.data_path.text().strip()
         filename = os.path.basename(filepath)
         proj_name = os.path.splitext(filename)[0]
-        try_dir = os.path.join(f"{data_folder}_rec", "try_center", proj_name)
-        full_dir = os.path.join(f"{data_folder}_rec", f"{proj_name}_rec")
-        has_try = os.path.isdir(try_dir) and len(glob.glob(os.path.join(try_dir, "*.tiff"))) > 0
-        has_full = os.path.isdir(full_dir) and len(glob.glob(os.path.join(full_dir, "*.tiff"))) > 0
-
-        row = 0  # insert at top (newest first)
-        self.batch_file_main_table.insertRow(row)
-
-        if has_full:
-            row_color, status_text = "green", "Full"
-            fp = glob.glob(os.path.join(full_dir, "*.tiff"))
-            num_1 = int(Path(fp[0]).stem.split("_")[-1])
-            num_2 = int(Path(fp[-1]).stem.split("_")[-1])
-            status_item = QTableWidgetItem(f"{status_text} {num_1}-{num_2}")
-        elif has_try:
-            row_color, status_text = "orange", "Done try"
-            status_item = QTableWidgetItem(status_text)
-        else:
-            row_color, status_text = "red", "Ready"
-            status_item = QTableWidgetItem(status_text)
-        
-        # checkbox
-        checkbox = QCheckBox()
-        checkbox.clicked.connect(lambda checked, r=row: self._batch_checkbox_clicked(r, checked))
-        checkbox_widget = QWidget()
-        checkbox_layout = QHBoxLayout(checkbox_widget)
-        checkbox_layout.addWidget(checkbox)
-        checkbox_layout.setAlignment(Qt.AlignCenter)
-        checkbox_layout.setContentsMargins(0, 0, 0, 0)
-        checkbox_widget.setStyleSheet(f"QWidget {{ border-left: 6px solid {row_color}; }}")
-        self.batch_file_main_table.setCellWidget(row, 0, checkbox_widget)
-        
-        # filename
-        filename_item = QTableWidgetItem(filename)
-        filename_item.setToolTip(f"{filename}\n\nFull path:\n{filepath}")
-        self.batch_file_main_table.setItem(row, 1, filename_item)
-        
-        #cor default
-        cor_input = QLineEdit("")
-        cor_input.setPlaceholderText("COR value")
-        cor_input.setAlignment(Qt.AlignCenter)
-        cor_input.setFixedWidth(80)
-        self.batch_file_main_table.setCellWidget(row, 2, cor_input)
-        
-        #status
-        self.batch_file_main_table.setItem(row, 3, status_item)
-        
-        #file size
-        file_size = os.path.getsize(filepath)
-        size_str = self._format_file_size(file_size)
-        size_item = QTableWidgetItem(size_str)
-        size_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        size_item.setData(Qt.UserRole, file_size)
-        self.batch_file_main_table.setItem(row, 4, size_item)
-        
-        #placehold
-        actions_widget = QWidget()
-        actions_layout = QHBoxLayout(actions_widget)
-        actions_layout.setContentsMargins(2, 2, 2, 2)
-        actions_layout.setSpacing(2)
-        self.batch_file_main_table.setCellWidget(row, 5, actions_widget)
-        
-        #view data
-        view_data_btn = QPushButton("View Data")
-        view_data_btn.setFixedWidth(80)
-        view_data_btn.clicked.connect(lambda checked, fp=filepath: self._batch_view_data(fp))
-        self.batch_file_main_table.setCellWidget(row, 6, view_data_btn)
-        
-        file_info = {
-        'path': filepath,
-        'filename': filename,
-        'recon_status': row_color,
-        'checkbox': checkbox,
-        'checkbox_widget': checkbox_widget,
-        'cor_input': cor_input,
-        'status': status_item,
-        'view_btn': view_data_btn,
-        }
+        row_color, status_text = self._recon_status_index.lookup(data_folder, proj_name).row_status()
+
+        try:
+            file_size = os.path.getsize(filepath)
+        except OSError:
+            file_size = None
 
-        self.batch_file_main_list.insert(row, file_info)
+        file_info = make_record(filepath, filename, cor="", status=status_text,
+                                recon_status=row_color, size=file_size)
+        self.batch_file_main_model.insert_record(0, file_info)  # insert at top (newest first)
         self.log_output.append(f'this is file info {file_info}')
-        '''
-        from PyQt5.QtWidgets import QTableWidgetItem as _TWI
-        name_item = _TWI(filename)
-        name_item.setToolTip(filepath)
-        name_item.setForeground(QColor(row_color))
-        self.batch_file_main_table.setItem(row, 1, name_item)
-
-        status_item = _TWI(status_text)
-        status_item.setForeground(QColor(row_color))
-        self.batch_file_main_table.setItem(row, 3, status_item)
-
-        cor_val = self.cor_data.get(filepath, "")
-        cor_widget = QLineEdit(str(cor_val))
-        cor_widget.setAlignment(Qt.AlignCenter)
-        self.batch_file_main_table.setCellWidget(row, 2, cor_widget)
-        
-        file_size = os.path.getsize(f)
-        size_str = self._format_file_size(file_size)
-        size_item = QTableWidgetItem(size_str)
-        size_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        # Store numeric value for proper sorting
-        size_item.setData(Qt.UserRole, file_size)
-        self.batch_file_main_table.setItem(row, 4, size_item)
-        '''
-        #self.batch_file_main_list.insert(0, {'file': filepath, 'cor_input': cor_widget})
         
     def _process_next_sync_file(self):
         if not self.sync_btn.isChecked():
@@ -3814,28 +3989,41 @@ class TomoGUI(QWidget):
         if not self._sync_queue:
             self._sync_current_file = None
             return
-        filepath = self._sync_queue.pop(0)
+        filepath, n_partial = self._sync_queue.pop(0)
         self._sync_current_file = filepath
         self._sync_processing = True
         self._add_file_to_table(filepath) #always the first one 
         self.log_output.append(f'▶ Start sync processing: <b>{os.path.basename(filepath)}</b>')
         # Select the row so highlight_scan is set correctly
-        for row in reversed(range(self.batch_file_main_table.rowCount())):
-            item = self.batch_file_main_table.item(row, 1)
-            if item.text() == os.path.basename(filepath):
-                self.batch_file_main_table.selectRow(row)
-                self.on_table_row_clicked(row, 0)
-                break
+        row = self._find_row_by_filepath(filepath)
+        if row is not None:
+            self.batch_file_main_table.selectRow(row)
+            self.on_table_row_clicked(row, 0)
                 
         QApplication.processEvents()
-        ok = self.try_ai_reconstruction()
-        
-        if ok:
-            self._run_tomolog_for_file(filepath)
+        if n_partial is not None:
+            # Early stage: try + AI COR on the projections written so far;
+            # full recon + tomolog wait for new_file_ready.
+            if self.try_ai_reconstruction(run_full=False, end_proj=n_partial):
+                self._sync_partial_done.add(filepath)
+            else:
+                self.log_output.append(
+                    f'<span style="color:orange;">⚠️ Early try failed, will retry when scan completes: {os.path.basename(filepath)}</span>'
+                )
         else:
-            self.log_output.append(
-                f'<span style="color:red;">❌ Sync reconstruction failed, skipping tomolog: {os.path.basename(filepath)}</span>'
-             )
+            if filepath in self._sync_partial_done:
+                # COR already found on the partial scan
+                self._sync_partial_done.discard(filepath)
+                ok = self.full_reconstruction()
+            else:
+                ok = self.try_ai_reconstruction()
+
+            if ok:
+                self._run_tomolog_for_file(filepath)
+            else:
+                self.log_output.append(
+                    f'<span style="color:red;">❌ Sync reconstruction failed, skipping tomolog: {os.path.basename(filepath)}</span>'
+                 )
 
         self._sync_processing = False
         self._sync_current_file = None
@@ -3900,13 +4088,12 @@ class TomoGUI(QWidget):
         try:
             pn = os.path.splitext(os.path.basename(proj_file))[0]
             recon_way = self.recon_way_box_full.currentText()
-            highlight_row = self.highlight_row
             cor_method = self.cor_full_method.currentText()
             gpu = str(self.cuda_full_box.value())
             if cor_method == "manual":
                 try:
-                    cor_value = float(self.batch_file_main_list[self.highlight_row]['cor_input'].text().strip())
-                except ValueError:
+                    cor_value = float(self._highlight_record()['cor'].strip())
+                except (ValueError, TypeError):
                     self.log_output.append('<span style="color:red;">\u274c[ERROR] Invalid Full COR value</span>')
                     return
             if self.use_conf_box.isChecked():
@@ -3947,13 +4134,9 @@ class TomoGUI(QWidget):
             code = self.run_command_live(cmd, proj_file=proj_file, job_label="Full recon", wait=True, cuda_devices=gpu)
             try:
                 if code == 0:
-                    fullpath = os.path.join(f"{self.data_path.text()}_rec", f"{pn}_rec")
-                    full_files = glob.glob(os.path.join(fullpath, "*.tiff"))
-                    num_1 = int(Path(full_files[0]).stem.split("_")[-1])
-                    num_2 = int(Path(full_files[-1]).stem.split("_")[-1])
-                    self._update_row(row=self.highlight_row, color='green', status=f'Full {num_1}-{num_2}')
+                    st = self._recon_status_index.lookup(self.data_path.text(), pn)
+                    self._update_row(row=self.highlight_row, color='green', status=st.full_range_text())
                     self.log_output.append(f'<span style="color:green;">\u2705 Done full recon {proj_file}</span>')
-                    del fullpath, full_files, num_1, num_2, pn
                     return True
                 else:
                     self.log_output.append(f'<span style="color:red;">\u274c Full recon {proj_file} failed</span>')
@@ -3986,7 +4169,7 @@ class TomoGUI(QWidget):
             if file_info.get('skipped_small'):
                 skipped_small += 1
                 continue
-            file_info['checkbox'].setChecked(True)
+            self.batch_file_main_model.set_checked(file_info, True)
         msg = '<span style="color:green;">Select all files in table</span>'
         if skipped_small:
             msg += (f' <span style="color:#888;">'
@@ -3996,7 +4179,7 @@ class TomoGUI(QWidget):
     def _batch_deselect_all(self):
         """Deselect all files in the batch list"""
         for file_info in self.batch_file_main_list:
-            file_info['checkbox'].setChecked(False)
+            self.batch_file_main_model.set_checked(file_info, False)
         self.log_output.append(f'<span style="color:green;">Unselect all files in table</span>')
 
     def _get_batch_machine_command(self, cmd, machine):
@@ -4047,7 +4230,6 @@ class TomoGUI(QWidget):
         '''
         data_folder = self.data_path.text().strip()
         proj_file = self.highlight_scan
-        row = self.highlight_row
         idx = self.slice_slider.value()
         cor_file = self.preview_files[idx]
         if not os.path.exists(proj_file) or not os.path.exists(cor_file):
@@ -4059,23 +4241,11 @@ class TomoGUI(QWidget):
         except IndexError:
             self.log_output('<span style="color:red;">\u274c[ERROR] Value not found in expected format, cannot add COR</span>')
             return
-        json_path = os.path.join(data_folder, "rot_cen.json")
-        if os.path.exists(json_path):
-            with open(json_path, "r") as f:
-                try:
-                    self.cor_data = json.load(f)
-                    fns = list(self.cor_data.keys())
-                except json.JSONDecodeError:
-                    self.cor_data = {}
-        else:
-            self.cor_data = {}
-            fns = []
-        
-        if proj_file in fns:
+        if proj_file in self.cor_data:
             overfn_msg_box = QMessageBox(self)
             overfn_msg_box.setIcon(QMessageBox.Warning)
             overfn_msg_box.setWindowTitle("Overwrite Existing files in log?")
-            overfn_msg_box.setText(f"The scan:\n{os.path.basename(proj_file)}\nalready exists in rot_cen.json.\n\nDo you want to overwrite it?")
+            overfn_msg_box.setText(f"The scan:\n{os.path.basename(proj_file)}\nalready has a saved COR.\n\nDo you want to overwrite it?")
             overfn_msg_box.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
             overfn_msg_box.setDefaultButton(QMessageBox.No)
             result = overfn_msg_box.exec()
@@ -4084,19 +4254,13 @@ class TomoGUI(QWidget):
                 return
         self.cor_data[proj_file] = cor_value
 
-        # Save to file(s) using the helper method
-        self._save_cor_data(data_folder, self.cor_data)
+        # Save to the dataset store using the helper method
+        self._save_cor_data(data_folder, {proj_file: cor_value})
 
-        # Update the table widget
-        w = self.batch_file_main_table.cellWidget(row, 2)
-        if w is None:
-            w = QLineEdit()
-            w.setAlignment(Qt.AlignCenter)
-            w.setFixedWidth(80)
-            self.batch_file_main_table.setCellWidget(row, 2, w)
-        w.setText(str(cor_value))
-        # keep list storing the widget
-        self.batch_file_main_list[row]['cor_input'] = w
+        # Update the table
+        file_info = self._highlight_record()
+        if file_info is not None:
+            self.batch_file_main_model.set_cor(file_info, cor_value)
         self.log_output.append(f"\u2705[INFO] COR saved for: {os.path.basename(proj_file)}")
 
     # ===== IMAGE VIEWING =====
@@ -4113,16 +4277,65 @@ class TomoGUI(QWidget):
         self.log_output.append(f"first: {self.preview_files[0]}; last: {self.preview_files[-1]}")
         self._clear_roi()
         self._reset_view_state()
+        self._reset_ortho_mode(enabled=False)
         #self.set_image_scale(self.preview_files[0])
         try:
             self.slice_slider.valueChanged.disconnect()
         except TypeError:
             pass
         self.slice_slider.setMaximum(len(self.preview_files) - 1)
+        self._slice_cache.set_files(self.preview_files)
         self.slice_slider.valueChanged.connect(self.update_try_slice)
         self._try_proj_name = proj_name
+        self._current_view_mode = "try"
         self.update_try_slice()  
 
+    def view_try_sheet(self):
+        """Contact sheet of the try CORs of the highlighted scan; clicking
+        a tile shows that candidate here at full resolution."""
+        self.view_try_reconstruction()
+        if not self.preview_files:
+            return
+        proj_file = self.highlight_scan
+        result = self._infer_results.get(proj_file)
+        if result is None:
+            # no scores in this session: the AI pick from center_of_rotation.txt, if any
+            result = FileChannel.read(os.path.dirname(self.preview_files[0]), proj_file)
+        if result.get('event') != 'result':
+            result = None
+        if self._cor_sheet is not None:
+            self._cor_sheet.close()
+        levels = (self.vmin, self.vmax) if self.vmin is not None and self.vmax is not None else None
+        self._cor_sheet = CorSheetDialog(self.preview_files, self._thumb_loader, result=result,
+                                         cmap=self.current_cmap, levels=levels,
+                                         title=os.path.basename(proj_file), parent=self)
+        self._cor_sheet.tile_clicked.connect(lambda idx, scan=proj_file: self._on_sheet_tile(scan, idx))
+        self._cor_sheet.show()
+
+    def _on_sheet_tile(self, proj_file, idx):
+        """Show candidate ``idx`` of the sheet's scan, switching the viewer
+        back to that scan's Try series if it has moved on."""
+        sheet = self._cor_sheet
+        if sheet is None:
+            return
+        proj_name = os.path.splitext(os.path.basename(proj_file))[0]
+        if (getattr(self, "_current_view_mode", None) != "try"
+                or getattr(self, "_try_proj_name", None) != proj_name
+                or self.preview_files != sheet.files):
+            self.highlight_scan = proj_file
+            self.view_try_reconstruction()
+            if self.preview_files != sheet.files:
+                self.log_output.append(f'<span style="color:red;">\u274c Try reconstruction of {proj_name} changed since the sheet was opened; reopen the sheet</span>')
+                return
+        if not 0 <= idx < len(self.preview_files):
+            return
+        if self.slice_slider.value() == idx:
+            self.update_try_slice()
+        else:
+            self.slice_slider.setValue(idx)
+        self.raise_()
+        self.activateWindow()
+
     def view_full_reconstruction(self):
         data_folder = self.data_path.text().strip()
         proj_file = self.highlight_scan
@@ -4135,24 +4348,125 @@ class TomoGUI(QWidget):
         self.log_output.append(f"first: {self.full_files[0]}; last: {self.full_files[-1]}")
         self._clear_roi()
         self._reset_view_state()
+        self._reset_ortho_mode(enabled=True)
         #self.set_image_scale(self.full_files[0])
         try:
             self.slice_slider.valueChanged.disconnect()
         except TypeError:
             pass
         self.slice_slider.setMaximum(len(self.full_files) - 1)
+        self._slice_cache.set_files(self.full_files)
         self.slice_slider.valueChanged.connect(self.update_full_slice)
         # Store the source filename for display
         self._current_source_file = os.path.basename(proj_file)
         self._current_view_mode = "full"
         self.update_full_slice()
 
+    def _reset_ortho_mode(self, enabled):
+        """Back to XY slices for a newly opened series; a running volume
+        build stops (it resumes from its cache when XZ/YZ is chosen again)."""
+        self._stop_ortho_builder()
+        self._ortho_volume = None
+        self.ortho_box.blockSignals(True)
+        self.ortho_box.setCurrentText("XY")
+        self.ortho_box.blockSignals(False)
+        self.ortho_box.setEnabled(enabled)
+
+    def _stop_ortho_builder(self):
+        if self._ortho_builder is not None:
+            self._ortho_builder.cancel()
+            self._ortho_builder.wait(5000)
+            self._ortho_builder = None
+
+    def _start_ortho_volume(self):
+        """Open the volume cache of the full reconstruction and build what
+        is missing in the background; False if it cannot be created."""
+        if self._ortho_volume is not None:
+            return True
+        try:
+            vol = OrthoVolume.open(self.full_files)
+        except Exception as e:
+            self.log_output.append(
+                f'<span style="color:red;">\u274c Cannot create XZ/YZ volume cache in {ortho_cache_dir()}: {e} '
+                f'(set TOMOGUI_ORTHO_CACHE to another directory)</span>')
+            return False
+        self._ortho_volume = vol
+        nzb, hb, wb = vol.shape
+        if vol.complete:
+            self.log_output.append(f"\U0001f4e6 XZ/YZ volume cache reused ({wb}x{hb}x{nzb}, bin {vol.bin})")
+            return True
+        self.log_output.append(
+            f'<span style="color:green;">\u23f3 Building XZ/YZ volume cache ({wb}x{hb}x{nzb}, bin {vol.bin}) '
+            f'from {len(self.full_files)} slices, {vol.done}/{nzb} done</span>')
+        builder = VolumeBuilder(vol, self.full_files)
+        builder.progress.connect(self._on_ortho_progress)
+        builder.failed.connect(lambda msg: self.log_output.append(
+            f'<span style="color:red;">\u274c XZ/YZ volume cache stopped: {msg}</span>'))
+        self._ortho_builder = builder
+        builder.start()
+        return True
+
+    def _set_ortho_mode(self, mode):
+        """Point the slider at XY slices or at XZ/YZ reslices of the full
+        reconstruction; colormap and contrast carry over."""
+        if not self.full_files:
+            return
+        try:
+            self.slice_slider.valueChanged.disconnect()
+        except TypeError:
+            pass
+        self._slice_loader.cancel()
+        self._slice_request = None
+        self._clear_roi()
+        self._last_camera_rect = None
+        self._last_image_shape = None
+        if mode != "XY" and not self._start_ortho_volume():
+            self.ortho_box.blockSignals(True)
+            self.ortho_box.setCurrentText("XY")
+            self.ortho_box.blockSignals(False)
+            mode = "XY"
+        if mode == "XY":
+            self.slice_slider.setMaximum(len(self.full_files) - 1)
+            self.slice_slider.valueChanged.connect(self.update_full_slice)
+            self.update_full_slice()
+            return
+        nzb, hb, wb = self._ortho_volume.shape
+        n = hb if mode == "XZ" else wb
+        self.slice_slider.setMaximum(n - 1)
+        self.slice_slider.setValue(n // 2)
+        self.slice_slider.valueChanged.connect(self.update_ortho_slice)
+        self.update_ortho_slice()
+
+    def update_ortho_slice(self):
+        vol = self._ortho_volume
+        mode = self.ortho_box.currentText()
+        if vol is None or mode == "XY":
+            return
+        idx = self.slice_slider.value()
+        img = vol.xz(idx) if mode == "XZ" else vol.yz(idx)
+        label = f"{mode}  {'y' if mode == 'XZ' else 'x'}={idx * vol.bin}"
+        if vol.bin > 1:
+            label += f"  (bin {vol.bin})"
+        if not vol.complete:
+            label += f"  building {vol.done}/{vol.shape[0]}"
+        self.filename_label.setText(label)
+        self._remember_view()
+        self.show_image((mode, idx), flag=None, img=img)
+
+    def _on_ortho_progress(self, done, total):
+        # emitted every few seconds by the builder: redraw the growing reslice
+        if done >= total:
+            self.log_output.append('<span style="color:green;">\u2705 XZ/YZ volume cache ready</span>')
+        if self.ortho_box.currentText() != "XY":
+            self.update_ortho_slice()
+
     def set_image_scale(self, img_path, flag=None):
         if flag == "raw":
             img = img_path
+            self.vmin, self.vmax = round(np.nanmin(img), 5), round(np.nanmax(img), 5)
         else:
-            img = np.array(Image.open(img_path))
-        self.vmin, self.vmax = round(np.nanmin(img), 5), round(np.nanmax(img), 5)
+            hist = self._img_stats.histogram(img_path)
+            self.vmin, self.vmax = round(hist.lo, 5), round(hist.hi, 5)
         self.min_input.setText(str(self.vmin))
         self.max_input.setText(str(self.vmax))
 
@@ -4246,12 +4560,102 @@ class TomoGUI(QWidget):
         x1, y1 = x0 + size.x(), y0 + size.y()
         self.roi_extent = (min(x0, x1), max(x0, x1), min(y0, y1), max(y0, y1))
 
+    def _pg_update_lod(self):
+        """Show the part of the current slice the viewport needs: a pyramid
+        level (or strided stand-in) when zoomed out, the visible crop of
+        the full slice when zoomed in. Placed in full-resolution coordinates."""
+        img = self._current_img
+        if img is None:
+            return
+        h, w = img.shape[:2]
+        vb = self._pg_view_box
+        r = vb.viewRect()
+        view = (r.x(), r.y(), r.width(), r.height())
+        if max(h, w) <= LOD_MIN_SIZE:
+            level, box = 0, (0, 0, w, h)
+        else:
+            max_level = max(1, int(np.log2(max(h, w) / 256)))
+            level = pick_level(r.width(), r.height(), vb.width(), vb.height(), max_level)
+            box = None
+        if level == 0:
+            shown = self._lod_shown
+            if (box is None and shown is not None and shown[0] == self._lod_token
+                    and shown[1] == 0 and covers(shown[2], view)):
+                return      # the crop on screen still covers the view
+            if box is None:
+                box = crop_box(view, img.shape)
+            x0, y0, x1, y1 = box
+            data = img[y0:y1, x0:x1]
+            key = (self._lod_token, 0, box)
+        else:
+            if level <= len(self._lod_levels):
+                data = self._lod_levels[level - 1]
+                kind = "pyramid"
+            else:
+                step = 2 ** level
+                data = img[::step, ::step]
+                kind = "strided"
+            scale = 2 ** level
+            box = (0, 0, data.shape[1] * scale, data.shape[0] * scale)
+            key = (self._lod_token, level, kind)
+        if key == self._lod_shown:
+            return
+        self._lod_shown = key
+        self._pg_show(data, box)
+
+    def _pg_show(self, data, box):
+        """Put ``data`` on screen at ``box`` (x0, y0, x1, y1): as float for
+        pyqtgraph to map, or via the LUT renderer as uint8 RGBA."""
+        if self._lut_renderer is None:
+            self._pg_image_item.setImage(data, autoLevels=False)
+            x0, y0, x1, y1 = box
+            self._pg_image_item.setRect(QRectF(x0, y0, x1 - x0, y1 - y0))
+            return
+        self._lod_data = (data, box)
+        self._lut_hist_pending = True
+        self._pg_render()
+
+    def _pg_render(self):
+        """Render the piece on screen with the current colormap and
+        Min / Max (LUT renderer only; the newest request wins)."""
+        if self._lod_data is None or self.vmin is None or self.vmax is None:
+            return
+        self._lut_key += 1
+        data, box = self._lod_data
+        self._lut_renderer.request((self._lut_key, box), data, self.vmin, self.vmax,
+                                   colormap_lut(self.current_cmap), self._lut_hist_pending)
+
+    def _on_lut_rendered(self, key, rgba, hist):
+        if key[0] != self._lut_key:
+            return      # colormap, levels or view changed meanwhile
+        x0, y0, x1, y1 = key[1]
+        # plain RGBA: pyqtgraph only wraps it in a QImage
+        self._pg_image_item.setImage(rgba, autoLevels=False, levels=None)
+        self._pg_image_item.setRect(QRectF(x0, y0, x1 - x0, y1 - y0))
+        if self._lut_hist_pending and hist is not None:
+            self._lut_hist_pending = False
+            self._pg_hist.item.plot.setData(*hist)
+
+    def _on_pyramid_ready(self, token, levels):
+        if token != self._lod_token:
+            return      # the slider has moved on
+        self._lod_levels = levels
+        self._pg_update_lod()
+
     def _pg_apply_levels(self, vmin, vmax):
         """Update display levels on the pyqtgraph ImageItem without reloading the image."""
-        self._pg_image_item.setLevels([vmin, vmax])
+        if self._lut_renderer is None:
+            self._pg_image_item.setLevels([vmin, vmax])
+        else:
+            self._pg_render()
         # Sync the histogram widget so its level lines match
         if hasattr(self, '_pg_hist'):
+            # already rendered above: don't let sigLevelsChanged render again
+            blocked = self._lut_renderer is not None
+            self._pg_hist.item.blockSignals(blocked)
             self._pg_hist.item.setLevels(vmin, vmax)
+            if blocked:
+                self._pg_hist.item.blockSignals(False)
         self.min_input.setText(str(round(vmin, 5)))
         self.max_input.setText(str(round(vmax, 5)))
 
@@ -4261,6 +4665,8 @@ class TomoGUI(QWidget):
         self.vmin, self.vmax = float(vmin), float(vmax)
         self.min_input.setText(str(round(self.vmin, 5)))
         self.max_input.setText(str(round(self.vmax, 5)))
+        if self._lut_renderer is not None:
+            self._pg_render()
 
     # ---- VisPy-only helpers ----
 
@@ -4335,6 +4741,23 @@ class TomoGUI(QWidget):
             return
 
         img = self._current_img
+        path = self._current_img_path
+
+        if self.roi_extent is None and isinstance(path, str):
+            # whole slice: from its histogram, computed once per file
+            hist = self._img_stats.histogram(path, img)
+            if hist.n == 0:
+                self.log_output.append("\u26a0\ufe0f No finite pixels for Auto.")
+                return
+            vmin = self.vmin if self.vmin is not None else hist.lo
+            vmax = self.vmax if self.vmax is not None else hist.hi
+            lo, hi = hist.percentiles([1.5, 99.5], within=(vmin, vmax))
+            if not np.isfinite(lo) or not np.isfinite(hi) or lo >= hi:
+                lo, hi = max(vmin, hist.lo), min(vmax, hist.hi)
+                if lo >= hi:
+                    hi = lo + 1.0
+            self._apply_auto_contrast(lo, hi)
+            return
 
         if self.roi_extent is not None:
             x0, x1, y0, y1 = self.roi_extent
@@ -4367,7 +4790,9 @@ class TomoGUI(QWidget):
             lo, hi = float(np.nanmin(vis)), float(np.nanmax(vis))
             if lo >= hi:
                 hi = lo + 1.0
+        self._apply_auto_contrast(lo, hi)
 
+    def _apply_auto_contrast(self, lo, hi):
         new_vmin, new_vmax = float(round(lo, 5)), float(round(hi, 5))
         if (new_vmin, new_vmax) == (self.vmin, self.vmax):
             self.log_output.append("Auto B&C optimal")
@@ -4389,7 +4814,11 @@ class TomoGUI(QWidget):
             self.log_output.append("\u26a0\ufe0f No image loaded to reset contrast.")
             return
         else:
-            self.vmin, self.vmax = round(self._current_img.min(), 5), round(self._current_img.max(), 5)
+            if isinstance(self._current_img_path, str):
+                hist = self._img_stats.histogram(self._current_img_path, self._current_img)
+                self.vmin, self.vmax = round(hist.lo, 5), round(hist.hi, 5)
+            else:
+                self.vmin, self.vmax = round(self._current_img.min(), 5), round(self._current_img.max(), 5)
             self.min_input.setText(str(self.vmin))
             self.max_input.setText(str(self.vmax))
             if VISPY_AVAILABLE and self._current_img is not None:
@@ -4402,7 +4831,8 @@ class TomoGUI(QWidget):
             elif not VISPY_AVAILABLE and self._current_img is not None:
                 self._last_image_shape = None
                 self._pg_apply_levels(self.vmin, self.vmax)
-                self._pg_view_box.autoRange()
+                h, w = self._current_img.shape[:2]
+                self._pg_view_box.setRange(QRectF(0, 0, w, h), padding=0)
 
     def update_raw_slice(self):
         idx = self.slice_slider.value()
@@ -4414,19 +4844,40 @@ class TomoGUI(QWidget):
 
     def update_try_slice(self):
         idx = self.slice_slider.value()
-        self._remember_view()
         if 0 <= idx < len(self.preview_files):
-            path = self.preview_files[idx]
-            self.show_image(path, flag=None)
-            self.filename_label.setText(os.path.basename(path))
+            self._show_slice(self.preview_files, idx)
 
     def update_full_slice(self):
         idx = self.slice_slider.value()
-        self._remember_view()
         if 0 <= idx < len(self.full_files):
-            path = self.full_files[idx]
-            self.show_image(path, flag=None)
-            self.filename_label.setText(os.path.basename(path))
+            self._show_slice(self.full_files, idx)
+
+    def _show_slice(self, files, idx):
+        """Show slice idx of the series on the slider: at once if cached,
+        else once the slice loader has read it (only the newest request
+        is shown)."""
+        path = files[idx]
+        self.filename_label.setText(os.path.basename(path))
+        img = self._slice_cache.get(idx, read=False)
+        if img is not None:
+            self._slice_loader.cancel()
+            self._slice_request = None
+            self._remember_view()
+            self.show_image(path, flag=None, img=img)
+            return
+        self._slice_request = (self._slice_loader.request(idx), path)
+
+    def _on_slice_loaded(self, rid, img):
+        if self._slice_request is None or self._slice_request[0] != rid:
+            return      # superseded while it was in flight
+        path = self._slice_request[1]
+        self._slice_request = None
+        if img is None:
+            self.log_output.append(
+                f'<span style="color:red;">\u274c Could not read {os.path.basename(path)}</span>')
+            return
+        self._remember_view()
+        self.show_image(path, flag=None, img=img)
         
 
     def _safe_open_image(self, path, flag=None, retries=3): 
@@ -4436,23 +4887,22 @@ class TomoGUI(QWidget):
                 if flag == "raw":
                     return self._raw_h5['/exchange/data'][path,:,:]
                 else:
-                    with Image.open(path) as im:
-                        return np.array(im)
+                    return read_tiff(path, mmap=False)
             except Exception:
                 QApplication.processEvents()
         if flag == "raw":
             return self._raw_h5['/exchange/data'][path,:,:]
         else:
-            with Image.open(path) as im:
-                return np.array(im)
+            return read_tiff(path, mmap=False)
 
-    def show_image(self, img_path, flag=None):
-        #Flag arg to seperate prj and recon 
+    def show_image(self, img_path, flag=None, img=None):
+        #Flag arg to seperate prj and recon; img: already decoded slice (slice cache)
         if flag == "raw":
             img = self._raw_h5['/exchange/data'][img_path,:,:] #for raw projections, it takes img_path as idx
             img = (img - self.dark)/(self.flat - self.dark)
         else:
-            img = self._safe_open_image(img_path)
+            if img is None:
+                img = self._safe_open_image(img_path)
             if img.ndim == 3:
                 img = img[..., 0]
         h, w = img.shape
@@ -4460,30 +4910,42 @@ class TomoGUI(QWidget):
         self._current_img_path = img_path
         self._clear_roi()
 
+        if self.vmin is None or self.vmax is None:
+            # cached histogram, or a sampled estimate on first display
+            p1, p99 = self._img_stats.percentiles(
+                img_path if flag != "raw" else None, img, [1, 99])
         if self.vmin is not None:
             vmin = self.vmin
         else:
-            vmin = float(round(np.percentile(img, 1), 5))
+            vmin = float(round(p1, 5))
             self.vmin = vmin
             self.min_input.setText(str(vmin))
         if self.vmax is not None:
             vmax = self.vmax
         else:
-            vmax = float(round(np.percentile(img, 99), 5))
+            vmax = float(round(p99, 5))
             self.vmax = vmax
             self.max_input.setText(str(vmax))
         if not VISPY_AVAILABLE:
             # --- PyQtGraph path ---
-            self._pg_image_item.setImage(img, autoLevels=False)
-            self._pg_image_item.setLevels([vmin, vmax])
-            try:
-                lut = (_mpl_cm.colormaps[self.current_cmap](np.linspace(0, 1, 256)) * 255).astype(np.uint8)
-                self._pg_image_item.setLookupTable(lut[:, :3])
-            except Exception:
-                pass
+            self._lod_token += 1
+            self._lod_levels = []
+            self._lod_shown = None
             if self._last_image_shape != (h, w):
-                self._pg_view_box.autoRange()
+                self._pg_view_box.setRange(QRectF(0, 0, w, h), padding=0)
             self._last_image_shape = (h, w)
+            self._pg_update_lod()
+            if max(h, w) > LOD_MIN_SIZE:
+                self._pyramid_builder.request(self._lod_token, img)
+            if self._lut_renderer is not None:
+                # levels are baked into the RGBA; just move the histogram lines
+                self._pg_hist.item.blockSignals(True)
+                self._pg_hist.item.setLevels(vmin, vmax)
+                self._pg_hist.item.blockSignals(False)
+                return
+            self._pg_image_item.setLevels([vmin, vmax])
+            # cached table: the same array is a no-op for pyqtgraph
+            self._pg_image_item.setLookupTable(colormap_lut(self.current_cmap, 3))
             return
 
         # --- VisPy path ---
@@ -4592,7 +5054,7 @@ class TomoGUI(QWidget):
         if not scan_number:
             # Use selected (checked) files from the table; fall back to highlighted row
             for file_info in self.batch_file_main_list:
-                if file_info['checkbox'].isChecked():
+                if file_info['checked']:
                     fp = (file_info.get('path')
                           or file_info.get('file')
                           or (os.path.join(data_folder, file_info['filename'])
@@ -4758,11 +5220,7 @@ class TomoGUI(QWidget):
 
     def _format_file_size(self, size_bytes):
         """Format file size in human-readable format"""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} PB"
+        return format_file_size(size_bytes)
 
     def _batch_checkbox_clicked(self, row, checked):
         """
@@ -4784,14 +5242,13 @@ class TomoGUI(QWidget):
 
             n_skipped_small = 0
             for r in range(start_row, end_row + 1):
-                for file_info in self.batch_file_main_list:
-                    if file_info['row'] != r:
-                        continue
-                    if file_info.get('skipped_small'):
-                        n_skipped_small += 1
-                        break
-                    file_info['checkbox'].setChecked(True)
-                    break
+                file_info = self.batch_file_main_model.record(r)
+                if file_info is None:
+                    continue
+                if file_info.get('skipped_small'):
+                    n_skipped_small += 1
+                    continue
+                self.batch_file_main_model.set_checked(file_info, True)
 
             n = end_row - start_row + 1
             self.log_output.append(
@@ -4814,29 +5271,10 @@ class TomoGUI(QWidget):
             data_folder = self.data_path.text().strip()
             filename = file_info['filename']
             proj_name = os.path.splitext(filename)[0]
-            try_dir = os.path.join(f"{data_folder}_rec", "try_center", proj_name)
-            full_dir = os.path.join(f"{data_folder}_rec", f"{proj_name}_rec")
+            row_color, _ = self._recon_status_index.lookup(data_folder, proj_name).row_status()
 
-            has_try = os.path.isdir(try_dir) and len(glob.glob(os.path.join(try_dir, "*.tiff"))) > 0
-            has_full = os.path.isdir(full_dir) and len(glob.glob(os.path.join(full_dir, "*.tiff"))) > 0
-
-            # Determine new color
-            if has_full:
-                row_color = "green"
-            elif has_try:
-                row_color = "orange"
-            else:
-                row_color = "red"
-
-            # Update the checkbox widget border color
-            if 'checkbox' in file_info:
-                checkbox = file_info['checkbox']
-                checkbox_widget = checkbox.parentWidget()
-                if checkbox_widget:
-                    checkbox_widget.setStyleSheet(f"QWidget {{ border-left: 6px solid {row_color}; }}")
-
-            # Update stored status
-            file_info['recon_status'] = row_color
+            # Update stored status (repaints the left-border indicator)
+            self.batch_file_main_model.set_recon_status(file_info, row_color)
 
         except Exception as e:
             # Silently ignore errors (widget might be deleted)
@@ -5191,7 +5629,7 @@ class TomoGUI(QWidget):
         """Open HDF5 viewer for the first selected file"""
         selected_files = []
         for file_info in self.batch_file_main_list:
-            if file_info['checkbox'].isChecked():
+            if file_info['checked']:
                 selected_files.append(file_info['path'])
 
         if not selected_files:
@@ -5210,7 +5648,7 @@ class TomoGUI(QWidget):
         """Delete selected HDF5 files from disk after user confirmation."""
         selected = []
         for file_info in self.batch_file_main_list:
-            if file_info['checkbox'].isChecked():
+            if file_info['checked']:
                 selected.append(file_info['path'])
 
         if not selected:
@@ -5243,9 +5681,9 @@ class TomoGUI(QWidget):
     def _select_done_try(self):
         found = False
         for file_info in self.batch_file_main_list:
-            status = file_info['status'].text().strip()
+            status = file_info['status'].strip()
             if status == "Done try":
-                file_info['checkbox'].setChecked(True)
+                self.batch_file_main_model.set_checked(file_info, True)
                 found = True
         if not found:
             self.log_output.append(f"No file is in Done try state")
@@ -5288,7 +5726,7 @@ class TomoGUI(QWidget):
         """Run try reconstruction on a single file using the queue system"""
         # Find the file info in batch list
         file_info = None
-        for f in self.batch_file_list:
+        for f in self.batch_file_main_list:
             if f['path'] == file_path:
                 file_info = f
                 break
@@ -5298,7 +5736,7 @@ class TomoGUI(QWidget):
             return
 
         # Get COR value from batch table
-        batch_cor = file_info['cor_input'].text().strip()
+        batch_cor = file_info['cor'].strip()
         if not batch_cor:
             self.log_output.append(f'<span style="color:red;">❌ No COR value in batch table for {os.path.basename(file_path)}</span>')
             QMessageBox.warning(self, "Missing COR", f"Please enter a COR value in the batch table for:\n{os.path.basename(file_path)}")
@@ -5315,7 +5753,7 @@ class TomoGUI(QWidget):
         """Run full reconstruction on a single file using the queue system"""
         # Find the file info in batch list
         file_info = None
-        for f in self.batch_file_list:
+        for f in self.batch_file_main_list:
             if f['path'] == file_path:
                 file_info = f
                 break
@@ -5325,7 +5763,7 @@ class TomoGUI(QWidget):
             return
 
         # Get COR value from batch table
-        batch_cor = file_info['cor_input'].text().strip()
+        batch_cor = file_info['cor'].strip()
         if not batch_cor:
             self.log_output.append(f'<span style="color:red;">❌ No COR value in batch table for {os.path.basename(file_path)}</span>')
             QMessageBox.warning(self, "Missing COR", f"Please enter a COR value in the batch table for:\n{os.path.basename(file_path)}")
@@ -5341,7 +5779,7 @@ class TomoGUI(QWidget):
     def _batch_run_try_selected(self):
         """Run try reconstruction on all selected files with GPU queue management"""
         selected_files = [f for f in self.batch_file_main_list
-                          if f['checkbox'].isChecked() and not f.get('skipped_small')]
+                          if f['checked'] and not f.get('skipped_small')]
         self._persist_params_for_files([f.get('path') for f in selected_files])
         machine = self.batch_machine_box.currentText()
 
@@ -5367,70 +5805,54 @@ class TomoGUI(QWidget):
 
     def _clear_selected_cors(self):
         """Clear the COR cell of every checked row, drop the value from
-        self.cor_data, and persist the change to rot_cen.json."""
-        selected = [f for f in self.batch_file_main_list if f['checkbox'].isChecked()]
+        self.cor_data, and store the change in the folder's .tomogui.db
+        (rot_cen.json is exported when the folder is left or on close)."""
+        selected = [f for f in self.batch_file_main_list if f['checked']]
         if not selected:
             QMessageBox.warning(self, "Warning", "No files selected.")
             return
         reply = QMessageBox.question(
             self, 'Clear CORs',
             f'Clear the COR value for {len(selected)} selected file(s)?\n'
-            f'This updates the table and rot_cen.json.',
+            f'This updates the table and .tomogui.db now;\n'
+            f'rot_cen.json is exported when you change folder or close TomoGUI.',
             QMessageBox.Yes | QMessageBox.No, QMessageBox.No
         )
         if reply != QMessageBox.Yes:
             return
 
         cleared = 0
+        cleared_paths = {}
         for fi in selected:
-            # Prefer the live cellWidget in column 2 so we survive stale
-            # file_info['cor_input'] references.
-            row_found = -1
-            base = os.path.basename(fi.get('filename', '') or '')
-            for r in range(self.batch_file_main_table.rowCount()):
-                item = self.batch_file_main_table.item(r, 1)
-                if item and item.text() == base:
-                    row_found = r
-                    break
-            w = (self.batch_file_main_table.cellWidget(row_found, 2)
-                 if row_found >= 0 else None)
-            w = w or fi.get('cor_input')
-            if w is None:
-                continue
-            try:
-                w.setText("")
-                fi['cor_input'] = w
-                cleared += 1
-            except RuntimeError:
-                continue
+            self.batch_file_main_model.set_cor(fi, "")
+            cleared += 1
             # Drop from the authoritative COR map too.
             path = fi.get('path')
             if path and path in self.cor_data:
                 del self.cor_data[path]
+                cleared_paths[path] = ""
 
         data_folder = self.data_path.text().strip()
         if data_folder:
-            self._save_cor_data(data_folder, self.cor_data)
+            self._save_cor_data(data_folder, cleared_paths)
         self.log_output.append(
             f'<span style="color:#b26a00;">🧽 Cleared COR on {cleared} '
-            f'selected row(s) and persisted to rot_cen.json.</span>'
+            f'selected row(s) in .tomogui.db (rot_cen.json is exported on '
+            f'folder change or close).</span>'
         )
 
     def _cam_rot_estimate(self):
         """Estimate camera rotation angle of the highlighted file.
-        Runs Try + AI-infer at nsino=0.1 and nsino=0.9 and computes
+        Runs Try + AI-infer at N heights from nsino=0.1 to nsino=0.9 (the
+        *rows* spinbox, 2 = top and bottom), the Try passes concurrently
+        on separate GPUs, and fits
 
-            angle_deg = np.degrees(atan((COR1 - COR2) / 2) / verticalImageSize)
+            cor = a + b * row,   angle_deg = np.degrees(atan(-b))
 
-        where verticalImageSize is the number of rows in /exchange/data.
+        by least squares, rows taken from the /exchange/data height.
         """
-        import math
         import glob
-        import re as _re
         import shutil
-        from argparse import Namespace
-        import numpy as np
-        from PIL import Image
         import h5py
 
         proj_file = self.highlight_scan
@@ -5457,14 +5879,12 @@ class TomoGUI(QWidget):
 
         data_folder = self.data_path.text().strip()
         proj_name = os.path.splitext(os.path.basename(proj_file))[0]
-        try_dir = os.path.join(f"{data_folder}_rec", "try_center", proj_name)
 
         # Seed COR: per-row (if the highlighted row has one) else top-bar.
         seed = ""
         for fi in self.batch_file_main_list:
             if fi.get('path') == proj_file:
-                seed = (fi['cor_input'].text().strip()
-                        if fi.get('cor_input') else "")
+                seed = fi.get('cor', '').strip()
                 break
         seed = seed or self.cor_input.text().strip()
         try:
@@ -5482,7 +5902,7 @@ class TomoGUI(QWidget):
         )
         QApplication.processEvents()
 
-        # Build base tomocupy-try cmd; we'll swap --nsino per call.
+        # Build base tomocupy-try cmd; we'll set --nsino / --out-path-name per pass.
         base_cmd = [
             "tomocupy", self.recon_way_box.currentText(),
             "--reconstruction-type", "try",
@@ -5498,308 +5918,178 @@ class TomoGUI(QWidget):
         base_cmd += self._gather_Data_args()
         base_cmd += self._gather_Performance_args()
 
-        def _strip_nsino(cmd):
+        def _strip_flags(cmd, flags):
             out = []
             skip = False
             for a in cmd:
                 if skip:
                     skip = False
                     continue
-                if a == "--nsino":
+                if a in flags:
                     skip = True
                     continue
                 out.append(a)
             return out
 
-        _CENTER_RE = _re.compile(r'center(\d+\.\d+)')
+        # One pass per height, each under its own --out-path-name so the
+        # passes can run side by side without touching each other's (or
+        # the scan's real) try_center folder.
+        heights = pass_heights(self.camrot_rows.value())
+        camrot_root = os.path.join(f"{data_folder}_rec", "camrot", proj_name)
+        passes = []
+        for nsino in heights:
+            out_root = os.path.join(camrot_root, f"n{nsino:.2f}")
+            shutil.rmtree(out_root, ignore_errors=True)
+            passes.append((nsino, out_root))
+        n_gpus = min(max(1, self.batch_gpus_per_machine.value()), len(passes))
+        self.log_output.append(
+            f'<span style="color:#00796b;">   → Try at nsino={", ".join(map(str, heights))} '
+            f'on {n_gpus} GPU(s) …</span>'
+        )
+        QApplication.processEvents()
 
-        def _try_and_infer(nsino):
-            # Clean slate for this nsino
-            if os.path.isdir(try_dir):
-                shutil.rmtree(try_dir, ignore_errors=True)
-            cmd = _strip_nsino(base_cmd) + ["--nsino", str(nsino)]
-            self.log_output.append(
-                f'<span style="color:#00796b;">   → Try at nsino={nsino} …</span>'
-            )
-            QApplication.processEvents()
-            code = self.run_command_live(
-                cmd, proj_file=proj_file,
-                job_label=f"camrot-try-n{nsino}",
-                wait=True, cuda_devices=None
-            )
-            if code != 0:
-                raise RuntimeError(f"tomocupy try at nsino={nsino} failed (exit {code})")
+        pending = list(enumerate(passes))
+        running = {}        # gpu -> pass index
+        codes = {}          # pass index -> tomocupy exit code
+        loop = QEventLoop()
 
-            tiffs = sorted(glob.glob(os.path.join(try_dir, "*.tiff")))
-            imgs, cors = [], []
-            for t in tiffs:
-                m = _CENTER_RE.search(os.path.basename(t))
-                if not m:
-                    continue
-                cors.append(float(m.group(1)))
-                imgs.append(np.array(Image.open(t)).astype(np.float32))
-            if not imgs:
-                raise RuntimeError(
-                    f"no parsable TIFFs produced at nsino={nsino}")
-
-            # Remove any stale center_of_rotation.txt so we only read the
-            # result of THIS inference call.
-            cor_txt = os.path.join(try_dir, "center_of_rotation.txt")
-            if os.path.exists(cor_txt):
-                os.remove(cor_txt)
-
-            from tomogui._tomocor_infer.inference import inference_pipeline
-            args = Namespace(
-                infer_use_8bits=True,
-                infer_downsample_factor=2,
-                infer_num_windows=3,
-                infer_seed_number=10,
-                infer_model_path=model_path,
-                infer_window_size=518,
-            )
+        def _done(gpu, k, code):
+            if k in codes:
+                return
+            codes[k] = code
+            running.pop(gpu, None)
+            _start_next(gpu)
+            if not running:
+                loop.quit()
+
+        def _start_next(gpu):
+            if not pending:
+                return
+            k, (nsino, out_root) = pending.pop(0)
+            cmd = (_strip_flags(base_cmd, ("--nsino", "--out-path-name"))
+                   + ["--nsino", str(nsino), "--out-path-name", out_root])
+            p = self.run_command_live(cmd, proj_file=proj_file,
+                                      job_label=f"camrot-try-n{nsino}",
+                                      cuda_devices=str(gpu))
+            running[gpu] = k
+            p.finished.connect(lambda code, _st, gpu=gpu, k=k: _done(gpu, k, code))
+            p.errorOccurred.connect(
+                lambda err, gpu=gpu, k=k:
+                    _done(gpu, k, -1) if err == QProcess.FailedToStart else None)
+            if p.state() == QProcess.NotRunning and p.error() == QProcess.FailedToStart:
+                _done(gpu, k, -1)
+
+        for gpu in range(n_gpus):
+            _start_next(gpu)
+        if running:
+            loop.exec()
+
+        rows, found = [], []
+        for k, (nsino, out_root) in enumerate(passes):
+            if codes.get(k) != 0:
+                self.log_output.append(
+                    f'<span style="color:red;">   ✗ tomocupy try at nsino={nsino} failed '
+                    f'(exit {codes.get(k)})</span>')
+                continue
+            tiffs = sorted(glob.glob(os.path.join(out_root, "**", "*.tiff"), recursive=True))
             self.log_output.append(
                 f'<span style="color:#00796b;">   → AI infer at nsino={nsino} …</span>'
             )
             QApplication.processEvents()
-            inference_pipeline(args, np.array(imgs), np.array(cors), try_dir)
-            if not os.path.exists(cor_txt):
-                raise RuntimeError(
-                    f"inference at nsino={nsino} produced no center_of_rotation.txt")
-            with open(cor_txt) as fh:
-                lines = [ln.strip() for ln in fh if ln.strip()]
-            if not lines:
-                raise RuntimeError(f"empty center_of_rotation.txt at nsino={nsino}")
-            return float(lines[-1].split()[-1])
+            result = self._infer_session.infer(proj_file, tiffs, model_path)
+            if result.get('event') != 'result':
+                self.log_output.append(
+                    f'<span style="color:red;">   ✗ inference at nsino={nsino} failed: '
+                    f'{result.get("reason")}</span>')
+                continue
+            rows.append(nsino * (vertical - 1))
+            found.append((nsino, result['cor']))
 
-        try:
-            cor1 = _try_and_infer(0.1)
-            cor2 = _try_and_infer(0.9)
-        except Exception as e:
+        if len(found) < 2:
             self.log_output.append(
-                f'<span style="color:red;">❌ CamRot failed: {e}</span>'
+                f'<span style="color:red;">❌ CamRot failed: COR found at '
+                f'{len(found)} of {len(passes)} height(s), need 2</span>'
             )
             return
-
-        # Camera tilt from COR shift over the image height:
-        #   tan(angle) = (COR_top - COR_bottom) / verticalImageSize
-        angle_deg = float(np.degrees(math.atan((cor1 - cor2) / vertical)))
-
-        msg_short = (
-            f"COR @ nsino=0.1 (top):    {cor1:.2f}\n"
-            f"COR @ nsino=0.9 (bottom): {cor2:.2f}\n"
+        shutil.rmtree(camrot_root, ignore_errors=True)
+
+        # Camera tilt from the COR drift over the detector rows:
+        #   cor = a + b * row,  angle = atan(-b)
+        fit = fit_tilt(rows, [c for _, c in found])
+        angle_deg = fit["angle_deg"]
+        err_txt = ("" if fit["angle_err_deg"] is None
+                   else f" ± {fit['angle_err_deg']:.6f}°")
+
+        msg_short = "".join(
+            f"COR @ nsino={nsino:<5}        {cor:.2f}\n" for nsino, cor in found
+        ) + (
             f"Vertical image size:      {vertical} px\n"
-            f"Estimated camera rotation: {angle_deg:.6f}°"
+            f"Fit residual (RMS):       {fit['rms']:.2f} px\n"
+            f"Estimated camera rotation: {angle_deg:.6f}°{err_txt}"
         )
         self.log_output.append(
-            f'<span style="color:#00796b;">🎥 CamRot result: COR(top)={cor1:.2f}, '
-            f'COR(bottom)={cor2:.2f}</span>'
+            f'<span style="color:#00796b;">🎥 CamRot result: '
+            + ", ".join(f"COR(n={nsino})={cor:.2f}" for nsino, cor in found)
+            + '</span>'
         )
         self.log_output.append(
             f'<span style="color:#00796b;font-weight:bold;">📐 Estimated camera '
-            f'rotation: {angle_deg:.6f}°</span>'
+            f'rotation: {angle_deg:.6f}°{err_txt}</span>'
         )
         QMessageBox.information(self, "CamRot", msg_short)
 
-    def _fix_cor_outliers(self, abs_thresh=10.0, mad_k=5.0, max_thresh=None):
-        # Read the cap from the GUI spinner if the caller didn't override it.
-        if max_thresh is None:
-            try:
-                max_thresh = float(self.cor_outlier_max.value())
-            except (AttributeError, ValueError, TypeError):
-                max_thresh = 50.0
+    def _fix_cor_outliers(self, abs_thresh=10.0, mad_k=5.0, max_thresh=None, method=None):
         """For the currently-checked set of files, detect outlier COR values
-        within each DATASET SERIES and replace them with the average of the
-        two closest non-outlier neighbours in the same series.
+        within each DATASET SERIES and replace them, then fill still-missing
+        CORs with the series mean over the whole table.
 
         A "series" is derived from the filename: everything before the final
-        numeric index is treated as the series key. Examples:
+        numeric index is treated as the series key (see series_index).
+        Examples:
             UPC15_NMC811_SC_b1_Ni_edge_1124.h5   → series 'UPC15_NMC811_SC_b1_Ni_edge'
             UPC15_NMC811_SC_b1_Mn_Elemental_1045 → series 'UPC15_NMC811_SC_b1_Mn_Elemental'
 
-        Files within a series are sorted by their numeric index so 'neighbour'
-        always means 'adjacent scan in the same series', regardless of how the
-        table happens to be sorted.
-
-        Outlier rule inside a series:
-          - thr = min(max_thresh, max(abs_thresh, mad_k * MAD))
-              • Small MAD (tight cluster)  → thr stays at abs_thresh (10 px).
-              • Growing MAD                → thr grows with 5 × MAD.
-              • MAD very large             → thr capped at max_thresh (100 px).
-          - Flag v if |v − median| > thr.
-          - Missing (empty) CORs also get marked for fill.
-
-        Replacement:
-          - Avg of the 2 nearest non-flagged neighbours by index in the series.
-          - For MISSING values only fill when those neighbours are close to
-            each other (|L − R| ≤ abs_thresh); otherwise skip — ambiguous
-            cluster boundary inside the series.
-
-        Defaults: abs_thresh=10 px, mad_k=5, max_thresh=100 px
-        (anything > 100 pixels from the series median is always an outlier).
+        The work is done by cor_outliers.fix_outliers on NumPy arrays. The
+        trend each series is compared against is picked by the "fit" combo:
+          - median/MAD      constant series median; replacement = average of
+                            the 2 nearest non-flagged neighbours (default,
+                            the original rule)
+          - rolling median  follows slow COR drift along the series
+          - Huber / RANSAC  robust linear drift over the scan index
+        thr = min(max_thresh, max(abs_thresh, mad_k * MAD of residuals));
+        missing CORs are filled only when bracketed by close neighbours,
+        otherwise from the series mean.
+
+        Defaults: abs_thresh=10 px, mad_k=5, max_thresh from the "max Δ"
+        spinner (anything further from the trend is always an outlier).
         """
-        import re
-        _IDX_RE = re.compile(r'^(.*?)[._-]*(\d+)$')
-
-        def _series_key(filename):
-            base = os.path.splitext(filename)[0]
-            m = _IDX_RE.match(base)
-            if m:
-                return m.group(1), int(m.group(2))
-            return base, 0
-        # 1) Collect selected rows in table order
-        selected = []         # list of [file_info, cor_value_or_None]
-        for file_info in self.batch_file_main_list:
-            if not file_info['checkbox'].isChecked():
-                continue
-            txt = file_info['cor_input'].text().strip()
+        # Read the cap and the fit from the GUI if the caller didn't override them.
+        if max_thresh is None:
             try:
-                cor = float(txt)
-            except (ValueError, TypeError):
-                cor = None
-            selected.append([file_info, cor])
-        if not selected:
+                max_thresh = float(self.cor_outlier_max.value())
+            except (AttributeError, ValueError, TypeError):
+                max_thresh = 50.0
+        if method is None:
+            method = self.cor_outlier_method.currentData() or "median"
+
+        if not any(fi['checked'] for fi in self.batch_file_main_list):
             self.log_output.append(
                 '<span style="color:orange;">⚠️ No files selected.</span>'
             )
             return
 
-        def _median(arr):
-            s = sorted(arr)
-            m = len(s)
-            return s[m // 2] if m % 2 else 0.5 * (s[m // 2 - 1] + s[m // 2])
-
-        # 2) Group files by their filename series key
-        series_groups = {}     # prefix -> list of (idx_num, file_info, cor)
-        for file_info, cor in selected:
-            prefix, idx_num = _series_key(file_info['filename'])
-            series_groups.setdefault(prefix, []).append((idx_num, file_info, cor))
-
-        changes = []   # (file_info, old_text, new_value, series, reason)
-        skipped = []   # (file_info, series, reason)
-
-        for prefix, entries in series_groups.items():
-            # Sort entries by the trailing numeric index so "neighbour" is
-            # the adjacent scan in the same series, not the row above/below
-            # the current table sort.
-            entries.sort(key=lambda t: t[0])
-            n = len(entries)
-            if n < 2:
-                continue                              # lonely file, nothing to compare
-
-            values = [e[2] for e in entries if e[2] is not None]
-            if len(values) < 2:
-                # Not enough numeric CORs in this series to compute anything
-                for _, fi, c in entries:
-                    if c is None:
-                        skipped.append((fi, prefix, "series has <2 numeric CORs"))
-                continue
-
-            med = _median(values)
-            mad = _median([abs(x - med) for x in values])
-            thr = min(max_thresh, max(abs_thresh, mad_k * mad))
-
-            # Flag: empty cells + numeric outliers against this series' median
-            flagged = set()
-            for i, (_, fi, c) in enumerate(entries):
-                if c is None:
-                    flagged.add(i)
-                elif abs(c - med) > thr:
-                    flagged.add(i)
-
-            if not flagged:
-                continue
-
-            # Replace each flagged entry with avg of its 2 nearest non-flagged
-            # neighbours within the SAME series.
-            for i in sorted(flagged):
-                was_missing = entries[i][2] is None
-                left = None
-                for j in range(i - 1, -1, -1):
-                    if j in flagged or entries[j][2] is None:
-                        continue
-                    left = entries[j][2]
-                    break
-                right = None
-                for j in range(i + 1, n):
-                    if j in flagged or entries[j][2] is None:
-                        continue
-                    right = entries[j][2]
-                    break
-                fi = entries[i][1]
-                if left is not None and right is not None:
-                    if was_missing and abs(left - right) > abs_thresh:
-                        skipped.append((fi, prefix,
-                                        f"neighbours {left:.2f} / {right:.2f} differ by "
-                                        f"{abs(left - right):.2f}  (> {abs_thresh})"))
-                        continue
-                    replacement = 0.5 * (left + right)
-                    reason = f"avg({left:.2f}, {right:.2f})"
-                elif left is not None:
-                    if was_missing:
-                        skipped.append((fi, prefix,
-                                        f"only left neighbour known ({left:.2f})"))
-                        continue
-                    replacement = left
-                    reason = f"left only = {left:.2f}"
-                elif right is not None:
-                    if was_missing:
-                        skipped.append((fi, prefix,
-                                        f"only right neighbour known ({right:.2f})"))
-                        continue
-                    replacement = right
-                    reason = f"right only = {right:.2f}"
-                else:
-                    continue
-                old_txt = fi['cor_input'].text().strip()
-                new_txt = f"{replacement:.2f}"
-                fi['cor_input'].setText(new_txt)
-                changes.append((fi, old_txt, replacement, prefix, reason))
-
-        # 3) Missing-COR fill. Independent of the outlier loop above.
-        # For every selected row still without a valid COR, fill it with the
-        # MEAN of CORs in the same series across the WHOLE table (donors can
-        # be checked or unchecked, anywhere in the list).
-        filled_from_series = []   # (fi, series, value, n_donors)
-
-        # Build series_key → list of numeric CORs across the whole table.
-        table_series_cors = {}
-        for fi_all in self.batch_file_main_list:
-            txt_all = (fi_all['cor_input'].text().strip()
-                       if fi_all.get('cor_input') else "")
+        # One row per file of the table: unchecked rows are series-mean donors only
+        series_index = self.batch_file_main_model.series
+        rows = []
+        for fi in self.batch_file_main_list:
             try:
-                v = float(txt_all)
+                cor = float(fi['cor'].strip())
             except (ValueError, TypeError):
-                continue
-            key_all = _series_key(fi_all['filename'])[0]
-            table_series_cors.setdefault(key_all, []).append(v)
-
-        # Drop any skipped-entry whose reason was "no COR" — it'll be replaced
-        # by a fresh verdict from this pass (either filled or truly no donor).
-        _missing_reasons = ("series has <2 numeric CORs",
-                            "only left neighbour known",
-                            "only right neighbour known",
-                            "neighbours")  # prefix-match for 'neighbours ... differ'
-        skipped = [s for s in skipped
-                   if not any(s[2].startswith(pfx) for pfx in _missing_reasons)]
-
-        for file_info, _ in selected:
-            current_txt = (file_info['cor_input'].text().strip()
-                           if file_info.get('cor_input') else "")
-            if current_txt:
-                continue   # already has a COR (original or freshly filled)
-            series = _series_key(file_info['filename'])[0]
-            donors = table_series_cors.get(series, [])
-            if not donors:
-                skipped.append((file_info, series,
-                                "no COR donor in series (whole table)"))
-                continue
-            mean_val = sum(donors) / len(donors)
-            file_info['cor_input'].setText(f"{mean_val:.2f}")
-            filled_from_series.append((file_info, series, mean_val, len(donors)))
-            changes.append(
-                (file_info, "", mean_val, series,
-                 f"series-mean of {len(donors)} donor(s)")
-            )
+                cor = None
+            series, idx = series_index.series_of(fi)
+            rows.append(CorRow(fi['path'], series, idx, cor, fi['checked']))
+        changes, skipped, n_series = fix_outliers(
+            rows, method, abs_thresh=abs_thresh, mad_k=mad_k, max_thresh=max_thresh)
 
         if not changes and not skipped:
             self.log_output.append(
@@ -5808,31 +6098,37 @@ class TomoGUI(QWidget):
             )
             return
 
-        # 4) Persist to rot_cen.json
+        # Apply to the table and persist the changed entries
+        changed_cors = {c.path: f"{c.new:.2f}" for c in changes}
+        for path, txt in changed_cors.items():
+            fi = self.batch_file_main_model.record_for(path)
+            if fi is not None:
+                self.batch_file_main_model.set_cor(fi, txt)
+        self.cor_data.update(changed_cors)
         data_folder = self.data_path.text().strip()
-        for fi, _, newv, _, _ in changes:
-            self.cor_data[fi['path']] = f"{newv:.2f}"
         if data_folder:
-            self._save_cor_data(data_folder, self.cor_data)
+            self._save_cor_data(data_folder, changed_cors)
 
-        # 5) Log
-        n_fill = len(filled_from_series)
+        # Log
+        n_fill = sum(1 for c in changes if c.kind == "series-mean")
         n_outlier = len(changes) - n_fill
         self.log_output.append(
-            f'<span style="color:#8e44ad;">🧹 Fix COR Outliers (max Δ = {max_thresh:g} px): '
+            f'<span style="color:#8e44ad;">🧹 Fix COR Outliers ({COR_FIT_LABELS[method]}, '
+            f'max Δ = {max_thresh:g} px): '
             f'{n_outlier} outlier(s) replaced, {n_fill} missing filled from '
             f'series mean, {len(skipped)} left unchanged across '
-            f'{len(series_groups)} series.</span>'
+            f'{n_series} series.</span>'
         )
-        for fi, old, newv, series, reason in changes:
+        for c in changes:
+            old = "(empty)" if c.old is None else f"{c.old:.2f}"
             self.log_output.append(
-                f'   <b>{fi["filename"]}</b> <span style="color:#888;">[{series}]</span>'
-                f' : {old or "(empty)"} → {newv:.2f}   [{reason}]'
+                f'   <b>{os.path.basename(c.path)}</b> <span style="color:#888;">[{c.series}]</span>'
+                f' : {old} → {c.new:.2f}   [{c.reason}]'
             )
-        for fi, series, reason in skipped:
+        for c in skipped:
             self.log_output.append(
-                f'<span style="color:#888;">   <b>{fi["filename"]}</b> [{series}] '
-                f'skipped — {reason}</span>'
+                f'<span style="color:#888;">   <b>{os.path.basename(c.path)}</b> [{c.series}] '
+                f'skipped — {c.reason}</span>'
             )
 
     def _batch_run_ai_selected(self):
@@ -5840,7 +6136,7 @@ class TomoGUI(QWidget):
         Unlike Try/Full batch, this one does NOT parallelise on GPUs — each file
         goes through the full AI pipeline one after the other so the torch
         inference step doesn't fight the GPU with concurrent tomocupy jobs."""
-        selected_files = [f for f in self.batch_file_main_list if f['checkbox'].isChecked()]
+        selected_files = [f for f in self.batch_file_main_list if f['checked']]
         self._persist_params_for_files([f.get('path') for f in selected_files])
         # Drop auto-skipped small files even if they somehow ended up checked
         # (e.g. user re-checked manually). They're marked as aborted scans and
@@ -5853,10 +6149,7 @@ class TomoGUI(QWidget):
                 f'small-file row(s) flagged as aborted scans.</span>'
             )
             for fi in dropped_small:
-                try:
-                    fi['checkbox'].setChecked(False)
-                except Exception:
-                    pass
+                self.batch_file_main_model.set_checked(fi, False)
         if not selected_files:
             QMessageBox.warning(self, "Warning", "No files selected.")
             return
@@ -5891,39 +6184,36 @@ class TomoGUI(QWidget):
             )
             return
 
-        # Series grouping helper (same rule as Fix COR Outliers).
-        import re as _re
-        _IDX_RE = _re.compile(r'^(.*?)[._-]*(\d+)$')
-
-        def _sk(name):
-            m = _IDX_RE.match(os.path.splitext(os.path.basename(name))[0])
-            return m.group(1) if m else os.path.splitext(os.path.basename(name))[0]
-
-        # Build donor map (whole table) up front — PREVIEW only: we need to
-        # know which rows would get auto-filled to validate the run, but we
-        # won't actually mutate the table until after the user confirms.
-        _series_cors = {}
-        for fi_all in self.batch_file_main_list:
+        # Series-mean donors (whole table, same grouping as Fix COR Outliers)
+        # — PREVIEW only: we need to know which rows would get auto-filled to
+        # validate the run, but we won't actually mutate the table until
+        # after the user confirms.
+        series_index = self.batch_file_main_model.series
+        _series_means = {}
+        for fi in selected_files:
+            sk = series_index.key_of(fi)
+            if sk not in _series_means:
+                _series_means[sk] = series_index.cor_mean(sk)[0]
+
+        # Rows without a COR are seeded from scan metadata (motor positions,
+        # energy, time, scan index) where the predictor has enough solved
+        # scans; the series mean is the fallback.
+        no_cor = []
+        for fi in selected_files:
             try:
-                v = float((fi_all['cor_input'].text().strip()
-                           if fi_all.get('cor_input') else ""))
+                float(fi.get('cor', '').strip())
             except (ValueError, TypeError):
-                continue
-            _series_cors.setdefault(_sk(fi_all['filename']), []).append(v)
+                no_cor.append(fi)
+        predicted, predicted_width = self._predict_cors(no_cor) if no_cor else ({}, None)
 
-        will_auto_fill = []    # (file_info, mean_val)
+        will_auto_fill = []    # (file_info, value, source)
         missing_seed = []
-        for fi in selected_files:
-            cur = (fi['cor_input'].text().strip()
-                   if fi.get('cor_input') else "")
-            try:
-                float(cur)
-                continue  # already has a COR — nothing to do
-            except (ValueError, TypeError):
-                pass
-            donors = _series_cors.get(_sk(fi['filename']), [])
-            if donors:
-                will_auto_fill.append((fi, sum(donors) / len(donors)))
+        for fi in no_cor:
+            mean_val = _series_means[series_index.key_of(fi)]
+            if fi['path'] in predicted:
+                will_auto_fill.append((fi, predicted[fi['path']][0], 'metadata'))
+            elif mean_val is not None:
+                will_auto_fill.append((fi, mean_val, 'series mean'))
             elif not top_bar_ok and self.cor_method_box.currentText() != "auto":
                 missing_seed.append(fi['filename'])
 
@@ -5941,18 +6231,26 @@ class TomoGUI(QWidget):
 
         # Count how many will use the row COR vs the top-bar fallback
         row_cor_count = sum(1 for fi in selected_files
-                            if fi.get('cor_input') and fi['cor_input'].text().strip()
-                            and fi['cor_input'].text().strip()
-                                .replace('.', '', 1).replace('-', '', 1).isdigit())
+                            if fi.get('cor', '').strip()
+                            .replace('.', '', 1).replace('-', '', 1).isdigit())
         seed_summary = (
             f"{row_cor_count} file(s) will use their table COR; "
             f"{len(selected_files) - row_cor_count} will fall back to the top-bar "
             f"({top_bar_txt or 'auto'})."
         )
+        n_predicted = sum(1 for _, _, src in will_auto_fill if src == 'metadata')
+        default_width = self.param_widgets["--center-search-width"][1].value()
+        narrow = (n_predicted and predicted_width < default_width
+                  and self.cor_method_box.currentText() == "manual")
         fill_summary = (
-            f"\n{len(will_auto_fill)} file(s) will be auto-filled from series mean."
+            f"\n{len(will_auto_fill)} file(s) will be auto-filled: {n_predicted} "
+            f"predicted from scan metadata, {len(will_auto_fill) - n_predicted} "
+            f"from series mean."
             if will_auto_fill else ""
         )
+        if narrow:
+            fill_summary += (f"\nTry search width for predicted seeds: "
+                             f"±{predicted_width:g} px (instead of ±{default_width:g}).")
 
         phases_str = " + ".join(
             p for p, on in [("Try", run_try), ("Infer", run_infer),
@@ -5972,15 +6270,24 @@ class TomoGUI(QWidget):
         # Confirmed → now actually apply the auto-fills so the table reflects
         # what the run will use.
         if will_auto_fill:
-            for fi, mean_val in will_auto_fill:
-                try:
-                    fi['cor_input'].setText(f"{mean_val:.2f}")
-                except (RuntimeError, AttributeError):
-                    pass
+            for fi, value, source in will_auto_fill:
+                self.batch_file_main_model.set_cor(fi, f"{value:.2f}")
+                if source == 'metadata' and narrow:
+                    # read by _start_batch_job_async for this file's Try job
+                    fi['search_width'] = predicted_width
             self.log_output.append(
                 f'<span style="color:#8e44ad;">📍 Auto-filled {len(will_auto_fill)} '
-                f'missing COR(s) from series mean before AI Reco.</span>'
+                f'missing COR(s) before AI Reco ({n_predicted} predicted from scan '
+                f'metadata, {len(will_auto_fill) - n_predicted} from series mean).</span>'
             )
+            if n_predicted:
+                err = self._cor_predictor.error()
+                self.log_output.append(
+                    f'<span style="color:#8e44ad;">📈 COR predictor: {len(self._cor_predictor)} '
+                    f'solved scan(s), typical error '
+                    f'{"n/a" if err is None else f"{err:.2f} px"}'
+                    f'{f", Try search ±{predicted_width:g} px" if narrow else ""}.</span>'
+                )
 
         num_gpus = self.batch_gpus_per_machine.value()
         machine = self.batch_machine_box.currentText()
@@ -5997,9 +6304,9 @@ class TomoGUI(QWidget):
         # the try-reco subprocess builder (_build_batch_cmd) picks it up.
         # (That builder already reads row_cor first, top-bar second.)
         for fi in selected_files:
-            row_txt = fi['cor_input'].text().strip() if fi.get('cor_input') else ""
+            row_txt = fi.get('cor', '').strip()
             if not row_txt and top_bar_ok:
-                fi['cor_input'].setText(top_bar_txt)
+                self.batch_file_main_model.set_cor(fi, top_bar_txt)
 
         self._batch_active = True
         data_folder = self.data_path.text().strip()
@@ -6027,105 +6334,61 @@ class TomoGUI(QWidget):
                     f'{len(selected_files)} file(s), {num_gpus} GPU slot(s)…</span>'
                 )
                 QApplication.processEvents()
+                self._infer_results, self._infer_stdout = {}, {}
                 self._run_batch_with_queue(selected_files, recon_type='infer',
                                            num_gpus=num_gpus, machine=machine)
 
                 # ─── The ONE place that writes AI CORs back to the table ───
-                # Scan column 1 (filename) to find the row, then setText on
-                # cellWidget(row, 2). No stored widget references, no lambda
-                # captures, no cross-thread state. If this doesn't work,
-                # nothing will.
-                inferred = 0
+                # Results come from the workers' JSON lines (collected by
+                # _on_infer_output); center_of_rotation.txt is only read for
+                # files without one (e.g. an older worker on a remote host).
+                # All rows are then updated in one model call, one repaint.
+                model = self.batch_file_main_model
+                updates = []
+                written_cors = {}
+                notes = []
                 for fi in selected_files:
                     proj_file = fi.get('path') or fi.get('file')
                     if not proj_file:
                         continue
                     basename = os.path.basename(proj_file)
-                    proj_name = os.path.splitext(basename)[0]
-                    cor_txt = os.path.join(
-                        f"{data_folder}_rec", "try_center",
-                        proj_name, 'center_of_rotation.txt')
-
-                    # Read the AI's answer
-                    if not os.path.exists(cor_txt):
+                    result = self._infer_results.get(proj_file)
+                    if result is None:
+                        result = FileChannel.read(os.path.join(
+                            f"{data_folder}_rec", "try_center",
+                            os.path.splitext(basename)[0]), proj_file)
+                    if result.get('event') != 'result':
                         failed_inf.append(basename)
-                        self.log_output.append(
-                            f'<span style="color:red;">   ✗ {basename}: '
-                            f'no center_of_rotation.txt</span>'
-                        )
-                        continue
-                    try:
-                        with open(cor_txt) as f:
-                            raw = [ln.strip() for ln in f if ln.strip()]
-                        if not raw:
-                            raise ValueError("empty file")
-                        ai_cor = float(raw[-1].split()[-1])
-                    except Exception as e:
-                        failed_inf.append(basename)
-                        self.log_output.append(
-                            f'<span style="color:red;">   ✗ {basename}: '
-                            f'could not parse {cor_txt} ({e})</span>'
-                        )
-                        continue
-
-                    txt = f"{ai_cor:.2f}"
-
-                    # Find the row by scanning column 1 directly. This is the
-                    # authoritative lookup — ignores fi['row'] entirely.
-                    row_found = -1
-                    for r in range(self.batch_file_main_table.rowCount()):
-                        item = self.batch_file_main_table.item(r, 1)
-                        if item and item.text() == basename:
-                            row_found = r
-                            break
-                    if row_found < 0:
-                        self.log_output.append(
-                            f'<span style="color:red;">   ✗ {basename}: '
-                            f'row not found in table</span>'
-                        )
+                        notes.append(f'<span style="color:red;">   ✗ {basename}: '
+                                     f'{result.get("reason", "no result")}</span>')
                         continue
-
-                    cell_w = self.batch_file_main_table.cellWidget(row_found, 2)
-                    if cell_w is None:
-                        self.log_output.append(
-                            f'<span style="color:red;">   ✗ {basename}: '
-                            f'no widget at row {row_found} col 2</span>'
-                        )
+                    txt = f"{float(result['cor']):.2f}"
+
+                    # The table may have been refreshed while the queue ran,
+                    # so look the live record up by filename.
+                    live_fi = model.record_for(basename)
+                    if live_fi is None:
+                        notes.append(f'<span style="color:red;">   ✗ {basename}: '
+                                     f'row not found in table</span>')
                         continue
-                    old_txt = cell_w.text().strip()
-                    cell_w.setText(txt)
-                    cell_w.setModified(True)
-                    # Force the widget AND the table to repaint right now —
-                    # over SSH X11 / pyqtgraph fallback, scheduled paints
-                    # often don't fire until the queue loop yields enough.
-                    cell_w.repaint()
-                    self.batch_file_main_table.viewport().update()
-                    QApplication.sendPostedEvents()
-                    QApplication.processEvents()
-                    # Keep the file_info dict and the global cor_data in sync
-                    fi['cor_input'] = cell_w   # refresh stale ref, just in case
-                    self.cor_data[proj_file] = txt
-                    inferred += 1
+                    old_txt = live_fi['cor'].strip()
+                    updates.append((live_fi, {'cor': txt}))
+                    written_cors[proj_file] = txt
                     if old_txt == txt:
-                        self.log_output.append(
-                            f'<span style="color:#888;">   ≈ {basename}: '
-                            f'{txt} (unchanged)</span>'
-                        )
+                        notes.append(f'<span style="color:#888;">   ≈ {basename}: '
+                                     f'{txt} (unchanged)</span>')
                     else:
-                        self.log_output.append(
-                            f'<span style="color:#1a8cff;">   ✎ {basename}: '
-                            f'{old_txt or "(empty)"} → {txt}</span>'
-                        )
-
-                # Final blanket repaint so any deferred paint events flush
-                # before the user's eyes see the table.
-                self.batch_file_main_table.viewport().update()
-                self.batch_file_main_table.repaint()
-                QApplication.sendPostedEvents()
-                QApplication.processEvents()
+                        notes.append(f'<span style="color:#1a8cff;">   ✎ {basename}: '
+                                     f'{old_txt or "(empty)"} → {txt}</span>')
+                model.update_records(updates, COL_COR, COL_COR)
+                # Keep the global cor_data in sync
+                self.cor_data.update(written_cors)
+                inferred = len(written_cors)
+                if notes:
+                    self.log_output.append('<br>'.join(notes))
 
                 if data_folder:
-                    self._save_cor_data(data_folder, self.cor_data)
+                    self._save_cor_data(data_folder, written_cors)
                 self.log_output.append(
                     f'<span style="color:#1a8cff;">   Phase B done: {inferred} succeeded, '
                     f'{len(failed_inf)} failed.</span>'
@@ -6172,9 +6435,8 @@ class TomoGUI(QWidget):
                     # the table status text we set after Phase C.
                     base = os.path.basename(fpath)
                     try:
-                        r = self._find_row_by_filename(base)
-                        st = self.batch_file_main_table.item(r, 3) if r is not None else None
-                        status_txt = (st.text() if st else "").lower()
+                        live_fi = self.batch_file_main_model.record_for(base)
+                        status_txt = (live_fi['status'] if live_fi else "").lower()
                     except Exception:
                         status_txt = ""
                     if "fail" in status_txt or "skip" in status_txt:
@@ -6214,6 +6476,8 @@ class TomoGUI(QWidget):
                 )
         finally:
             self._batch_active = False
+            for fi in selected_files:
+                fi.pop('search_width', None)
 
         self.log_output.append(
             '<span style="color:green;font-weight:bold;">🏁 Batch AI Reco finished.</span>'
@@ -6222,7 +6486,7 @@ class TomoGUI(QWidget):
     def _batch_run_full_selected(self):
         """Run full reconstruction on all selected files with GPU queue management"""
         selected_files = [f for f in self.batch_file_main_list
-                          if f['checkbox'].isChecked() and not f.get('skipped_small')]
+                          if f['checked'] and not f.get('skipped_small')]
         self._persist_params_for_files([f.get('path') for f in selected_files])
         machine = self.batch_machine_box.currentText()
 
@@ -6258,42 +6522,20 @@ class TomoGUI(QWidget):
 
             filename = os.path.basename(file_path)
             proj_name = os.path.splitext(filename)[0]
-            full_dir = os.path.join(f"{table_folder}_rec", f"{proj_name}_rec")
-
-            # Check if output directory exists and has TIFF files
-            if os.path.isdir(full_dir):
-                tiff_files = sorted(glob.glob(os.path.join(full_dir, "*.tiff")))
-                if len(tiff_files) > 0:
-                    # Get slice numbers from first and last file
-                    num_1 = int(Path(tiff_files[0]).stem.split("_")[-1])
-                    num_2 = int(Path(tiff_files[-1]).stem.split("_")[-1])
-                    return f"Full {num_1}-{num_2}", "green"
-
-            # Fallback if directory doesn't exist or no files found
-            return "Done full", "green"
+            # Slice range from the cached directory summary ('Done full'
+            # if the directory doesn't exist or has no TIFFs)
+            return self._recon_status_index.lookup(table_folder, proj_name).full_range_text(), "green"
         except Exception as e:
             # If anything goes wrong, just return basic status
             return "Done full", "green"
 
     def _set_status_by_filename(self, filename, text, status_col=3, filename_col=1, color=None):
-        table = self.batch_file_main_table
-        row = self._find_row_by_filename(filename, filename_col=filename_col)
-        if row is None:
+        """Set the status text (and left-border colour) of a row by filename.
+        status_col / filename_col are kept for call-site compatibility."""
+        file_info = self.batch_file_main_model.record_for(filename)
+        if file_info is None:
             return False  # not found (maybe list refreshed)
-
-        item = table.item(row, status_col)
-        if item is None:
-            item = QTableWidgetItem()
-            item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # optional
-            table.setItem(row, status_col, item)
-        if color is not None:
-            self.batch_file_main_list[row]['recon_status'] = color
-            checkbox_widget = self.batch_file_main_table.cellWidget(row, 0)
-            if checkbox_widget:
-                checkbox_widget.setStyleSheet(f"QWidget {{ border-left: 6px solid {color}; }}")
-            status_item = QTableWidgetItem(text)
-            self.batch_file_main_table.setItem(row, 3, status_item)
-            self.batch_file_main_list[row]['status'] = text
+        self.batch_file_main_model.set_status(file_info, text, recon_status=color)
         return True
 
     def _run_batch_with_queue(self, selected_files, recon_type, num_gpus, machine):
@@ -6335,6 +6577,7 @@ class TomoGUI(QWidget):
 
         # Start new queue
         self.batch_running = True
+        self._auto_refresh_timer.start()
         self.batch_job_queue = jobs_to_add
         self.batch_running_jobs = {}
         self.batch_available_gpus = list(range(num_gpus))
@@ -6433,6 +6676,9 @@ class TomoGUI(QWidget):
             for gpu_id, (process, file_info, job_recon_type) in list(self.batch_running_jobs.items()):
                 if process.state() == QProcess.NotRunning:
                     exit_code = process.exitCode()
+                    if job_recon_type == 'infer':
+                        # collect whatever the worker wrote after the last readyRead
+                        self._on_infer_output(process, file_info["filename"], file_info)
                     self.batch_completed_jobs += 1
 
                     try:
@@ -6635,12 +6881,7 @@ class TomoGUI(QWidget):
             rec_method = self.cor_method_box.currentText()
             # Per-file seed: row COR first, top-bar fallback. This matters for
             # Batch AI Reco where each file gets its own starting guess.
-            row_cor = ""
-            if file_info.get('cor_input') is not None:
-                try:
-                    row_cor = file_info['cor_input'].text().strip()
-                except Exception:
-                    row_cor = ""
+            row_cor = file_info.get('cor', '').strip()
             cor_val = row_cor or self.cor_input.text().strip()
             if rec_method == 'manual':
                 try:
@@ -6653,7 +6894,7 @@ class TomoGUI(QWidget):
 
         elif recon_type == 'full':
             recon_way = self.recon_way_box_full.currentText()
-            cor_val = file_info['cor_input'].text().strip()
+            cor_val = file_info.get('cor', '').strip()
             rec_method = self.cor_full_method.currentText()
 
             if not cor_val:
@@ -6662,7 +6903,7 @@ class TomoGUI(QWidget):
                 fallback = self.cor_input.text().strip()
                 if fallback:
                     cor_val = fallback
-                    file_info['cor_input'].setText(cor_val)   # reflect in the table
+                    self.batch_file_main_model.set_cor(file_info, cor_val)   # reflect in the table
                     self.log_output.append(
                         f'<span style="color:orange;">⚠️ No row COR for {filename}, '
                         f'using Try-bar COR = {cor_val}</span>'
@@ -6739,6 +6980,13 @@ class TomoGUI(QWidget):
             cmd += self._gather_Geometry_args()        
             cmd += self._gather_Data_args()                
             cmd += self._gather_Performance_args()           
+        if recon_type == 'try' and rec_method == 'manual' and file_info.get('search_width'):
+            # seed predicted from scan metadata: search only its expected error
+            width = str(float(file_info['search_width']))
+            if "--center-search-width" in cmd:
+                cmd[cmd.index("--center-search-width") + 1] = width
+            else:
+                cmd += ["--center-search-width", width]
         self.log_output.append(f'{cmd}')    
 
         # <<< FIX: assign wrapped cmd (previously return value was ignored)
@@ -6813,9 +7061,9 @@ class TomoGUI(QWidget):
                     )
 
     def _set_cor_cell(self, file_info, cor_val):
-        """Robustly update a batch-table row's COR cell. Returns True iff
-        at least one widget was actually updated. Always logs what happened
-        so the user can see whether the AI value reached the cell or not."""
+        """Update a batch-table row's COR cell. Returns True iff the row was
+        found and updated. Always logs what happened so the user can see
+        whether the AI value reached the cell or not."""
         base = os.path.basename(file_info.get('filename', '') or '')
         try:
             txt = f"{float(cor_val):.2f}"
@@ -6826,49 +7074,19 @@ class TomoGUI(QWidget):
             )
             return False
 
-        old_txt = ""
-        widgets_seen = 0
-        widgets_written = 0
-        w = file_info.get('cor_input')
-        if w is not None:
-            widgets_seen += 1
-            try:
-                old_txt = w.text().strip()
-                w.setText(txt)
-                widgets_written += 1
-            except RuntimeError as e:
-                self.log_output.append(
-                    f'<span style="color:red;">   ✗ COR {base}: stored '
-                    f'widget is dead ({e}) — falling through to live '
-                    f'cellWidget lookup</span>'
-                )
-        # Always also try the live cellWidget by row lookup.
-        try:
-            r = self._find_row_by_filename(base)
-        except Exception:
-            r = None
-        if r is not None:
-            live_w = self.batch_file_main_table.cellWidget(r, 2)
-            if live_w is not None and live_w is not w:
-                widgets_seen += 1
-                try:
-                    if not old_txt:
-                        old_txt = live_w.text().strip()
-                    live_w.setText(txt)
-                    widgets_written += 1
-                except RuntimeError as e:
-                    self.log_output.append(
-                        f'<span style="color:red;">   ✗ COR {base}: live '
-                        f'cellWidget setText failed ({e})</span>'
-                    )
-
-        if widgets_written == 0:
+        # The record held by the caller may be stale after a refresh; the
+        # live one is looked up by filename.
+        live_fi = self.batch_file_main_model.record_for(base)
+        if live_fi is None:
             self.log_output.append(
-                f'<span style="color:red;">   ✗ COR {base}: no writable '
-                f'widget found (file_info[\'cor_input\']={w!r}, row={r!r}) '
+                f'<span style="color:red;">   ✗ COR {base}: row not found '
                 f'— UI cell NOT updated. AI value was {txt}.</span>'
             )
             return False
+        old_txt = live_fi['cor'].strip()
+        self.batch_file_main_model.set_cor(live_fi, txt)
+        if live_fi is not file_info:
+            file_info['cor'] = txt
 
         path = file_info.get('path')
         if path:
@@ -6882,38 +7100,45 @@ class TomoGUI(QWidget):
         if unchanged:
             self.log_output.append(
                 f'<span style="color:#888;">   ≈ COR {base}: AI returned '
-                f'the same value ({txt}) as was already in the cell '
-                f'[{widgets_written}/{widgets_seen} widget(s) updated]</span>'
-            )
-        elif old_txt:
-            self.log_output.append(
-                f'<span style="color:#1a8cff;">   ✎ COR {base}: '
-                f'{old_txt} → {txt} '
-                f'[{widgets_written}/{widgets_seen} widget(s) updated]</span>'
+                f'the same value ({txt}) as was already in the cell</span>'
             )
         else:
             self.log_output.append(
                 f'<span style="color:#1a8cff;">   ✎ COR {base}: '
-                f'(empty) → {txt} '
-                f'[{widgets_written}/{widgets_seen} widget(s) updated]</span>'
+                f'{old_txt or "(empty)"} → {txt}</span>'
             )
-        QApplication.processEvents()
         return True
 
     def _on_infer_output(self, process, filename, file_info):
-        """Pipe inference worker stdout into the log. The actual COR cell
-        write is done once at the end of Phase B, not here — keeps the
-        update path singular and avoids widget-race bugs."""
+        """Pipe inference worker stdout into the log and collect its JSON
+        result lines into _infer_results. The COR cells are written once
+        at the end of Phase B, not here — keeps the update path singular
+        and avoids widget-race bugs."""
         data = bytes(process.readAllStandardOutput()).decode(errors="ignore")
-        if not data.strip():
+        if not data:
             return
         basename = os.path.basename(filename)
-        for line in data.strip().split('\n'):
+        # stdout arrives in arbitrary chunks; keep the tail until its newline
+        lines = (self._infer_stdout.pop(filename, "") + data).split('\n')
+        if lines[-1]:
+            self._infer_stdout[filename] = lines[-1]
+        for line in lines[:-1]:
             line = line.strip()
-            if line:
-                self.log_output.append(
-                    f'<span style="color:gray;">▸ [{basename}] {line}</span>'
-                )
+            if not line:
+                continue
+            result = parse_result_line(line)
+            if result is not None:
+                self._infer_results[result['path']] = result
+                timing = result.get('timing', {}).get('total')
+                if result['event'] == 'result' and timing is not None:
+                    self.log_output.append(
+                        f'<span style="color:gray;">▸ [{basename}] COR {result["cor"]:.1f} '
+                        f'from {result.get("candidates", "?")} candidate(s) in {timing:.1f} s</span>'
+                    )
+                continue
+            self.log_output.append(
+                f'<span style="color:gray;">▸ [{basename}] {line}</span>'
+            )
 
 
     # ===== THEME METHODS =====
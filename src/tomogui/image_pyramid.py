@@ -0,0 +1,176 @@
+"""
+Image pyramid for TomoGUI
+Level-of-detail display of large slices in the pyqtgraph viewer.
+
+pyqtgraph renders in software: every pixel handed to ``setImage`` is
+colour-mapped on the CPU, and over SSH X11 the result crosses the wire.
+A 4k x 4k slice in a 1000 px viewport wastes most of that work.  The
+viewer therefore shows:
+
+- zoomed out: a pyramid level with about one image pixel per screen
+  pixel.  Levels are 2 x 2 block means built by ``PyramidBuilder`` in
+  the background; until they exist a strided view of the slice stands
+  in.
+- zoomed in to full resolution: only the visible region (plus a margin,
+  so small pans need no new upload) of the full-resolution slice.
+
+Displayed pieces are placed with ``ImageItem.setRect`` in full-resolution
+coordinates, so ROI, cursor readout and contrast keep working on the
+full slice.
+
+    python -m tomogui.image_pyramid --bench [--size 4096]
+
+times the pyramid build and counts the pixels each view hands to the
+renderer with and without it.
+"""
+
+import math
+import threading
+
+import numpy as np
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+LOD_MIN_SIZE = 1024      # slices up to this edge length are shown as they are
+
+
+def downsample2(img):
+    """2 x 2 block mean (float32); an odd last row/column is dropped."""
+    h, w = img.shape[0] // 2, img.shape[1] // 2
+    a = np.asarray(img[:2 * h, :2 * w], dtype=np.float32)
+    out = a[0::2, 0::2] + a[1::2, 0::2]
+    out += a[0::2, 1::2]
+    out += a[1::2, 1::2]
+    out *= 0.25
+    return out
+
+
+def build_levels(img, min_size=256):
+    """Levels 1, 2, ... (each half the size of the one before) until the
+    longer edge drops below ``min_size``."""
+    levels = []
+    cur = img
+    while max(cur.shape[:2]) >= 2 * min_size:
+        cur = downsample2(cur)
+        levels.append(cur)
+    return levels
+
+
+def pick_level(view_w, view_h, screen_w, screen_h, max_level):
+    """Pyramid level with at least one level pixel per screen pixel;
+    0 (full resolution) when zoomed in or the viewport size is unknown."""
+    if screen_w < 1 or screen_h < 1:
+        return 0
+    ratio = max(view_w / screen_w, view_h / screen_h)
+    if ratio < 2:
+        return 0
+    return min(max_level, int(math.floor(math.log2(ratio))))
+
+
+def crop_box(view, shape, margin=0.25):
+    """(x0, y0, x1, y1) of the full-resolution region to show for the view
+    rectangle ``view`` = (x, y, w, h), grown by ``margin`` of its size on
+    every side and clipped to the slice."""
+    x, y, w, h = view
+    rows, cols = shape[:2]
+    mx, my = w * margin, h * margin
+    x0 = max(0, int(math.floor(x - mx)))
+    y0 = max(0, int(math.floor(y - my)))
+    x1 = min(cols, int(math.ceil(x + w + mx)))
+    y1 = min(rows, int(math.ceil(y + h + my)))
+    if x1 <= x0 or y1 <= y0:
+        return 0, 0, cols, rows
+    return x0, y0, x1, y1
+
+
+def covers(box, view):
+    """True if ``box`` (x0, y0, x1, y1) contains the view rectangle, as far
+    as it lies inside the slice ``box`` was clipped to."""
+    x0, y0, x1, y1 = box
+    x, y, w, h = view
+    return x0 <= max(x, 0) and y0 <= max(y, 0) and x1 >= x + w - 1 and y1 >= y + h - 1
+
+
+class PyramidBuilder(QThread):
+    """Builds the pyramid of the newest requested slice; older requests
+    that have not started are dropped."""
+    levels_ready = pyqtSignal(int, list)     # token, [level 1, level 2, ...]
+
+    def __init__(self, min_size=256):
+        super().__init__()
+        self.min_size = min_size
+        self._cond = threading.Condition()
+        self._job = None
+        self._stop = False
+
+    def request(self, token, img):
+        with self._cond:
+            self._job = (token, img)
+            self._cond.notify_all()
+        if not self.isRunning():
+            self.start()
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._job = None
+            self._cond.notify_all()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while self._job is None and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                token, img = self._job
+                self._job = None
+            try:
+                levels = build_levels(img, self.min_size)
+            except Exception:
+                continue
+            self.levels_ready.emit(token, levels)
+
+
+def benchmark(size=4096, screen=1000, repeat=3):
+    """Pyramid build time and the pixels handed to the renderer for a
+    fit-to-window view and a 1:1 zoom of a ``size`` x ``size`` slice."""
+    import time
+    img = np.random.default_rng(0).random((size, size), dtype=np.float32)
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        levels = build_levels(img)
+        best = min(best, time.perf_counter() - t0)
+    fit = pick_level(size, size, screen, screen, len(levels))
+    fit_px = levels[fit - 1].size if fit else img.size
+    x0, y0, x1, y1 = crop_box((size / 2, size / 2, screen, screen), img.shape)
+    return {
+        "build_s": best,
+        "levels": [lv.shape for lv in levels],
+        "fit": (img.size, fit_px, fit),
+        "zoom": (img.size, (x1 - x0) * (y1 - y0)),
+    }
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m tomogui.image_pyramid",
+                                     description="Level-of-detail pyramid benchmark.")
+    parser.add_argument("--bench", action="store_true", help="benchmark on a synthetic slice")
+    parser.add_argument("--size", type=int, default=4096, help="slice edge length")
+    parser.add_argument("--screen", type=int, default=1000, help="viewport edge length, px")
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.error("--bench is required")
+    res = benchmark(args.size, args.screen)
+    print(f"pyramid of {args.size}x{args.size}: {res['build_s'] * 1e3:.1f} ms, "
+          f"levels {', '.join(f'{w}x{h}' for h, w in res['levels'])}")
+    full, lod, level = res["fit"]
+    print(f"fit to {args.screen} px: {full:,} px full vs {lod:,} px at level {level}")
+    full, crop = res["zoom"]
+    print(f"1:1 zoom:        {full:,} px full vs {crop:,} px visible crop")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Image statistics for TomoGUI
+Contrast limits from cached per-slice histograms instead of sorting
+pixels.
+
+Every slice shown, Auto, Reset and the TomoLog contrast used to run
+``np.percentile`` / ``nanmin`` / ``nanmax`` over the whole image (a
+partial sort of 16M pixels for a 4k slice).  ``StatsCache`` keeps one
+compact ``Histogram`` per slice file (2048 bins, min, max; about 16 kB),
+keyed by path, mtime and size so a rewritten slice is recomputed:
+
+- the first display of a slice uses ``sample_percentiles`` on a strided
+  sample (~256k pixels) and queues the full histogram, which a
+  background thread computes;
+- later displays, Auto, Reset and the TomoLog contrast read
+  percentiles, min and max from the histogram (within one bin width).
+  The bins cover the bulk of the values, not min to max, so a hot
+  pixel does not coarsen them; min and max are kept exactly.
+
+    python -m tomogui.image_stats --bench [--size 4096]
+
+compares the estimators with ``np.percentile`` on a synthetic slice.
+"""
+
+import os
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+
+BINS = 2048
+SAMPLE = 1 << 18
+
+
+def sample_percentiles(img, q, max_samples=SAMPLE):
+    """Percentiles ``q`` of a strided sample of at most ``max_samples``
+    finite pixels."""
+    step = max(1, int(np.sqrt(img.shape[0] * img.shape[1] / max_samples)))
+    a = np.asarray(img[::step, ::step], dtype=np.float64).ravel()
+    a = a[np.isfinite(a)]
+    if a.size == 0:
+        return [float("nan")] * len(q)
+    return [float(v) for v in np.percentile(a, q)]
+
+
+class Histogram:
+    """Value histogram of one slice.  The ``BINS`` bins span a robust
+    range (a sampled 0.1-99.9 % with a margin) so a few hot pixels do not
+    widen them; values outside it go to an under- and an overflow bin.
+    ``lo`` / ``hi`` are the exact min / max."""
+    __slots__ = ("lo", "hi", "b0", "b1", "counts")
+
+    def __init__(self, lo, hi, counts, b0=None, b1=None):
+        self.lo = float(lo)
+        self.hi = float(hi)
+        self.b0 = self.lo if b0 is None else float(b0)
+        self.b1 = self.hi if b1 is None else float(b1)
+        self.counts = counts                # underflow, bins..., overflow
+
+    @classmethod
+    def from_array(cls, img, bins=BINS):
+        a = np.asarray(img).ravel()
+        lo, hi = np.nanmin(a), np.nanmax(a)
+        if not (np.isfinite(lo) and np.isfinite(hi)):
+            a = a[np.isfinite(a)]
+            if a.size == 0:
+                return cls(0.0, 0.0, np.zeros(bins + 2, dtype=np.int64))
+            lo, hi = a.min(), a.max()
+        counts = np.zeros(bins + 2, dtype=np.int64)
+        if hi <= lo:
+            counts[1] = np.count_nonzero(a == lo)
+            return cls(lo, lo, counts)
+        s = a[::max(1, a.size // SAMPLE)]
+        s = s[np.isfinite(s)]
+        b0 = b1 = 0.0
+        if s.size:
+            p0, p1 = np.percentile(s, [0.1, 99.9])
+            margin = 0.25 * (p1 - p0)
+            b0, b1 = max(float(lo), p0 - margin), min(float(hi), p1 + margin)
+        if not b1 > b0:
+            b0, b1 = float(lo), float(hi)
+        counts[1:-1], _ = np.histogram(a, bins=bins, range=(b0, b1))
+        counts[0] = np.count_nonzero(a < b0)
+        counts[-1] = np.count_nonzero(a > b1)
+        return cls(lo, hi, counts, b0, b1)
+
+    @property
+    def n(self):
+        return int(self.counts.sum())
+
+    @property
+    def width(self):
+        return (self.b1 - self.b0) / (len(self.counts) - 2)
+
+    def edges(self):
+        """Bin edges including the under- and overflow bin: min, the
+        robust range in ``BINS`` steps, max."""
+        inner = np.linspace(self.b0, self.b1, len(self.counts) - 1)
+        return np.concatenate(([min(self.lo, self.b0)], inner, [max(self.hi, self.b1)]))
+
+    def percentiles(self, q, within=None, min_count=64):
+        """Percentiles ``q`` (0-100), linear inside a bin.  ``within`` =
+        (vmin, vmax) only counts the bins inside that value range, unless
+        fewer than ``min_count`` pixels fall there."""
+        if self.hi <= self.lo:
+            return [self.lo] * len(q)
+        counts, edges = self.counts, self.edges()
+        if within is not None:
+            i0 = int(np.clip(np.searchsorted(edges, within[0], side="right") - 1, 0, len(counts)))
+            i1 = int(np.clip(np.searchsorted(edges, within[1], side="left"), i0, len(counts)))
+            if counts[i0:i1].sum() >= min_count:
+                counts, edges = counts[i0:i1], edges[i0:i1 + 1]
+        cum = np.cumsum(counts)
+        total = cum[-1]
+        if total == 0:
+            return [float("nan")] * len(q)
+        ranks = np.asarray(q, dtype=float) / 100.0 * total
+        idx = np.clip(np.searchsorted(cum, ranks, side="left"), 0, len(counts) - 1)
+        before = np.where(idx > 0, cum[idx - 1], 0)
+        frac = np.clip((ranks - before) / np.maximum(counts[idx], 1), 0, 1)
+        return [float(v) for v in edges[idx] + frac * (edges[idx + 1] - edges[idx])]
+
+def _key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+class StatsCache:
+    """Histograms of slice files, bounded in number, with a background
+    thread for the ones queued by ``submit``."""
+
+    def __init__(self, max_entries=4096, bins=BINS):
+        self.max_entries = max_entries
+        self.bins = bins
+        self._cond = threading.Condition()
+        self._entries = OrderedDict()    # path -> (key, Histogram)
+        self._queue = deque(maxlen=4)    # (key, image), newest last; older ones are dropped
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="image-stats", daemon=True)
+        self._thread.start()
+
+    def get(self, path, key=None):
+        """Histogram of ``path`` if cached for its current mtime/size."""
+        key = key or _key(path)
+        with self._cond:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != key:
+                return None
+            self._entries.move_to_end(path)
+            return entry[1]
+
+    def histogram(self, path, img=None):
+        """Histogram of ``path``; computed now from ``img`` (or the file,
+        memory-mapped) when not cached."""
+        key = _key(path)
+        hist = self.get(path, key)
+        if hist is None:
+            if img is None:
+                from .tiff_reader import read_tiff
+                img = read_tiff(path)
+            hist = Histogram.from_array(img, self.bins)
+            if key is not None:
+                self._store(key, hist)
+        return hist
+
+    def percentiles(self, path, img, q):
+        """Percentiles ``q`` of a displayed slice: from the histogram if
+        cached, else estimated from a sample while the histogram is
+        queued.  ``path`` None (e.g. raw projections) always samples."""
+        key = _key(path) if isinstance(path, str) else None
+        hist = self.get(path, key) if key else None
+        if hist is not None:
+            return hist.percentiles(q)
+        if key is not None:
+            self.submit(key, img)
+        return sample_percentiles(img, q)
+
+    def submit(self, key, img):
+        with self._cond:
+            self._queue.append((key, img))
+            self._cond.notify_all()
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._queue.clear()
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+
+    def _store(self, key, hist):
+        with self._cond:
+            self._entries[key[0]] = (key, hist)
+            self._entries.move_to_end(key[0])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                key, img = self._queue.pop()      # newest first
+                entry = self._entries.get(key[0])
+                if entry is not None and entry[0] == key:
+                    continue
+            try:
+                hist = Histogram.from_array(img, self.bins)
+            except Exception:
+                continue
+            self._store(key, hist)
+
+
+def benchmark(size=4096, repeat=3):
+    """Seconds and 1/99 % results per estimator on one synthetic slice."""
+    import time
+    rng = np.random.default_rng(0)
+    img = (rng.normal(0.0, 1e-3, (size, size)) + rng.random((size, size)) * 2e-4).astype(np.float32)
+    img[0, 0] = 1000.0                      # one hot pixel
+    q = [1, 99]
+    hist = Histogram.from_array(img)
+    runs = {
+        "np.percentile": lambda: np.percentile(img, q),
+        "histogram build": lambda: Histogram.from_array(img),
+        "histogram query": lambda: hist.percentiles(q),
+        "sampled": lambda: sample_percentiles(img, q),
+    }
+    out = {}
+    for name, fn in runs.items():
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            res = fn()
+            best = min(best, time.perf_counter() - t0)
+        out[name] = (best, None if name == "histogram build" else [float(v) for v in res])
+    out["bin width"] = (hist.width, None)
+    return out
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m tomogui.image_stats",
+                                     description="Slice contrast statistics benchmark.")
+    parser.add_argument("--bench", action="store_true", help="benchmark on a synthetic slice")
+    parser.add_argument("--size", type=int, default=4096, help="slice edge length")
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.error("--bench is required")
+    res = benchmark(args.size)
+    width = res.pop("bin width")[0]
+    for name, (sec, vals) in res.items():
+        txt = "" if vals is None else "  1%/99%: " + " / ".join(f"{v:.6g}" for v in vals)
+        print(f"{name:<16} {sec * 1e3:8.2f} ms{txt}")
+    print(f"bin width {width:.3g}")
+
+
+if __name__ == "__main__":
+    main()
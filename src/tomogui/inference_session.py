@@ -0,0 +1,203 @@
+"""
+Inference session for TomoGUI
+In-process COR inference for the single-file AI actions (AI Reco, the
+per-file inference after a Try, CamRot).
+
+``InferenceSession`` is a QThread that owns the DINOv2 models.  A
+checkpoint is loaded the first time a job needs it and then kept, one
+model per checkpoint path (reloaded if the file changes on disk), until
+``unload()`` drops it.  Repeated AI Reco clicks therefore pay only for
+reading the Try TIFFs and the forward passes, and both happen off the
+GUI thread.
+
+Jobs are queued with ``submit()`` and answered through ``result_ready``
+(job id, result dict as in ``tomogui.result_channel``).  ``infer()``
+submits and waits in a local event loop, so call sites keep their
+step-by-step flow while the window stays responsive.
+
+Batch AI Reco does not use this: its workers are subprocesses pinned to
+one GPU each (``tomogui._infer_worker``).
+"""
+
+import gc
+import os
+import re
+import threading
+import time
+from argparse import Namespace
+from collections import deque
+
+import numpy as np
+
+from PyQt5.QtCore import QEventLoop, QThread, pyqtSignal
+
+from .result_channel import FileChannel, error
+from .tiff_reader import read_tiff
+
+_CENTER_RE = re.compile(r'center(\d+\.\d+)')
+
+
+def infer_args(model_path):
+    """Inference settings TomoGUI uses for every AI COR search."""
+    return Namespace(
+        infer_use_8bits=True,
+        infer_downsample_factor=2,
+        infer_num_windows=3,
+        infer_seed_number=10,
+        infer_model_path=model_path,
+        infer_window_size=518,
+    )
+
+
+def read_try_stack(tiffs):
+    """(images, CORs) of Try TIFFs named ``...center<cor>.tiff``; files
+    without a COR in the name are skipped."""
+    imgs, cors = [], []
+    for t in tiffs:
+        m = _CENTER_RE.search(os.path.basename(t))
+        if not m:
+            continue
+        cors.append(float(m.group(1)))
+        imgs.append(read_tiff(t, mmap=False).astype(np.float32, copy=False))
+    return imgs, cors
+
+
+class InferenceSession(QThread):
+    """Worker thread with a per-checkpoint model cache."""
+    result_ready = pyqtSignal(int, dict)     # job id, result dict
+    model_loaded = pyqtSignal(str, float)    # checkpoint path, seconds
+    model_unloaded = pyqtSignal(str)         # checkpoint path
+
+    def __init__(self):
+        super().__init__()
+        self._cond = threading.Condition()
+        self._queue = deque()    # ("infer", job id, job) / ("unload", path or None)
+        self._models = {}        # checkpoint path -> (mtime, (model, device))
+        self._next_id = 0
+        self._stop = False
+
+    # ----- GUI side -----
+    def submit(self, path, tiffs, model_path, out_dir=None):
+        """Queue inference on the Try TIFFs of ``path``; returns the job id.
+
+        ``out_dir`` also gets center_of_rotation.txt, for tools that
+        read it.
+        """
+        with self._cond:
+            self._next_id += 1
+            job_id = self._next_id
+            self._queue.append(("infer", job_id, (path, list(tiffs), model_path, out_dir)))
+            self._cond.notify_all()
+        if not self.isRunning():
+            self.start()
+        return job_id
+
+    def infer(self, path, tiffs, model_path, out_dir=None):
+        """Run one job and wait for its result dict (events keep flowing)."""
+        loop = QEventLoop()
+        done = {}
+
+        def on_result(job_id, msg):
+            if job_id == done.get("id"):
+                done["msg"] = msg
+                loop.quit()
+
+        self.result_ready.connect(on_result)
+        try:
+            done["id"] = self.submit(path, tiffs, model_path, out_dir)
+            while "msg" not in done:
+                loop.exec()
+        finally:
+            self.result_ready.disconnect(on_result)
+        return done["msg"]
+
+    def unload(self, model_path=None):
+        """Drop the model of ``model_path`` (all models if None) once the
+        jobs queued before this call have run."""
+        with self._cond:
+            self._queue.append(("unload", model_path))
+            self._cond.notify_all()
+        if not self.isRunning():
+            self.start()
+
+    def loaded(self):
+        """Checkpoint paths with a model in memory."""
+        with self._cond:
+            return list(self._models)
+
+    def stop(self):
+        """Finish queued work, free the models and end the thread (call
+        wait() afterwards)."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+
+    # ----- worker side -----
+    def _model(self, model_path, num_windows):
+        from tomogui._tomocor_infer.inference import load_model
+        mtime = os.path.getmtime(model_path)
+        with self._cond:
+            cached = self._models.get(model_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        if cached is not None:
+            self._drop(model_path)
+        t0 = time.time()
+        model = load_model(model_path, num_windows)
+        with self._cond:
+            self._models[model_path] = (mtime, model)
+        self.model_loaded.emit(model_path, time.time() - t0)
+        return model
+
+    def _drop(self, model_path=None):
+        with self._cond:
+            paths = list(self._models) if model_path is None else [model_path]
+            dropped = [p for p in paths if self._models.pop(p, None) is not None]
+        if not dropped:
+            return
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+        for p in dropped:
+            self.model_unloaded.emit(p)
+
+    def _run_job(self, path, tiffs, model_path, out_dir):
+        from tomogui._tomocor_infer.inference import inference_pipeline
+        imgs, cors = read_try_stack(tiffs)
+        if not imgs:
+            return error(path, "no Try TIFFs with a COR in the name")
+        args = infer_args(model_path)
+        t0 = time.time()
+        model = self._model(model_path, args.infer_num_windows)
+        load_s = time.time() - t0
+        channel = FileChannel(out_dir) if out_dir else None
+        msg = inference_pipeline(args, np.array(imgs), np.array(cors),
+                                 channel=channel, path=path, model=model)
+        # the pipeline timed only the forward passes; count a (re)load here
+        timing = msg.get("timing", {})
+        timing["load"] = round(load_s, 3)
+        timing["total"] = round(time.time() - t0, 3)
+        return msg
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stop:
+                    self._cond.wait()
+                if not self._queue:
+                    break
+                item = self._queue.popleft()
+            if item[0] == "unload":
+                self._drop(item[1])
+                continue
+            _, job_id, (path, tiffs, model_path, out_dir) = item
+            try:
+                msg = self._run_job(path, tiffs, model_path, out_dir)
+            except Exception as exc:
+                msg = error(path, f"inference failed: {exc}")
+            self.result_ready.emit(job_id, msg)
+        self._drop()
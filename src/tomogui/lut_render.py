@@ -0,0 +1,159 @@
+"""
+LUT rendering for TomoGUI
+Colormap and contrast applied off the GUI thread for the pyqtgraph viewer.
+
+Handed a float slice, pyqtgraph's ``ImageItem`` rescales it to the
+levels, runs it through the lookup table and builds the QImage, all on
+the GUI thread, and again after every colormap or Min / Max change.
+Over SSH X11 that is the work the window waits on.  Here:
+
+- ``colormap_lut`` builds each colormap's 256-entry table once and hands
+  out the same array afterwards, so an unchanged colormap is not
+  re-applied per slice.
+- ``apply_lut`` maps a float image to uint8 RGBA: one rescale to 0-255
+  and one table lookup (as 32-bit words).
+- ``LutRenderer`` does that on a worker thread for the newest request
+  and also returns a histogram of the data for the HistogramLUT widget.
+  The ``ImageItem`` then gets plain RGBA bytes to draw: no levels, no
+  lookup table.
+
+The float path is still there: ``TOMOGUI_PG_RENDER=float`` hands float
+data to pyqtgraph as before (with the cached tables).
+
+    python -m tomogui.lut_render --bench [--size 2048]
+
+times table building and the uint8 RGBA conversion.
+"""
+
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+PG_UINT8_RENDER = os.environ.get("TOMOGUI_PG_RENDER", "uint8").lower() != "float"
+HIST_SAMPLE = 1 << 18
+
+
+@lru_cache(maxsize=32)
+def colormap_lut(name, channels=4):
+    """(256, channels) uint8 table of a matplotlib colormap, gray if it is
+    not available.  Cached: the same (read-only) array every call."""
+    try:
+        import matplotlib.cm as mpl_cm
+        lut = (mpl_cm.colormaps[name](np.linspace(0, 1, 256)) * 255).astype(np.uint8)
+    except Exception:
+        ramp = np.arange(256, dtype=np.uint8)
+        lut = np.stack([ramp, ramp, ramp, np.full(256, 255, np.uint8)], axis=1)
+    lut = np.ascontiguousarray(lut[:, :channels])
+    lut.setflags(write=False)
+    return lut
+
+
+def apply_lut(img, lo, hi, lut):
+    """(h, w, 4) uint8 RGBA of ``img`` over [lo, hi] through the RGBA
+    ``lut``; NaN maps to the first entry."""
+    scale = np.float32(255.0 / (hi - lo)) if hi > lo else np.float32(0.0)
+    t = np.subtract(img, np.float32(lo), dtype=np.float32)
+    t *= scale
+    np.clip(t, 0, 255, out=t)
+    idx = np.nan_to_num(t, copy=False).astype(np.uint8)
+    words = np.take(np.ascontiguousarray(lut).view(np.uint32).ravel(), idx)
+    return words.view(np.uint8).reshape(idx.shape + (4,))
+
+
+def data_histogram(img, bins=256, max_samples=HIST_SAMPLE):
+    """(bin centres, counts) of a strided sample of ``img``, or None."""
+    step = max(1, int(np.sqrt(img.shape[0] * img.shape[1] / max_samples)))
+    a = np.asarray(img[::step, ::step], dtype=np.float32).ravel()
+    a = a[np.isfinite(a)]
+    if a.size == 0 or a.min() == a.max():
+        return None
+    counts, edges = np.histogram(a, bins=bins)
+    return (edges[:-1] + edges[1:]) / 2, counts
+
+
+class LutRenderer(QThread):
+    """Renders the newest requested image to RGBA; requests that have not
+    started are replaced."""
+    rendered = pyqtSignal(object, object, object)     # key, RGBA image, histogram or None
+
+    def __init__(self):
+        super().__init__()
+        self._cond = threading.Condition()
+        self._job = None
+        self._stop = False
+
+    def request(self, key, img, lo, hi, lut, histogram=False):
+        with self._cond:
+            self._job = (key, img, lo, hi, lut, histogram)
+            self._cond.notify_all()
+        if not self.isRunning():
+            self.start()
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._job = None
+            self._cond.notify_all()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while self._job is None and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                key, img, lo, hi, lut, histogram = self._job
+                self._job = None
+            try:
+                rgba = apply_lut(img, lo, hi, lut)
+                hist = data_histogram(img) if histogram else None
+            except Exception:
+                continue
+            self.rendered.emit(key, rgba, hist)
+
+
+def benchmark(size=2048, repeat=5):
+    """Seconds for building a table uncached and cached, and for the
+    uint8 RGBA conversion of a ``size`` x ``size`` float slice."""
+    import time
+    img = np.random.default_rng(0).random((size, size), dtype=np.float32)
+
+    def best(fn):
+        t = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            t = min(t, time.perf_counter() - t0)
+        return t
+
+    colormap_lut.cache_clear()
+    t0 = time.perf_counter()
+    lut = colormap_lut("viridis")
+    uncached = time.perf_counter() - t0
+    return {
+        "lut uncached": uncached,
+        "lut cached": best(lambda: colormap_lut("viridis")),
+        "float -> RGBA": best(lambda: apply_lut(img, 0.1, 0.9, lut)),
+        "histogram": best(lambda: data_histogram(img)),
+    }
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m tomogui.lut_render",
+                                     description="Colormap / LUT rendering benchmark.")
+    parser.add_argument("--bench", action="store_true", help="benchmark on a synthetic slice")
+    parser.add_argument("--size", type=int, default=2048, help="slice edge length")
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.error("--bench is required")
+    for name, sec in benchmark(args.size).items():
+        print(f"{name:<14} {sec * 1e3:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
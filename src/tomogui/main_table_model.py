@@ -0,0 +1,466 @@
+"""
+Main table model for TomoGUI
+Row records + QAbstractTableModel + delegates for the batch file table.
+
+Each row is a plain dict ("record") so the rest of the GUI can keep using
+``file_info['path']`` / ``file_info['filename']`` style access.  Nothing is
+created per row on the Qt side: the view only asks the model for the rows
+that are actually visible, and the checkbox / COR editor / View button are
+painted by delegates.
+"""
+
+import os
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, QRect, pyqtSignal
+from PyQt5.QtGui import QColor, QPalette
+from PyQt5.QtWidgets import (
+    QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton,
+    QStyleOptionViewItem, QLineEdit
+)
+
+from .series_index import SeriesIndex
+
+
+COLUMNS = ["Select", "File Name", "COR", "Status", "Size", "Pixel", "View Data"]
+COL_SELECT, COL_NAME, COL_COR, COL_STATUS, COL_SIZE, COL_PIXEL, COL_VIEW = range(len(COLUMNS))
+
+BORDER_WIDTH = 6   # px, recon-status indicator drawn in the Select column
+
+
+def format_file_size(size_bytes):
+    """Format file size in human-readable format"""
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if size_bytes < 1024.0:
+            return f"{size_bytes:.1f} {unit}"
+        size_bytes /= 1024.0
+    return f"{size_bytes:.1f} PB"
+
+
+def make_record(path, filename=None, cor="", status="Ready", recon_status="red", size=None):
+    """Build a row record for the main table.
+
+    Args:
+        path: full path of the HDF5 file
+        filename: basename (derived from path if omitted)
+        cor: COR text as shown in the table ("" = not set)
+        status: status column text
+        recon_status: colour of the left border indicator (red/orange/green/...)
+        size: file size in bytes, or None if unknown
+    """
+    return {
+        'path': path,
+        'filename': filename or os.path.basename(path),
+        'checked': False,
+        'cor': "" if cor is None else str(cor),
+        'status': status,
+        'status_color': None,
+        'recon_status': recon_status,
+        'size': size,
+        'tint': None,
+        'skipped_small': False,
+    }
+
+
+def _cor_sort_key(rec):
+    try:
+        return (0, float(rec['cor']))
+    except (TypeError, ValueError):
+        return (1, 0.0)   # empty / invalid CORs sort last
+
+
+class MainTableModel(QAbstractTableModel):
+    """Table model over a list of row records.
+
+    Lookups are O(1): records are indexed by full path and by basename,
+    and the record -> row map is rebuilt lazily after the row order
+    changes (insert, remove, sort, reset). ``series`` groups the records
+    by dataset series and is kept in step with every insert/remove.
+    """
+
+    check_toggled = pyqtSignal(int, bool)   # row, checked (user click only)
+    cor_edited = pyqtSignal(str, int)       # path, row (user edit only)
+
+    _SORT_KEYS = {
+        COL_SELECT: lambda rec: not rec['checked'],
+        COL_NAME: lambda rec: rec['filename'],
+        COL_COR: _cor_sort_key,
+        COL_STATUS: lambda rec: rec['status'],
+        COL_SIZE: lambda rec: -1 if rec.get('size') is None else rec['size'],
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = []
+        self._by_path = {}      # full path -> record
+        self._by_name = {}      # basename -> record
+        self._rows = None       # id(record) -> row, None = stale
+        self.series = SeriesIndex()
+
+    # ----- Qt model API -----
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        rec = self.records[index.row()]
+        col = index.column()
+
+        if col == COL_SELECT:
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if rec['checked'] else Qt.Unchecked
+            if role == Qt.UserRole:
+                return rec.get('recon_status')
+        elif col == COL_NAME:
+            if role == Qt.DisplayRole:
+                return rec['filename']
+            if role == Qt.ToolTipRole:
+                return f"{rec['filename']}\n\nFull path:\n{rec['path']}"
+            if role == Qt.BackgroundRole and rec.get('tint') is not None:
+                return rec['tint']
+        elif col == COL_COR:
+            if role in (Qt.DisplayRole, Qt.EditRole):
+                return rec['cor']
+            if role == Qt.TextAlignmentRole:
+                return Qt.AlignCenter
+            if role == Qt.BackgroundRole and rec.get('tint') is not None:
+                return rec['tint']
+            if role == Qt.ForegroundRole and rec.get('tint') is not None:
+                return QColor("#ffffff")
+        elif col == COL_STATUS:
+            if role == Qt.DisplayRole:
+                return rec['status']
+            if role == Qt.ForegroundRole and rec.get('status_color'):
+                return QColor(rec['status_color'])
+        elif col == COL_SIZE:
+            if role == Qt.DisplayRole:
+                return "N/A" if rec.get('size') is None else format_file_size(rec['size'])
+            if role == Qt.TextAlignmentRole:
+                return Qt.AlignRight | Qt.AlignVCenter
+            if role == Qt.UserRole:
+                return rec.get('size')
+        elif col == COL_VIEW:
+            if role == Qt.DisplayRole:
+                return "View Data"
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        f = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == COL_SELECT:
+            f |= Qt.ItemIsUserCheckable
+        elif index.column() == COL_COR:
+            f |= Qt.ItemIsEditable
+        return f
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sort rows in place; persistent indexes follow their records."""
+        key = self._SORT_KEYS.get(column)
+        if key is None:
+            return
+        self.layoutAboutToBeChanged.emit()
+        persistent = [(idx, self.records[idx.row()], idx.column())
+                      for idx in self.persistentIndexList() if idx.isValid()]
+        self.records.sort(key=key, reverse=(order == Qt.DescendingOrder))
+        self._rows = None
+        for idx, rec, col in persistent:
+            self.changePersistentIndex(idx, self.index(self.row_of(rec), col))
+        self.layoutChanged.emit()
+
+    def setData(self, index, value, role=Qt.EditRole):
+        """User edits coming from the delegates."""
+        if not index.isValid():
+            return False
+        row = index.row()
+        rec = self.records[row]
+        if index.column() == COL_SELECT and role == Qt.CheckStateRole:
+            rec['checked'] = (value == Qt.Checked or value is True)
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+            self.check_toggled.emit(row, rec['checked'])
+            return True
+        if index.column() == COL_COR and role == Qt.EditRole:
+            txt = "" if value is None else str(value).strip()
+            if txt == rec['cor']:
+                return True
+            rec['cor'] = txt
+            self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+            self.cor_edited.emit(rec['path'], row)
+            return True
+        return False
+
+    # ----- record store -----
+    def _index_add(self, record):
+        self._by_path[record['path']] = record
+        self._by_name[record['filename']] = record
+        self.series.add(record)
+
+    def _index_drop(self, record):
+        if self._by_path.get(record['path']) is record:
+            del self._by_path[record['path']]
+            self.series.remove(record)
+        if self._by_name.get(record['filename']) is record:
+            del self._by_name[record['filename']]
+
+    def set_records(self, records):
+        """Replace every row (one model reset, no per-row signals)."""
+        self.beginResetModel()
+        self.records = list(records)
+        self._by_path = {}
+        self._by_name = {}
+        self.series.clear()
+        for rec in self.records:
+            self._index_add(rec)
+        self._rows = None
+        self.endResetModel()
+
+    def record(self, row):
+        if row is None or row < 0 or row >= len(self.records):
+            return None
+        return self.records[row]
+
+    def record_for(self, name):
+        """Record of a full path or a bare basename, or None."""
+        if not name:
+            return None
+        rec = self._by_path.get(name)
+        if rec is None:
+            rec = self._by_name.get(os.path.basename(name))
+        return rec
+
+    def row_of(self, record):
+        """Current row of a record (identity match), or None."""
+        if record is None:
+            return None
+        if self._rows is None:
+            self._rows = {id(rec): i for i, rec in enumerate(self.records)}
+        return self._rows.get(id(record))
+
+    def find_row(self, name):
+        """Row of a full path or a bare basename, or None."""
+        return self.row_of(self.record_for(name))
+
+    def append_records(self, records):
+        """Append a chunk of rows at the bottom (one insert signal)."""
+        if not records:
+            return
+        first = len(self.records)
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        self.records.extend(records)
+        for rec in records:
+            self._index_add(rec)
+        self._rows = None
+        self.endInsertRows()
+
+    def insert_record(self, row, record):
+        row = max(0, min(row, len(self.records)))
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.records.insert(row, record)
+        self._index_add(record)
+        self._rows = None
+        self.endInsertRows()
+
+    def remove_record(self, record):
+        row = self.row_of(record)
+        if row is None:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.records[row]
+        self._index_drop(record)
+        self._rows = None
+        self.endRemoveRows()
+        return True
+
+    # ----- programmatic updates (no user-edit signals) -----
+    def _emit_row(self, record, first=0, last=None):
+        row = self.row_of(record)
+        if row is None:
+            return
+        last = len(COLUMNS) - 1 if last is None else last
+        self.dataChanged.emit(self.index(row, first), self.index(row, last))
+
+    def set_checked(self, record, checked):
+        checked = bool(checked)
+        if record['checked'] == checked:
+            return
+        record['checked'] = checked
+        self._emit_row(record, COL_SELECT, COL_SELECT)
+
+    def set_cor(self, record, text):
+        record['cor'] = "" if text is None else str(text).strip()
+        self._emit_row(record, COL_COR, COL_COR)
+
+    def set_status(self, record, text, recon_status=None, text_color=None):
+        """Set status text and optionally the left-border colour."""
+        record['status'] = text
+        record['status_color'] = text_color
+        if recon_status is not None:
+            record['recon_status'] = recon_status
+        self._emit_row(record, COL_SELECT, COL_STATUS)
+
+    def set_recon_status(self, record, recon_status):
+        record['recon_status'] = recon_status
+        self._emit_row(record, COL_SELECT, COL_SELECT)
+
+    def update_record(self, record, **fields):
+        """Set record fields; repaint the row only if something changed.
+
+        Returns:
+            bool: True if any field changed.
+        """
+        changed = False
+        for key, value in fields.items():
+            if record.get(key) != value:
+                record[key] = value
+                changed = True
+        if changed:
+            if 'size' in fields:
+                self.series.size_changed(record)
+            self._emit_row(record)
+        return changed
+
+    def update_records(self, updates, first_col=0, last_col=None):
+        """Apply [(record, {field: value})] and repaint once.
+
+        One dataChanged covers the span of rows that actually changed,
+        so the view repaints once for the whole batch.
+
+        Returns:
+            list: the records that changed.
+        """
+        changed, rows = [], []
+        for record, fields in updates:
+            hit = False
+            for key, value in fields.items():
+                if record.get(key) != value:
+                    record[key] = value
+                    hit = True
+            if not hit:
+                continue
+            if 'size' in fields:
+                self.series.size_changed(record)
+            changed.append(record)
+            row = self.row_of(record)
+            if row is not None:
+                rows.append(row)
+        if rows:
+            last_col = len(COLUMNS) - 1 if last_col is None else last_col
+            self.dataChanged.emit(self.index(min(rows), first_col),
+                                  self.index(max(rows), last_col))
+        return changed
+
+    def refresh_rows(self, first_col=0, last_col=None):
+        """Repaint every row for the given column range (one signal)."""
+        if not self.records:
+            return
+        last_col = len(COLUMNS) - 1 if last_col is None else last_col
+        self.dataChanged.emit(self.index(0, first_col),
+                              self.index(len(self.records) - 1, last_col))
+
+    def checked_records(self):
+        return [rec for rec in self.records if rec['checked']]
+
+
+class CheckBorderDelegate(QStyledItemDelegate):
+    """Centered checkbox with a coloured left border for the recon status."""
+
+    def paint(self, painter, option, index):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        widget = opt.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        # selection / background only, no text or check indicator
+        opt.text = ""
+        opt.features &= ~QStyleOptionViewItem.HasCheckIndicator
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, widget)
+
+        color = index.data(Qt.UserRole)
+        if color:
+            r = option.rect
+            painter.fillRect(QRect(r.left(), r.top(), BORDER_WIDTH, r.height()), QColor(color))
+
+        cb = QStyleOptionButton()
+        cb.rect = self._check_rect(option, style, widget)
+        cb.state = QStyle.State_Enabled
+        cb.state |= QStyle.State_On if index.data(Qt.CheckStateRole) == Qt.Checked else QStyle.State_Off
+        style.drawPrimitive(QStyle.PE_IndicatorCheckBox, cb, painter, widget)
+
+    @staticmethod
+    def _check_rect(option, style, widget):
+        cb = QStyleOptionButton()
+        ind = style.subElementRect(QStyle.SE_CheckBoxIndicator, cb, widget)
+        r = QRect(0, 0, ind.width(), ind.height())
+        r.moveCenter(option.rect.center())
+        return r
+
+    def editorEvent(self, event, model, option, index):
+        if not (index.flags() & Qt.ItemIsUserCheckable):
+            return False
+        if event.type() in (QEvent.MouseButtonPress, QEvent.MouseButtonDblClick):
+            return event.button() == Qt.LeftButton
+        if event.type() == QEvent.MouseButtonRelease:
+            if event.button() != Qt.LeftButton or not option.rect.contains(event.pos()):
+                return False
+        elif event.type() == QEvent.KeyPress:
+            if event.key() not in (Qt.Key_Space, Qt.Key_Select):
+                return False
+        else:
+            return False
+        state = Qt.Unchecked if index.data(Qt.CheckStateRole) == Qt.Checked else Qt.Checked
+        return model.setData(index, state, Qt.CheckStateRole)
+
+
+class CorDelegate(QStyledItemDelegate):
+    """QLineEdit editor for the COR column; shows a placeholder when empty."""
+
+    PLACEHOLDER = "COR value"
+
+    def createEditor(self, parent, option, index):
+        editor = QLineEdit(parent)
+        editor.setPlaceholderText(self.PLACEHOLDER)
+        editor.setAlignment(Qt.AlignCenter)
+        return editor
+
+    def setEditorData(self, editor, index):
+        editor.setText(index.data(Qt.EditRole) or "")
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.text(), Qt.EditRole)
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        if not option.text:
+            option.text = self.PLACEHOLDER
+            option.palette.setColor(QPalette.Text, QColor("#888888"))
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """Painted push button; emits clicked(row) on left-click release."""
+
+    clicked = pyqtSignal(int)
+
+    def paint(self, painter, option, index):
+        widget = option.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        btn = QStyleOptionButton()
+        btn.rect = option.rect.adjusted(2, 2, -2, -2)
+        btn.text = index.data(Qt.DisplayRole) or ""
+        btn.state = QStyle.State_Enabled | QStyle.State_Raised
+        style.drawControl(QStyle.CE_PushButton, btn, painter, widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() in (QEvent.MouseButtonPress, QEvent.MouseButtonDblClick):
+            return event.button() == Qt.LeftButton
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            if option.rect.contains(event.pos()):
+                self.clicked.emit(index.row())
+            return True
+        return False
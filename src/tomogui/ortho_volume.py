@@ -0,0 +1,262 @@
+"""
+Orthogonal views for TomoGUI
+XZ and YZ reslices of a full reconstruction from a local volume cache.
+
+A reslice needs one row (XZ) or one column (YZ) of every slice file;
+read from the TIFF stack over NFS that is thousands of small reads per
+slider tick.  ``VolumeBuilder`` reads the stack once in the background
+and writes an ``OrthoVolume``: two ``np.memmap`` files in a local cache
+directory, laid out so that a reslice is one contiguous block,
+
+    xz[y] -> (z, x)        yz[x] -> (z, y)
+
+The volume is binned by the smallest power of two (same in x, y and z,
+so voxels stay cubic) that keeps both copies within ``ORTHO_BUDGET``.
+The builder records its progress next to the data; reopening the same
+reconstruction reuses a finished cache and resumes an unfinished one,
+and only the ``KEEP`` most recent volumes are kept.  Unbuilt planes
+read as zeros, so the views fill in while the build runs.
+
+The cache directory is per user (``$TOMOGUI_ORTHO_CACHE``, else
+``$XDG_CACHE_HOME/tomogui/ortho``, else ``~/.cache/tomogui/ortho``):
+beamline workstations are shared, and ``/tmp`` may be RAM.
+
+    python -m tomogui.ortho_volume --bench [--size 1024] [--slices 256]
+
+compares an XZ reslice read from a synthetic TIFF stack with one from
+the cache.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from .tiff_reader import read_tiff
+
+ORTHO_BUDGET = 4 << 30       # bytes for both copies together
+KEEP = 3
+
+
+def cache_dir():
+    """Per-user directory for the volume caches (see module docstring)."""
+    path = os.environ.get("TOMOGUI_ORTHO_CACHE")
+    if not path:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        path = os.path.join(base, "tomogui", "ortho")
+    return path
+
+
+def pick_bin(nz, h, w, budget=ORTHO_BUDGET, itemsize=4):
+    """Smallest power of two b with both b-binned copies within budget."""
+    b = 1
+    while 2 * (nz // b) * (h // b) * (w // b) * itemsize > budget and b < min(nz, h, w):
+        b *= 2
+    return b
+
+
+def _stack_id(files):
+    """Name for the cache of a slice stack; changes when a reconstruction
+    is rewritten (count, first/last file, their size and mtime)."""
+    parts = [os.path.dirname(os.path.abspath(files[0])), str(len(files))]
+    for p in (files[0], files[-1]):
+        st = os.stat(p)
+        parts += [os.path.basename(p), str(st.st_size), str(st.st_mtime_ns)]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+
+def _bin2d(img, b):
+    if b == 1:
+        return np.asarray(img, dtype=np.float32)
+    h, w = img.shape[0] // b, img.shape[1] // b
+    a = np.asarray(img[:h * b, :w * b], dtype=np.float32)
+    return a.reshape(h, b, w, b).mean(axis=(1, 3), dtype=np.float32)
+
+
+class OrthoVolume:
+    """Binned XZ-major and YZ-major copies of a slice stack."""
+
+    def __init__(self, base, meta, mode="r+"):
+        self.base = base
+        self.meta = meta
+        nzb, hb, wb = meta["shape"]
+        self.bin = meta["bin"]
+        self.shape = (nzb, hb, wb)
+        self._xz = np.memmap(base + ".xz.f32", dtype=np.float32, mode=mode, shape=(hb, nzb, wb))
+        self._yz = np.memmap(base + ".yz.f32", dtype=np.float32, mode=mode, shape=(wb, nzb, hb))
+
+    @classmethod
+    def open(cls, files, budget=ORTHO_BUDGET, directory=None):
+        """Volume cache of ``files`` (existing or new, maybe unfinished) in
+        ``directory`` (default ``cache_dir()``)."""
+        directory = directory or cache_dir()
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        base = os.path.join(directory, _stack_id(files))
+        meta_path = base + ".json"
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            vol = cls(base, meta)
+            os.utime(meta_path)      # _prune keeps the most recently used
+            return vol
+        except (OSError, ValueError, KeyError):
+            pass
+        h, w = read_tiff(files[0]).shape[:2]
+        nz = len(files)
+        b = pick_bin(nz, h, w, budget)
+        meta = {"files": len(files), "shape": [nz // b, h // b, w // b], "bin": b, "done": 0}
+        vol = cls(base, meta, mode="w+")
+        vol.save_meta()
+        _prune(directory, keep=base)
+        return vol
+
+    @property
+    def done(self):
+        return self.meta["done"]
+
+    @property
+    def complete(self):
+        return self.meta["done"] >= self.shape[0]
+
+    def save_meta(self):
+        tmp = self.base + ".json.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self.base + ".json")
+
+    def write_plane(self, zb, plane):
+        self._xz[:, zb, :] = plane
+        self._yz[:, zb, :] = plane.T
+
+    def flush(self, done):
+        self._xz.flush()
+        self._yz.flush()
+        self.meta["done"] = done
+        self.save_meta()
+
+    def xz(self, y):
+        """(z, x) reslice at binned row ``y``."""
+        return np.array(self._xz[y])
+
+    def yz(self, x):
+        """(z, y) reslice at binned column ``x``."""
+        return np.array(self._yz[x])
+
+
+def _prune(directory, keep, n=KEEP):
+    """Delete all but the ``n`` most recently used volumes (and ``keep``);
+    use is the meta file's mtime, touched on every ``OrthoVolume.open``."""
+    metas = []
+    for name in os.listdir(directory):
+        if name.endswith(".json"):
+            p = os.path.join(directory, name)
+            metas.append((os.path.getmtime(p), p[:-len(".json")]))
+    metas.sort(reverse=True)
+    for _, base in metas[n:]:
+        if base == keep:
+            continue
+        for ext in (".json", ".xz.f32", ".yz.f32"):
+            try:
+                os.remove(base + ext)
+            except OSError:
+                pass
+
+
+class VolumeBuilder(QThread):
+    """Reads a slice stack once into an OrthoVolume, resuming where the
+    cache left off."""
+    progress = pyqtSignal(int, int)      # binned planes done, total
+    failed = pyqtSignal(str)
+
+    def __init__(self, volume, files, flush_every=2.0):
+        super().__init__()
+        self.volume = volume
+        self.files = list(files)
+        self.flush_every = flush_every
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        vol = self.volume
+        nzb = vol.shape[0]
+        b = vol.bin
+        last = time.monotonic()
+        zb = vol.done
+        try:
+            while zb < nzb and not self._cancel.is_set():
+                acc = None
+                for f in self.files[zb * b:(zb + 1) * b]:
+                    img = read_tiff(f)
+                    if img.ndim == 3:
+                        img = img[..., 0]
+                    acc = _bin2d(img, b) if acc is None else acc + _bin2d(img, b)
+                vol.write_plane(zb, acc / b)
+                zb += 1
+                if time.monotonic() - last >= self.flush_every or zb == nzb:
+                    vol.flush(zb)
+                    last = time.monotonic()
+                    self.progress.emit(zb, nzb)
+            if zb < nzb:
+                vol.flush(zb)     # cancelled: keep what is there for next time
+        except Exception as exc:
+            self.failed.emit(f"{type(exc).__name__}: {exc}")
+
+
+def benchmark(size=1024, slices=256, repeat=3):
+    """Seconds for an XZ reslice read from the TIFF stack, the cache build
+    and an XZ/YZ reslice from the cache."""
+    import shutil
+    from .tiff_reader import _write_tiff
+    rng = np.random.default_rng(0)
+    tmp = tempfile.mkdtemp(prefix="tomogui-ortho-bench-")
+    try:
+        files = []
+        for z in range(slices):
+            p = os.path.join(tmp, f"recon_{z:05d}.tiff")
+            _write_tiff(p, rng.random((size, size), dtype=np.float32))
+            files.append(p)
+        y = size // 2
+        t0 = time.perf_counter()
+        np.stack([read_tiff(f)[y] for f in files])
+        stack_s = time.perf_counter() - t0
+        vol = OrthoVolume.open(files, directory=os.path.join(tmp, "cache"))
+        t0 = time.perf_counter()
+        VolumeBuilder(vol, files, flush_every=60).run()
+        build_s = time.perf_counter() - t0
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            vol.xz(y // vol.bin)
+            vol.yz(y // vol.bin)
+            best = min(best, (time.perf_counter() - t0) / 2)
+        return {"stack_s": stack_s, "build_s": build_s, "cached_s": best, "bin": vol.bin}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m tomogui.ortho_volume",
+                                     description="Orthogonal reslice benchmark.")
+    parser.add_argument("--bench", action="store_true", help="benchmark on a synthetic stack")
+    parser.add_argument("--size", type=int, default=1024, help="slice edge length")
+    parser.add_argument("--slices", type=int, default=256, help="number of slices")
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.error("--bench is required")
+    res = benchmark(args.size, args.slices)
+    print(f"XZ reslice from {args.slices} TIFFs: {res['stack_s'] * 1e3:8.1f} ms")
+    print(f"cache build (bin {res['bin']}):      {res['build_s'] * 1e3:8.1f} ms")
+    print(f"reslice from cache:        {res['cached_s'] * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Persistence service for TomoGUI
+One background thread that writes every GUI-side change to the data
+folder's DatasetStore.
+
+The GUI only queues work: COR edits and parameter snapshots go into a
+per-store dirty set (latest value per file wins) and the thread writes
+once nothing new has arrived for ``debounce`` seconds.  Metadata
+features read for the COR predictor are queued the same way.  A click-through
+of 50 rows or a batch start therefore becomes one transaction, and the
+GUI thread never waits on NFS.  Legacy exports (``rot_cen.json``,
+``recon_params.json``) go through the same thread, so there is never
+more than one writer per process; the files themselves are replaced
+atomically by the store.
+
+``saved`` reports COR values once they are committed.  ``stats()`` counts submitted changes, writes actually made, and the
+changes that were coalesced into an already pending write.
+"""
+
+import threading
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class _Pending:
+    """Dirty set of one DatasetStore."""
+    __slots__ = ("cors", "params", "features", "export_params", "export_all", "close")
+
+    def __init__(self):
+        self.cors = {}              # path -> COR text
+        self.params = {}            # path -> params snapshot
+        self.features = {}          # path -> (file mtime, features)
+        self.export_params = False  # rewrite recon_params.json
+        self.export_all = False     # rewrite every legacy file
+        self.close = False          # close the store afterwards
+
+
+class PersistenceService(QThread):
+    """Single debounced writer thread for DatasetStore changes."""
+    error = pyqtSignal(str)          # human-readable message (GUI logs it)
+    saved = pyqtSignal(str, int)     # store path, COR values committed
+
+    def __init__(self, debounce=0.5):
+        super().__init__()
+        self.debounce = debounce
+        self._cond = threading.Condition()
+        self._pending = {}           # id(store) -> (store, _Pending)
+        self._inflight = {}          # the batch being written right now, same layout
+        self._last_submit = 0.0
+        self._flush_requested = False
+        self._stop = False
+        self._stats = {"submitted": 0, "coalesced": 0, "writes": 0, "errors": 0}
+
+    # ----- GUI side -----
+    def _entry(self, store):
+        key = id(store)
+        if key not in self._pending:
+            self._pending[key] = (store, _Pending())
+        return self._pending[key][1]
+
+    def _submitted(self, n_new, n_coalesced):
+        self._stats["submitted"] += n_new + n_coalesced
+        self._stats["coalesced"] += n_coalesced
+        self._last_submit = time.monotonic()
+        self._cond.notify_all()
+
+    def submit_cors(self, store, changes):
+        """Queue {path: COR text} ("" clears) for a store."""
+        if not changes:
+            return
+        with self._cond:
+            pending = self._entry(store)
+            n_old = sum(1 for p in changes if p in pending.cors)
+            pending.cors.update(changes)
+            self._submitted(len(changes) - n_old, n_old)
+
+    def submit_params(self, store, per_file):
+        """Queue {path: params snapshot}; recon_params.json is re-exported after."""
+        if not per_file:
+            return
+        with self._cond:
+            pending = self._entry(store)
+            n_old = sum(1 for p in per_file if p in pending.params)
+            pending.params.update(per_file)
+            pending.export_params = True
+            self._submitted(len(per_file) - n_old, n_old)
+
+    def submit_features(self, store, features):
+        """Queue {path: (file mtime, metadata features)} for a store."""
+        if not features:
+            return
+        with self._cond:
+            pending = self._entry(store)
+            n_old = sum(1 for p in features if p in pending.features)
+            pending.features.update(features)
+            self._submitted(len(features) - n_old, n_old)
+
+    def submit_close(self, store):
+        """Write what is queued, export every legacy file, then close the store."""
+        with self._cond:
+            pending = self._entry(store)
+            pending.export_all = True
+            pending.close = True
+            self._flush_requested = True
+            self._cond.notify_all()
+
+    def pending_params(self, store, path):
+        """Snapshot of a file that is queued or being written (not yet
+        readable from the store), or None."""
+        with self._cond:
+            for batch in (self._pending, self._inflight):
+                entry = batch.get(id(store))
+                if entry is not None and path in entry[1].params:
+                    return entry[1].params[path]
+            return None
+
+    def stop(self):
+        """Flush and end the thread (call wait() afterwards)."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return dict(self._stats)
+
+    # ----- worker side -----
+    def _take_batch(self):
+        """Block until there is work and the debounce window has passed."""
+        with self._cond:
+            while not self._pending and not self._stop:
+                self._cond.wait()
+            while self._pending and not (self._stop or self._flush_requested):
+                remaining = self._last_submit + self.debounce - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, self._pending = self._pending, {}
+            self._flush_requested = False
+            # stays visible to pending_params until committed
+            self._inflight = batch
+            return batch
+
+    def _write(self, store, pending):
+        if pending.cors:
+            store.set_cors(pending.cors)
+        if pending.params:
+            store.set_params_many(pending.params)
+        if pending.features:
+            store.set_features(pending.features)
+        if pending.export_all:
+            store.export_legacy()
+        elif pending.export_params:
+            store.export_params()
+
+    def run(self):
+        while True:
+            batch = self._take_batch()
+            for store, pending in batch.values():
+                try:
+                    self._write(store, pending)
+                    with self._cond:
+                        self._stats["writes"] += 1
+                    if pending.cors:
+                        self.saved.emit(store.path, len(pending.cors))
+                except Exception as exc:
+                    with self._cond:
+                        self._stats["errors"] += 1
+                    self.error.emit(f"Could not save to {store.path}: {exc}")
+                if pending.close:
+                    store.close()
+            with self._cond:
+                self._inflight = {}
+                self._cond.notify_all()
+                if self._stop and not self._pending:
+                    return
@@ -0,0 +1,195 @@
+"""
+Reconstruction status index for TomoGUI
+Single-pass scan of ``<data>_rec`` with mtime-based caching.
+
+Layout scanned::
+
+    <data>_rec/try_center/<proj>/*center<cor>.tiff
+    <data>_rec/<proj>_rec/*_<slice>.tiff
+
+Every reconstruction directory is summarised once (TIFF count and slice
+range from the file names, no per-file stat) and the summary is reused
+until the directory's mtime changes, i.e. until files are added to or
+removed from it.  A refresh therefore costs one ``stat`` per directory
+instead of one ``glob`` per file on NFS.
+"""
+
+import os
+import threading
+from typing import NamedTuple, Optional
+
+
+class ReconStatus(NamedTuple):
+    """Reconstruction outputs found for one projection file."""
+    try_count: int = 0
+    full_count: int = 0
+    first_slice: Optional[int] = None
+    last_slice: Optional[int] = None
+
+    @property
+    def has_try(self):
+        return self.try_count > 0
+
+    @property
+    def has_full(self):
+        return self.full_count > 0
+
+    def full_range_text(self):
+        """'Full a-b' (or 'Done full' if the slice numbers are unknown)."""
+        if self.first_slice is None:
+            return "Done full"
+        return f"Full {self.first_slice}-{self.last_slice}"
+
+    def row_status(self):
+        """(border colour, status text) as shown in the main table."""
+        if self.has_full:
+            return "green", self.full_range_text()
+        if self.has_try:
+            return "orange", "Done try"
+        return "red", "Ready"
+
+
+NO_RECON = ReconStatus()
+
+
+def is_recon_status_text(text):
+    """True for status texts that ``row_status`` derives from disk.
+
+    Anything else (Queued, Running on GPU n, Uploading…, Skipped, ...) is
+    transient state owned by a running job and must not be overwritten
+    by a table refresh.
+    """
+    return text in ("Ready", "Done try", "Done full") or text.startswith("Full ")
+
+
+def _slice_number(name):
+    """Trailing integer of '<prefix>_<NNNNN>.tiff', or None."""
+    stem = os.path.splitext(name)[0]
+    try:
+        return int(stem.rsplit("_", 1)[-1])
+    except ValueError:
+        return None
+
+
+def scan_h5_files(data_folder):
+    """List ``*.h5`` in a folder with one scandir pass.
+
+    Returns:
+        list of (path, size_bytes, mtime) sorted newest first.
+    """
+    out = []
+    try:
+        with os.scandir(data_folder) as it:
+            for entry in it:
+                if not entry.name.endswith(".h5"):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                out.append((entry.path, st.st_size, st.st_mtime))
+    except OSError:
+        return []
+    out.sort(key=lambda t: t[2], reverse=True)
+    return out
+
+
+class ReconStatusIndex:
+    """Cache of per-directory TIFF summaries keyed by directory mtime.
+
+    Safe to share between the GUI thread and a folder-scan thread.
+    """
+
+    def __init__(self):
+        # dir path -> (mtime_ns, (count, first_slice, last_slice))
+        self._dirs = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._dirs = {}
+
+    def _summary(self, path, mtime_ns=None, slices=False):
+        """(count, first, last) of the TIFFs in one directory (cached)."""
+        if mtime_ns is None:
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                with self._lock:
+                    self._dirs.pop(path, None)
+                return 0, None, None
+        with self._lock:
+            cached = self._dirs.get(path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+        count, first, last = 0, None, None
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if not entry.name.endswith(".tiff"):
+                        continue
+                    count += 1
+                    if slices:
+                        n = _slice_number(entry.name)
+                        if n is None:
+                            continue
+                        first = n if first is None else min(first, n)
+                        last = n if last is None else max(last, n)
+        except OSError:
+            return 0, None, None
+        summary = (count, first, last)
+        with self._lock:
+            self._dirs[path] = (mtime_ns, summary)
+        return summary
+
+    def scan(self, data_folder):
+        """Status of every projection with outputs under ``<data>_rec``.
+
+        Returns:
+            dict proj_name -> ReconStatus (projections with no outputs are
+            absent; use ``.get(name, NO_RECON)``).
+        """
+        root = f"{data_folder}_rec"
+        try_counts = {}
+        full = {}
+        try:
+            with os.scandir(root) as it:
+                entries = [e for e in it if e.is_dir()]
+        except OSError:
+            return {}
+        for entry in entries:
+            try:
+                mtime_ns = entry.stat().st_mtime_ns
+            except OSError:
+                continue
+            if entry.name == "try_center":
+                try:
+                    with os.scandir(entry.path) as it:
+                        sub = [e for e in it if e.is_dir()]
+                except OSError:
+                    continue
+                for e in sub:
+                    try:
+                        count = self._summary(e.path, e.stat().st_mtime_ns)[0]
+                    except OSError:
+                        continue
+                    if count:
+                        try_counts[e.name] = count
+            elif entry.name.endswith("_rec"):
+                summary = self._summary(entry.path, mtime_ns, slices=True)
+                if summary[0]:
+                    full[entry.name[:-len("_rec")]] = summary
+        out = {}
+        for proj in set(try_counts) | set(full):
+            count, first, last = full.get(proj, (0, None, None))
+            out[proj] = ReconStatus(try_counts.get(proj, 0), count, first, last)
+        return out
+
+    def lookup(self, data_folder, proj_name):
+        """Status of a single projection (stats only its two directories)."""
+        root = f"{data_folder}_rec"
+        try_count = self._summary(os.path.join(root, "try_center", proj_name))[0]
+        count, first, last = self._summary(os.path.join(root, f"{proj_name}_rec"), slices=True)
+        return ReconStatus(try_count, count, first, last)
@@ -0,0 +1,125 @@
+"""
+Inference result channels for TomoGUI
+How a COR inference hands its answer to whoever is waiting for it.
+
+A result is a plain dict::
+
+    {"event": "result", "path": <h5 file>, "cor": 1234.5,
+     "best_cors": [...], "candidates": 101, "scores": [[cor, score], ...],
+     "timing": {"load": s, "infer": s, "total": s}}
+
+or ``{"event": "error", "path": ..., "reason": ...}``.  Backends:
+
+``FileChannel``    ``center_of_rotation.txt`` in the try directory, one
+                   best COR per line (the historical format, for tools
+                   and older TomoGUI versions that read it).
+``StreamChannel``  one JSON line per result on a text stream - the
+                   worker's stdout pipe, or ``socket.makefile("w")``.
+
+In-process callers simply use the dict ``inference_pipeline`` returns.
+
+``parse_line`` turns a stream line back into a result, so the GUI gets
+COR, scores and timing straight from the pipe without touching NFS.
+"""
+
+import json
+import os
+
+COR_TXT = "center_of_rotation.txt"
+
+
+def result(path, best_cors, cors=(), scores=(), timing=None):
+    """Result dict of a finished inference; ``cor`` is the last best one
+    rounded to 0.1 px, as read back from center_of_rotation.txt."""
+    return {
+        "event": "result",
+        "path": path,
+        "cor": round(float(best_cors[-1]), 1),
+        "best_cors": [round(float(c), 1) for c in best_cors],
+        "candidates": len(cors),
+        "scores": [[round(float(c), 3), round(float(s), 6)] for c, s in zip(cors, scores)],
+        "timing": timing or {},
+    }
+
+
+def error(path, reason):
+    return {"event": "error", "path": path, "reason": reason}
+
+
+def parse_line(line):
+    """Result dict of a JSON result line, or None for anything else."""
+    line = line.strip()
+    if not line.startswith("{"):
+        return None
+    try:
+        msg = json.loads(line)
+    except ValueError:
+        return None
+    if isinstance(msg, dict) and msg.get("event") in ("result", "error") and "path" in msg:
+        return msg
+    return None
+
+
+class ResultChannel:
+    """Where results go."""
+
+    def reset(self, path):
+        """Forget any earlier result of ``path`` before a new run."""
+
+    def publish(self, msg):
+        raise NotImplementedError
+
+
+class FileChannel(ResultChannel):
+    """center_of_rotation.txt in the try directory of one scan
+    (compatibility backend)."""
+
+    def __init__(self, out_dir):
+        self.txt = os.path.join(out_dir, COR_TXT)
+
+    def reset(self, path):
+        # A failed run must not leave the previous answer behind for
+        # whoever reads the file next.
+        try:
+            os.remove(self.txt)
+        except FileNotFoundError:
+            pass
+
+    def publish(self, msg):
+        if msg.get("event") != "result":
+            return
+        # 'w' — each inference run starts a fresh file. Appending leaves stale
+        # values behind that then get mis-read if a later run fails silently.
+        with open(self.txt, "w") as f:
+            for cor in msg["best_cors"]:
+                f.write(f"{cor:.1f}\n")
+
+    @staticmethod
+    def read(out_dir, path=None):
+        """Result dict from an existing center_of_rotation.txt."""
+        txt = os.path.join(out_dir, COR_TXT)
+        try:
+            with open(txt) as f:
+                lines = [ln.strip() for ln in f if ln.strip()]
+        except FileNotFoundError:
+            return error(path, f"no {COR_TXT}")
+        except OSError as e:
+            return error(path, f"could not read {txt} ({e})")
+        try:
+            best = [float(ln.split()[-1]) for ln in lines]
+        except ValueError as e:
+            return error(path, f"could not parse {txt} ({e})")
+        if not best:
+            return error(path, f"empty {txt}")
+        return result(path, best)
+
+
+class StreamChannel(ResultChannel):
+    """One JSON line per result on a text stream (pipe or socket file)."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def publish(self, msg):
+        self.stream.write(json.dumps(msg) + "\n")
+        self.stream.flush()
@@ -0,0 +1,147 @@
+"""
+Dataset series index for TomoGUI
+Groups main-table rows into acquisition series by filename.
+
+A "series" is everything before the final numeric index of the file
+name, e.g. ``UPC15_NMC811_SC_b1_Ni_edge_1124.h5`` belongs to series
+``UPC15_NMC811_SC_b1_Ni_edge`` with index 1124.  Each file name is parsed
+once; members of a series are kept sorted by index so "neighbour" always
+means the adjacent scan in the same series, whatever the table sort.
+
+Used by the series tint, the small-file auto-skip, Fix COR Outliers and
+the Batch AI Reco series-mean seeding.
+"""
+
+import os
+import re
+from bisect import bisect_left
+
+SERIES_RE = re.compile(r'^(.*?)[._-]*(\d+)$')
+
+
+def parse_series(filename):
+    """(series_key, index) of a file name; index is 0 if there is none."""
+    base = os.path.splitext(os.path.basename(filename))[0]
+    m = SERIES_RE.match(base)
+    if m:
+        return m.group(1), int(m.group(2))
+    return base, 0
+
+
+def _median(values):
+    s = sorted(values)
+    n = len(s)
+    return s[n // 2] if n % 2 else 0.5 * (s[n // 2 - 1] + s[n // 2])
+
+
+def _cor_value(record):
+    try:
+        return float(record.get('cor', '').strip())
+    except (AttributeError, ValueError, TypeError):
+        return None
+
+
+class SeriesIndex:
+    """series key -> members sorted by index, updated per added/removed row.
+
+    Rows are the main-table record dicts (``path``, ``filename``, ``size``,
+    ``cor``, ...).  The size median per series is cached until a member is
+    added, removed or resized; COR statistics are read live from the
+    records because COR cells are edited in place.
+    """
+
+    def __init__(self):
+        self._parsed = {}       # path -> (series_key, index)
+        self._keys = {}         # series -> sorted [(index, path)]
+        self._members = {}      # series -> [record], parallel to _keys
+        self._size_median = {}  # series -> median size of files > 0 bytes
+
+    def clear(self):
+        self._parsed = {}
+        self._keys = {}
+        self._members = {}
+        self._size_median = {}
+
+    def rebuild(self, records):
+        self.clear()
+        for rec in records:
+            self.add(rec)
+
+    def add(self, record):
+        path = record['path']
+        if path in self._parsed:
+            self.remove(record)
+        series, idx = parse_series(record['filename'])
+        self._parsed[path] = (series, idx)
+        keys = self._keys.setdefault(series, [])
+        pos = bisect_left(keys, (idx, path))
+        keys.insert(pos, (idx, path))
+        self._members.setdefault(series, []).insert(pos, record)
+        self._size_median.pop(series, None)
+
+    def remove(self, record):
+        parsed = self._parsed.pop(record['path'], None)
+        if parsed is None:
+            return
+        series, idx = parsed
+        keys = self._keys[series]
+        pos = bisect_left(keys, (idx, record['path']))
+        del keys[pos]
+        del self._members[series][pos]
+        if not keys:
+            del self._keys[series]
+            del self._members[series]
+        self._size_median.pop(series, None)
+
+    def size_changed(self, record):
+        """Drop the cached size median of the record's series."""
+        parsed = self._parsed.get(record['path'])
+        if parsed is not None:
+            self._size_median.pop(parsed[0], None)
+
+    # ----- queries -----
+    def series_of(self, record):
+        """(series_key, index) of a record (parsed on first use)."""
+        parsed = self._parsed.get(record['path'])
+        return parsed if parsed is not None else parse_series(record['filename'])
+
+    def key_of(self, record):
+        return self.series_of(record)[0]
+
+    def members(self, series):
+        """Records of one series, sorted by their numeric index."""
+        return self._members.get(series, [])
+
+    def groups(self):
+        """Iterate (series_key, members sorted by index)."""
+        return self._members.items()
+
+    def __len__(self):
+        return len(self._members)
+
+    def size_median(self, series):
+        """Median size of the non-empty files of a series, or None if the
+        series has fewer than two such files (no basis for comparison)."""
+        if series in self._size_median:
+            return self._size_median[series]
+        sizes = [rec.get('size') or 0 for rec in self.members(series)]
+        sizes = [s for s in sizes if s > 0]
+        median = _median(sizes) if len(sizes) >= 2 else None
+        self._size_median[series] = median
+        return median
+
+    def cor_values(self, series):
+        """Numeric CORs currently set in a series, in index order."""
+        values = []
+        for rec in self.members(series):
+            v = _cor_value(rec)
+            if v is not None:
+                values.append(v)
+        return values
+
+    def cor_mean(self, series):
+        """(mean COR, number of donors) of a series, or (None, 0)."""
+        values = self.cor_values(series)
+        if not values:
+            return None, 0
+        return sum(values) / len(values), len(values)
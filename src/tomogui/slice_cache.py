@@ -0,0 +1,249 @@
+"""
+Slice cache for TomoGUI
+Decoded reconstruction slices for the viewer's slice slider.
+
+Scrubbing the slider through a Try or Full reconstruction used to open
+and decode one TIFF per tick on the GUI thread; over NFS every tick
+waited for the file.  ``SliceCache`` keeps decoded slices in an LRU
+bounded in bytes and has background threads read the next slices in
+the scrub direction (and a few behind it) while the current one is
+shown.  A tick whose slice is still being read waits for that read
+instead of starting a second one.
+
+The cache holds one series (``set_files``); opening another series, or
+the same one again after a new reconstruction, starts empty.
+
+    python -m tomogui.slice_cache --bench [--n 400] [--latency 15]
+
+compares scrub latency with and without the cache on a synthetic
+series.
+"""
+
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from .tiff_reader import read_tiff
+
+
+def read_slice(path):
+    """Decoded 2-D slice of a TIFF (first channel of multi-channel files)."""
+    # a private copy, not a mapping: cached slices outlive rewrites
+    img = read_tiff(path, mmap=False)
+    if img.ndim == 3:
+        img = img[..., 0]
+    return img
+
+
+class SliceCache:
+    """Byte-bounded LRU of decoded slices with a read-ahead prefetcher."""
+
+    def __init__(self, max_bytes=1 << 30, ahead=12, behind=3, workers=2, reader=read_slice):
+        self.max_bytes = max_bytes
+        self.ahead = ahead
+        self.behind = behind
+        self.reader = reader
+        self._cond = threading.Condition()
+        self._files = []
+        self._entries = OrderedDict()    # path -> ndarray, oldest first
+        self._bytes = 0
+        self._inflight = {}              # path -> Event set when its read ends
+        self._plan = deque()             # paths left to prefetch
+        self._last = None                # index of the previous get()
+        self._direction = 1
+        self._slice_bytes = 0            # size of the last slice read
+        self._stop = False
+        self._stats = {"hits": 0, "misses": 0, "waits": 0, "prefetched": 0, "evicted": 0}
+        self._threads = [threading.Thread(target=self._run, name=f"slice-prefetch-{i}", daemon=True)
+                         for i in range(workers)]
+        for t in self._threads:
+            t.start()
+
+    # ----- viewer side -----
+    def set_files(self, files):
+        """Start a new series; drops every cached slice."""
+        with self._cond:
+            self._files = list(files)
+            self._entries.clear()
+            self._bytes = 0
+            self._plan.clear()
+            self._last = None
+            self._direction = 1
+
+    def get(self, index, read=True):
+        """Slice ``index`` of the series; reads it now on a miss (None
+        with ``read=False``) and re-plans the prefetch around it.  Reader
+        errors propagate."""
+        with self._cond:
+            path = self._files[index]
+            if self._last is not None and index != self._last:
+                self._direction = 1 if index > self._last else -1
+            self._last = index
+            self._replan(index)
+            img = self._lookup(path)
+            if img is not None:
+                self._stats["hits"] += 1
+                return img
+            if not read:
+                return None
+            event = self._inflight.get(path)
+        if event is not None:
+            # the prefetcher is reading it right now
+            event.wait()
+            with self._cond:
+                img = self._lookup(path)
+                if img is not None:
+                    self._stats["waits"] += 1
+                    return img
+        with self._cond:
+            self._stats["misses"] += 1
+            event = self._inflight.setdefault(path, threading.Event())
+        try:
+            img = self.reader(path)
+            with self._cond:
+                if path in self._files:
+                    self._insert(path, img)
+        finally:
+            with self._cond:
+                self._inflight.pop(path, None)
+            event.set()
+        return img
+
+    def invalidate(self, paths=None):
+        """Forget the given slices (all if None), e.g. after a rewrite."""
+        with self._cond:
+            for p in (list(self._entries) if paths is None else paths):
+                img = self._entries.pop(p, None)
+                if img is not None:
+                    self._bytes -= img.nbytes
+
+    def stats(self):
+        with self._cond:
+            return dict(self._stats, bytes=self._bytes, slices=len(self._entries))
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._plan.clear()
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=5)
+
+    # ----- internals (called with the lock held) -----
+    def _lookup(self, path):
+        img = self._entries.get(path)
+        if img is not None:
+            self._entries.move_to_end(path)
+        return img
+
+    def _insert(self, path, img):
+        if path in self._entries:
+            return
+        self._slice_bytes = img.nbytes
+        self._entries[path] = img
+        self._bytes += img.nbytes
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= old.nbytes
+            self._stats["evicted"] += 1
+
+    def _replan(self, index):
+        """Queue the slices ahead of ``index`` in the scrub direction, then
+        a few behind it; never more than the byte budget holds."""
+        n = len(self._files)
+        ahead, behind = self.ahead, self.behind
+        if self._slice_bytes:
+            fit = max(0, int(self.max_bytes // self._slice_bytes) - 1)
+            ahead = min(ahead, fit)
+            behind = min(behind, max(0, fit - ahead))
+        d = self._direction
+        order = [index + d * k for k in range(1, ahead + 1)]
+        order += [index - d * k for k in range(1, behind + 1)]
+        self._plan = deque(self._files[i] for i in order
+                           if 0 <= i < n and self._files[i] not in self._entries)
+        if self._plan:
+            self._cond.notify_all()
+
+    # ----- prefetch threads -----
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stop and not self._plan:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                path = self._plan.popleft()
+                if path in self._entries or path in self._inflight:
+                    continue
+                event = self._inflight[path] = threading.Event()
+            try:
+                img = self.reader(path)
+            except Exception:
+                img = None     # e.g. still being written; get() reads it again
+            with self._cond:
+                self._inflight.pop(path, None)
+                if img is not None and path in self._files:
+                    self._insert(path, img)
+                    self._stats["prefetched"] += 1
+            event.set()
+
+
+def benchmark(n=400, latency=0.015, tick=0.008, shape=(1024, 1024)):
+    """Scrub a synthetic series forward and back through a reader with
+    ``latency`` s per file (NFS) and ``tick`` s of display time between
+    slider ticks.  Returns {mode: per-tick get() latencies in seconds}."""
+    import time
+    rng = np.random.default_rng(0)
+    slices = {f"slice_{i:05d}.tiff": rng.random(shape, dtype=np.float32) for i in range(8)}
+    files = [f"slice_{i:05d}.tiff" for i in range(n)]
+
+    def reader(path):
+        time.sleep(latency)
+        return slices[f"slice_{int(path[6:11]) % 8:05d}.tiff"].copy()
+
+    ticks = list(range(n)) + list(range(n - 1, -1, -1))
+    out = {}
+    for mode in ("uncached", "cached"):
+        cache = SliceCache(reader=reader) if mode == "cached" else None
+        if cache is not None:
+            cache.set_files(files)
+        lat = []
+        for i in ticks:
+            t0 = time.perf_counter()
+            if cache is None:
+                reader(files[i])
+            else:
+                cache.get(i)
+            lat.append(time.perf_counter() - t0)
+            time.sleep(tick)
+        if cache is not None:
+            out["stats"] = cache.stats()
+            cache.stop()
+        out[mode] = np.array(lat)
+    return out
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m tomogui.slice_cache",
+                                     description="Slice cache scrub benchmark.")
+    parser.add_argument("--bench", action="store_true", help="scrub a synthetic series")
+    parser.add_argument("--n", type=int, default=400, help="slices in the series")
+    parser.add_argument("--latency", type=float, default=15.0, help="read time per slice, ms")
+    parser.add_argument("--tick", type=float, default=8.0, help="display time per tick, ms")
+    args = parser.parse_args(argv)
+    if not args.bench:
+        parser.error("--bench is required")
+    res = benchmark(args.n, args.latency / 1e3, args.tick / 1e3)
+    for mode in ("uncached", "cached"):
+        lat = res[mode] * 1e3
+        print(f"{mode:<9} {len(lat)} ticks: median {np.median(lat):6.2f} ms  "
+              f"p95 {np.percentile(lat, 95):6.2f} ms  max {lat.max():6.2f} ms")
+    s = res["stats"]
+    print(f"cache: {s['hits']} hits, {s['waits']} waited on prefetch, {s['misses']} misses, "
+          f"{s['prefetched']} prefetched, {s['evicted']} evicted")
+
+
+if __name__ == "__main__":
+    main()
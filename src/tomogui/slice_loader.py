@@ -0,0 +1,86 @@
+"""
+Slice loader for TomoGUI
+Slider ticks never read from disk on the GUI thread.
+
+A tick whose slice is in the ``SliceCache`` is shown at once.  Otherwise
+``SliceLoader.request`` hands the read to a small thread pool and the
+slice arrives through ``loaded``.  Only the newest request counts: a
+request that has not started when the slider moves on is dropped
+without touching the disk, one already reading finishes into the cache
+(where the prefetcher would have put it anyway) but is not shown.
+Dragging the slider across 500 slices therefore shows the slices the
+disk can deliver in time and ends on the one the handle stops at.
+
+A slice that cannot be read (e.g. still being written by tomocupy) is
+retried a few times in the worker before ``loaded`` reports None.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class SliceLoader(QObject):
+    """Latest-request-wins slice reads through a SliceCache."""
+    loaded = pyqtSignal(int, object)     # request id, image (None if unreadable)
+
+    def __init__(self, cache, workers=2, retries=3, retry_delay=0.2):
+        super().__init__()
+        self.cache = cache
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="slice-load")
+        self._lock = threading.Lock()
+        self._latest = 0
+        self._stats = {"requested": 0, "dropped": 0, "stale": 0, "shown": 0}
+
+    def request(self, index):
+        """Load slice ``index`` of the cache's series; returns the request id.
+        Earlier requests become stale."""
+        with self._lock:
+            self._latest += 1
+            rid = self._latest
+            self._stats["requested"] += 1
+        self._pool.submit(self._load, rid, index)
+        return rid
+
+    def cancel(self):
+        """Make every pending request stale."""
+        with self._lock:
+            self._latest += 1
+
+    def is_latest(self, rid):
+        with self._lock:
+            return rid == self._latest
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def shutdown(self):
+        self.cancel()
+        self._pool.shutdown(wait=False)     # queued requests are stale now and return at once
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _load(self, rid, index):
+        img = None
+        for attempt in range(self.retries):
+            if not self.is_latest(rid):
+                self._count("dropped")      # the slider moved on before we started
+                return
+            try:
+                img = self.cache.get(index)
+                break
+            except Exception:
+                if attempt + 1 < self.retries:
+                    time.sleep(self.retry_delay)
+        if not self.is_latest(rid):
+            self._count("stale")
+            return
+        self._count("shown")
+        self.loaded.emit(rid, img)
@@ -0,0 +1,232 @@
+"""
+TIFF reader for TomoGUI
+Reconstruction slices as NumPy arrays without going through PIL.
+
+tomocupy writes every slice as an uncompressed single-strip (or
+contiguous multi-strip) TIFF, and all slices of one reconstruction share
+the same header.  ``read_tiff`` parses the first IFD once per layout
+(directory, file size, header bytes) and afterwards maps the pixel data
+straight into a NumPy array: a zero-copy ``np.memmap`` view, or with
+``mmap=False`` a single ``np.fromfile`` read.  Compressed, tiled,
+multi-sample or otherwise unusual files fall back to PIL.
+
+A mapping is only valid while the file stays as it is: when tomocupy
+rewrites a slice that is still mapped, touching the truncated pages
+kills the process (SIGBUS).  Views that live on (the displayed image,
+the slice cache) therefore use ``mmap=False``; ``mmap=True`` is for
+reading and dropping the slice in one go, e.g. percentile contrast.
+
+    python -m tomogui.tiff_reader --bench [--size 2048]
+
+times both paths against PIL on a synthetic slice.
+"""
+
+import os
+import struct
+import threading
+
+import numpy as np
+
+# TIFF field type -> (struct code, size)
+_TYPES = {1: ("B", 1), 3: ("H", 2), 4: ("I", 4), 6: ("b", 1), 8: ("h", 2),
+          9: ("i", 4), 16: ("Q", 8), 17: ("q", 8)}
+_SAMPLE_KIND = {1: "u", 2: "i", 3: "f"}
+
+_layouts = {}            # (dir, size, header) -> (offset, dtype, shape) or None
+_layouts_lock = threading.Lock()
+
+
+def _read_ifd(f, endian, bigtiff, ifd_offset):
+    """Integer tags of one IFD as {tag: tuple of values}."""
+    f.seek(ifd_offset)
+    if bigtiff:
+        (n,) = struct.unpack(endian + "Q", f.read(8))
+        entry, head, inline = 20, endian + "HHQ", 8
+    else:
+        (n,) = struct.unpack(endian + "H", f.read(2))
+        entry, head, inline = 12, endian + "HHI", 4
+    raw = f.read(n * entry)
+    tags = {}
+    for i in range(n):
+        e = raw[i * entry:(i + 1) * entry]
+        tag, typ, count = struct.unpack(head, e[:entry - inline])
+        if typ not in _TYPES:
+            continue
+        code, size = _TYPES[typ]
+        data = e[entry - inline:]
+        if size * count > inline:
+            (ptr,) = struct.unpack(endian + ("Q" if bigtiff else "I"), data)
+            pos = f.tell()
+            f.seek(ptr)
+            data = f.read(size * count)
+            f.seek(pos)
+        tags[tag] = struct.unpack(endian + code * count, data[:size * count])
+    return tags
+
+
+def tiff_layout(path):
+    """(offset, dtype, shape) of the pixel data of the first page if it
+    can be mapped directly, else None."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.read(16)
+        key = (os.path.dirname(path), size, header)
+        with _layouts_lock:
+            if key in _layouts:
+                return _layouts[key]
+        layout = _parse_layout(f, header, size)
+    with _layouts_lock:
+        if len(_layouts) > 256:
+            _layouts.clear()
+        _layouts[key] = layout
+    return layout
+
+
+def _parse_layout(f, header, size):
+    if header[:2] == b"II":
+        endian = "<"
+    elif header[:2] == b"MM":
+        endian = ">"
+    else:
+        return None
+    (magic,) = struct.unpack(endian + "H", header[2:4])
+    if magic == 42:
+        bigtiff = False
+        (ifd,) = struct.unpack(endian + "I", header[4:8])
+    elif magic == 43:
+        bigtiff = True
+        (ifd,) = struct.unpack(endian + "Q", header[8:16])
+    else:
+        return None
+    try:
+        tags = _read_ifd(f, endian, bigtiff, ifd)
+    except struct.error:
+        return None
+    get = lambda tag, default=None: tags.get(tag, (default,))[0]
+    width, height = get(256), get(257)
+    bits, fmt = get(258, 1), get(339, 1)
+    offsets, counts = tags.get(273), tags.get(279)
+    if (width is None or height is None or not offsets or not counts
+            or get(259, 1) != 1              # compressed
+            or get(277, 1) != 1              # more than one sample per pixel
+            or get(317, 1) != 1              # predictor
+            or 322 in tags                   # tiled
+            or fmt not in _SAMPLE_KIND or bits not in (8, 16, 32, 64)
+            or (fmt == 3 and bits < 32)):
+        return None
+    # strips must follow each other so the image is one block
+    for off, cnt, nxt in zip(offsets, counts, offsets[1:]):
+        if off + cnt != nxt:
+            return None
+    dtype = np.dtype(f"{endian}{_SAMPLE_KIND[fmt]}{bits // 8}")
+    nbytes = width * height * dtype.itemsize
+    if sum(counts) < nbytes or offsets[0] + nbytes > size:
+        return None
+    return offsets[0], dtype, (height, width)
+
+
+def _read_pil(path):
+    from PIL import Image
+    with Image.open(path) as im:
+        return np.array(im)
+
+
+def read_tiff(path, mmap=True):
+    """First page of a TIFF as a 2-D (or H x W x C for PIL files) array.
+
+    ``mmap=True`` returns a read-only view of the file; ``mmap=False``
+    a private array read in one go.
+    """
+    layout = tiff_layout(path)
+    if layout is None:
+        return _read_pil(path)
+    offset, dtype, shape = layout
+    if mmap:
+        return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+    with open(path, "rb") as f:
+        f.seek(offset)
+        img = np.fromfile(f, dtype=dtype, count=shape[0] * shape[1])
+    return img.reshape(shape)
+
+
+def _write_tiff(path, img):
+    """Minimal uncompressed single-strip little-endian TIFF, laid out
+    like tomocupy's (benchmark data only)."""
+    img = np.ascontiguousarray(img)
+    fmt = {"u": 1, "i": 2, "f": 3}[img.dtype.kind]
+    h, w = img.shape
+    tags = [(256, 4, w), (257, 4, h), (258, 3, img.dtype.itemsize * 8), (259, 3, 1),
+            (262, 3, 1), (273, 4, 0), (277, 3, 1), (278, 4, h),
+            (279, 4, img.nbytes), (339, 3, fmt)]
+    data_offset = 8 + 2 + 12 * len(tags) + 4
+    with open(path, "wb") as f:
+        f.write(b"II" + struct.pack("<HI", 42, 8))
+        f.write(struct.pack("<H", len(tags)))
+        for tag, typ, val in tags:
+            val = data_offset if tag == 273 else val
+            code = "H" if typ == 3 else "I"
+            f.write(struct.pack("<HHI", tag, typ, 1) + struct.pack("<" + code, val).ljust(4, b"\0"))
+        f.write(struct.pack("<I", 0))
+        f.write(img.astype("<" + img.dtype.str[1:], copy=False).tobytes())
+
+
+def benchmark(size=2048, repeat=20):
+    """Time slice read + 5/95 % percentile per reader; returns
+    {reader: (read s, read+percentile s)}."""
+    import tempfile
+    import time
+    rng = np.random.default_rng(0)
+    img = rng.random((size, size), dtype=np.float32)
+    out = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "recon_00000.tiff")
+        _write_tiff(path, img)
+        readers = {"memmap": lambda p: read_tiff(p, mmap=True),
+                   "fromfile": lambda p: read_tiff(p, mmap=False)}
+        try:
+            import PIL  # noqa: F401
+            readers["PIL"] = lambda p: _read_pil(p).astype(np.float32)
+        except ImportError:
+            pass
+        for name, read in readers.items():
+            assert np.array_equal(read(path), img)
+            t_read = t_pct = float("inf")
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                arr = read(path)
+                arr[size // 2, size // 2]    # touch a page
+                t1 = time.perf_counter()
+                np.percentile(arr, [5, 95])
+                t2 = time.perf_counter()
+                del arr
+                t_read, t_pct = min(t_read, t1 - t0), min(t_pct, t2 - t0)
+            out[name] = (t_read, t_pct)
+    return out
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m tomogui.tiff_reader",
+                                     description="Direct TIFF slice reader.")
+    parser.add_argument("files", nargs="*", help="print the layout of these TIFFs")
+    parser.add_argument("--bench", action="store_true", help="time the readers on a synthetic slice")
+    parser.add_argument("--size", type=int, default=2048, help="slice edge length in the benchmark")
+    args = parser.parse_args(argv)
+    if args.bench:
+        for name, (t_read, t_pct) in benchmark(args.size).items():
+            print(f"{name:<9} {args.size}x{args.size} float32: read {t_read * 1e3:7.2f} ms  "
+                  f"read+percentile {t_pct * 1e3:7.2f} ms")
+        return
+    if not args.files:
+        parser.error("give TIFF files or --bench")
+    for path in args.files:
+        layout = tiff_layout(path)
+        if layout is None:
+            print(f"{path}: PIL fallback")
+        else:
+            offset, dtype, shape = layout
+            print(f"{path}: {shape[1]}x{shape[0]} {dtype} at offset {offset}")
+
+
+if __name__ == "__main__":
+    main()